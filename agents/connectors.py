@@ -0,0 +1,234 @@
+import asyncio
+import json
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlencode, urlsplit
+
+# One page of results from a source. `items` are raw candidates
+# ({"source": ..., "resume": ..., "updated_at": ...}); `next_cursor` is None
+# on the last page.
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+
+class SourceConnector:
+    """
+    A candidate source (job board, internal database, ...). Connectors page
+    through results with opaque cursors and can sync incrementally: passing
+    `since` only returns candidates updated after that timestamp.
+    """
+
+    def __init__(self, name, rate_limit=10.0, max_in_flight=5, page_size=20):
+        self.name = name
+        # Page requests per second the source tolerates, and concurrent requests allowed
+        self.rate_limit = rate_limit
+        self.max_in_flight = max_in_flight
+        self.page_size = page_size
+        # Newest "updated_at" seen per job title, for incremental syncs
+        self.high_water = {}
+        self.stats = {"pages": 0, "items": 0, "errors": 0, "seconds": 0.0}
+        self._slots = None
+
+    async def fetch_page(self, job_title, job_description, cursor=None, since=None, limit=None):
+        """
+        Return one Page of raw candidates. Called through iter_candidates(),
+        which keeps at most `max_in_flight` of these running at once.
+        """
+        raise NotImplementedError
+
+    async def iter_candidates(self, job_title, job_description, limit, since=None,
+                              rate_limiter=None, prefetch=True):
+        """
+        Yield up to `limit` raw candidates, following cursors page by page.
+        With `prefetch`, the next page is requested as soon as the current
+        one arrives, so the network round trip overlaps downstream work.
+        """
+        remaining = limit
+
+        async def fetch(cursor, count):
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            # Shared by every iteration over this connector, e.g. several job titles
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_in_flight)
+            async with self._slots:
+                started = time.perf_counter()
+                try:
+                    page = await self.fetch_page(job_title, job_description, cursor=cursor,
+                                                 since=since, limit=count)
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+            self.stats["pages"] += 1
+            self.stats["items"] += len(page.items)
+            self.stats["seconds"] += time.perf_counter() - started
+            return page
+
+        pending = asyncio.create_task(fetch(None, min(self.page_size, remaining)))
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                items = page.items[:remaining]
+                remaining -= len(items)
+                more = remaining > 0 and page.items and page.next_cursor is not None
+
+                if more and prefetch:
+                    pending = asyncio.create_task(fetch(page.next_cursor, min(self.page_size, remaining)))
+
+                for item in items:
+                    updated_at = item.get("updated_at")
+                    if updated_at is not None and updated_at > self.high_water.get(job_title, 0):
+                        self.high_water[job_title] = updated_at
+                    yield item
+
+                if more and not prefetch:
+                    pending = asyncio.create_task(fetch(page.next_cursor, min(self.page_size, remaining)))
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def close(self):
+        """Release any network resources"""
+        # The semaphore belongs to the current event loop
+        self._slots = None
+
+
+class StubConnector(SourceConnector):
+    """
+    In-process stand-in for a real source. Generates pages of candidates
+    with `simulate` after a simulated request latency of `latency` +/-
+    `jitter` seconds.
+    """
+
+    def __init__(self, name, simulate, latency=0.5, jitter=0.1, rate_limit=10.0,
+                 max_in_flight=5, page_size=20, seed=None):
+        super().__init__(name, rate_limit=rate_limit, max_in_flight=max_in_flight,
+                         page_size=page_size)
+        self.simulate = simulate
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    async def fetch_page(self, job_title, job_description, cursor=None, since=None, limit=None):
+        delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+        offset = int(cursor or 0)
+        count = limit or self.page_size
+        items = []
+        for i in range(count):
+            item = self.simulate(job_title, job_description, source=self.name)
+            item["updated_at"] = time.time()
+            items.append(item)
+        return Page(items, str(offset + count))
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class HttpJobBoardConnector(SourceConnector):
+    """
+    Connector for a paginated JSON job-board API, e.g. the local stand-in
+    servers in utils/stub_server.py:
+
+        GET /candidates?job_title=...&limit=...&cursor=...&since=...
+        -> {"items": [...], "next_cursor": "..." | null}
+
+    Uses a pool of keep-alive HTTP/1.1 connections, no larger than
+    `max_in_flight` since that many pages are fetched at once, and retries
+    429/5xx responses with exponential backoff.
+    """
+
+    def __init__(self, name, base_url, rate_limit=10.0, max_in_flight=5, page_size=50,
+                 timeout=10.0, retries=3, keep_alive=True):
+        super().__init__(name, rate_limit=rate_limit, max_in_flight=max_in_flight,
+                         page_size=page_size)
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.keep_alive = keep_alive
+        self._idle = []
+        self.stats["connections_opened"] = 0
+        self.stats["requests"] = 0
+
+    async def _acquire(self):
+        if self._idle:
+            return self._idle.pop()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.stats["connections_opened"] += 1
+        return _Connection(reader, writer)
+
+    def _release(self, connection, reusable):
+        if reusable and self.keep_alive:
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+    async def _request(self, path):
+        connection = await self._acquire()
+        reusable = False
+        try:
+            request = (f"GET {path} HTTP/1.1\r\n"
+                       f"Host: {self.host}:{self.port}\r\n"
+                       f"Accept: application/json\r\n"
+                       f"Connection: {'keep-alive' if self.keep_alive else 'close'}\r\n\r\n")
+            connection.writer.write(request.encode())
+            await connection.writer.drain()
+
+            status_line = await connection.reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed by server")
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await connection.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            body = await connection.reader.readexactly(int(headers.get("content-length", 0)))
+            reusable = headers.get("connection", "").lower() != "close"
+            self.stats["requests"] += 1
+            return status, body
+        finally:
+            self._release(connection, reusable)
+
+    async def fetch_page(self, job_title, job_description, cursor=None, since=None, limit=None):
+        params = {"job_title": job_title, "limit": limit or self.page_size}
+        if cursor is not None:
+            params["cursor"] = cursor
+        if since is not None:
+            params["since"] = since
+        path = f"{self.base_path}/candidates?{urlencode(params)}"
+
+        for attempt in range(self.retries + 1):
+            try:
+                status, body = await asyncio.wait_for(self._request(path), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                # Includes keep-alive connections the server has since closed
+                if attempt == self.retries:
+                    raise
+                status = None
+            if status == 200:
+                payload = json.loads(body)
+                for item in payload["items"]:
+                    item.setdefault("source", self.name)
+                return Page(payload["items"], payload.get("next_cursor"))
+            if status is not None and (status != 429 and status < 500 or attempt == self.retries):
+                raise RuntimeError(f"{self.name} returned HTTP {status}")
+            await asyncio.sleep(0.05 * 2 ** attempt)
+
+    async def close(self):
+        # Connections belong to the current event loop
+        while self._idle:
+            self._idle.pop().close()
+        await super().close()
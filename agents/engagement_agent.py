@@ -1,34 +1,51 @@
-import time
-import streamlit as st
 from utils import db, llm
 import random
 
+# Default for "load the model": None already means no model is available
+_LOAD_MODEL = object()
+# Stands in for the candidate's name in messages generated for a group
+NAME_PLACEHOLDER = "[CANDIDATE_NAME]"
+
 
 class EngagementAgent:
 
     def __init__(self):
         self.name = "Engagement Agent"
         self.status = "idle"
-
-    def start(self, job_title):
-        """Start the engagement process for screened candidates"""
+        # Messages generated at once when the model can't take a whole batch
+        # in one request
+        self.max_workers = 8
+        # Seconds allowed per round of max_workers LLM calls; groups left
+        # without a message fall back to the template
+        self.llm_timeout = 15.0
+        # Candidates written back per storage call
+        self.persist_batch_size = 50
+
+    def start(self, job_title, candidates=None):
+        """
+        Engage screened candidates for a job. `candidates` may be records
+        already fetched with db.get_records ({"ids", "metadatas", ...});
+        by default all screened candidates for the job who haven't been
+        contacted yet are loaded.
+        """
         self.status = "running"
         db.log_activity(self.name, "start", "success",
                         f"Started engaging candidates for {job_title}")
 
-        engaged_count = 0
-        interested_count = 0
+        counts = {"engaged": 0, "interested": 0, "fallbacks": 0}
 
         try:
-            # Get ChromaDB client
-            client = st.session_state.chroma_client
-            collection = client.get_collection(db.CANDIDATE_COLLECTION)
+            loaded = candidates is None
+            if loaded:
+                candidates = db.get_records(where={"stage": "screened", "job_title": job_title})
 
-            # Fetch all candidates with stage "screened"
-            results = collection.get(where={"stage": "screened"})
+            candidate_data = list(zip(candidates.get('ids', []), candidates.get('metadatas', [])))
+            if loaded:
+                # Uninterested candidates stay "screened" once engaged; don't contact them again
+                candidate_data = [(candidate_id, metadata) for candidate_id, metadata in candidate_data
+                                  if not metadata.get("engaged", False)]
 
-            # Check if candidates exist
-            if not results or 'ids' not in results or not results['ids']:
+            if not candidate_data:
                 self.status = "idle"
                 db.log_activity(
                     self.name, "complete", "success",
@@ -40,44 +57,22 @@ class EngagementAgent:
                     "interested_count": 0
                 }
 
-            # Filter based on job_title from metadata
-            candidate_data = [(cid, meta, doc) for cid, meta, doc in zip(
-                results['ids'], results['metadatas'], results['documents'])
-                              if meta.get("job_title") == job_title]
-
-            if not candidate_data:
-                self.status = "idle"
-                db.log_activity(
-                    self.name, "complete", "success",
-                    f"No screened candidates found for job title {job_title}")
-                return {
-                    "success": True,
-                    "message":
-                    "No candidates found to engage for this job title",
-                    "engaged_count": 0,
-                    "interested_count": 0
-                }
-
-            # Process each candidate
-            for candidate_id, metadata, resume_text in candidate_data:
-                result = self._engage_single_candidate(candidate_id, job_title)
-                if result["success"]:
-                    engaged_count += 1
-                    if result["interested"]:
-                        interested_count += 1
+            self._engage_candidates(candidate_data, job_title, counts)
 
             self.status = "idle"
             db.log_activity(
                 self.name, "complete", "success",
-                f"Completed engagement with {engaged_count} candidates, {interested_count} interested"
+                f"Completed engagement with {counts['engaged']} candidates, {counts['interested']} interested "
+                f"({counts['fallbacks']} template messages)"
             )
 
             return {
                 "success": True,
                 "message":
-                f"Successfully engaged {engaged_count} candidates, {interested_count} interested",
-                "engaged_count": engaged_count,
-                "interested_count": interested_count
+                f"Successfully engaged {counts['engaged']} candidates, {counts['interested']} interested",
+                "engaged_count": counts["engaged"],
+                "interested_count": counts["interested"],
+                "fallback_count": counts["fallbacks"]
             }
 
         except Exception as e:
@@ -86,33 +81,125 @@ class EngagementAgent:
             return {
                 "success": False,
                 "message": f"Error during engagement: {str(e)}",
-                "engaged_count": engaged_count,
-                "interested_count": interested_count
+                "engaged_count": counts["engaged"],
+                "interested_count": counts["interested"]
             }
 
     def get_status(self):
         """Get the current status of the agent"""
         return self.status
 
-    def _generate_engagement_message(self, candidate_name, job_title,
-                                     matching_skills):
-        """Generate an engagement message for a candidate"""
+    def _engage_candidates(self, candidate_data, job_title, counts, model=_LOAD_MODEL):
+        """
+        Generate one message per group of candidates with the same top
+        matching skills, personalize it for each candidate and persist
+        results in batches. Returns the interested candidates as (id, updated metadata).
+        """
+        # One model for the whole run
+        if model is _LOAD_MODEL:
+            model = llm.get_llm()
+        skills = [self._matching_skills(metadata) for _, metadata in candidate_data]
+        templates = self._generate_templates(job_title, {self._skill_group(s) for s in skills}, model)
+        pending = []
+        interested = []
+
         try:
-            prompt = f"""
+            for (candidate_id, metadata), matching_skills in zip(candidate_data, skills):
+                name = metadata.get("name", "Candidate")
+                engagement_message, generated = self._personalize(
+                    templates.get(self._skill_group(matching_skills)), name, job_title, matching_skills)
+                is_interested = self._simulate_candidate_interest(metadata.get("match_score", 0))
+
+                update = {
+                    "engaged": True,
+                    "engagement_message": engagement_message,
+                    "is_interested": is_interested,
+                    # Kept for the activity log; not stored
+                    "name": name
+                }
+                if is_interested:
+                    update["stage"] = "engaged"
+
+                counts["engaged"] += 1
+                counts["interested"] += is_interested
+                counts["fallbacks"] += not generated
+                pending.append((candidate_id, update))
+                if is_interested:
+                    interested.append((candidate_id, dict(metadata, **update)))
+                if len(pending) >= self.persist_batch_size:
+                    self._persist(pending)
+                    pending = []
+        finally:
+            if pending:
+                self._persist(pending)
+        return interested
+
+    @staticmethod
+    def _matching_skills(metadata):
+        matching_skills = metadata.get("matching_skills", [])
+        if isinstance(matching_skills, str):
+            matching_skills = matching_skills.split(", ") if matching_skills else []
+        return matching_skills
+
+    @staticmethod
+    def _skill_group(matching_skills):
+        """Candidates sharing these skills get the same generated message"""
+        return tuple(sorted(matching_skills[:3]))
+
+    def _persist(self, results):
+        """Write a batch of engagement results and their activity log entries"""
+        ids = [candidate_id for candidate_id, _ in results]
+        updates = []
+        entries = []
+        for _, update in results:
+            update = dict(update)
+            name = update.pop("name")
+            interest_status = "interested" if update["is_interested"] else "not interested"
+            updates.append(update)
+            entries.append((self.name, "engage_candidate", "success",
+                            f"Engaged {name} who was {interest_status}"))
+        if not db.update_candidates(ids, updates):
+            raise RuntimeError("Failed to save engagement results")
+        db.log_activities(entries)
+
+    def _generate_templates(self, job_title, groups, model):
+        """
+        One LLM-written message per skill group, addressed to NAME_PLACEHOLDER,
+        generated as a batch. Groups the model failed on (or every group,
+        without a model) are missing from the result.
+        """
+        if not model or not groups:
+            return {}
+        groups = sorted(groups)
+        prompts = [f"""
             Write a short, professional email to engage a potential job candidate.
-            Candidate name: {candidate_name}
+            Address the candidate as {NAME_PLACEHOLDER}.
             Job title: {job_title}
-            Candidate skills that match the job: {', '.join(matching_skills[:3]) if matching_skills else 'various relevant skills'}
+            Candidate skills that match the job: {', '.join(group) if group else 'various relevant skills'}
 
             The message should be brief, professional, and highlight that their skills match our requirements.
             Ask if they're interested in discussing the opportunity further.
-            """
-            model = llm.get_llm()
-            if model:
-                response = model(prompt)
-                return response
-        except:
-            pass
+            """ for group in groups]
+        # Each round of max_workers generations gets llm_timeout seconds
+        rounds = -(-len(prompts) // self.max_workers)
+        try:
+            responses = llm.generate_batch(prompts, model=model, max_concurrency=self.max_workers,
+                                           timeout=self.llm_timeout * rounds)
+        except Exception as e:
+            db.log_activity(self.name, "generate_messages", "failed", str(e))
+            return {}
+        return {group: response for group, response in zip(groups, responses) if response}
+
+    def _personalize(self, template, candidate_name, job_title, matching_skills):
+        """
+        The engagement message for one candidate and whether the LLM wrote it:
+        the group's generated message with the candidate's name filled in, or
+        the standard template when there is none.
+        """
+        if template:
+            if NAME_PLACEHOLDER in template:
+                return template.replace(NAME_PLACEHOLDER, candidate_name), True
+            return f"Hi {candidate_name},\n\n{template.strip()}", True
 
         skills_mention = f"Your skills in {', '.join(matching_skills[:3])}" if matching_skills else "Your skills"
         template = f"""
@@ -131,15 +218,12 @@ class EngagementAgent:
         Best regards,
         TalentCrew AI Recruiting Team
         """
-        return template
+        return template, False
 
     def _engage_single_candidate(self, candidate_id, job_title):
         """Engage a single candidate"""
         try:
-            client = st.session_state.chroma_client
-            collection = client.get_collection(db.CANDIDATE_COLLECTION)
-
-            result = collection.get(ids=[candidate_id])
+            result = db.get_records(ids=[candidate_id])
 
             if not result or 'metadatas' not in result or not result[
                     'metadatas']:
@@ -149,41 +233,10 @@ class EngagementAgent:
                     "interested": False
                 }
 
-            metadata = result['metadatas'][0]
-            resume_text = result['documents'][0]
-
-            time.sleep(0.5)
-
-            matching_skills = metadata.get("matching_skills", [])
-            if isinstance(matching_skills, str):
-                matching_skills = matching_skills.split(", ")
-
-            engagement_message = self._generate_engagement_message(
-                candidate_name=metadata.get("name", "Candidate"),
-                job_title=job_title,
-                matching_skills=matching_skills)
-
-            is_interested = self._simulate_candidate_interest(
-                metadata.get("match_score", 0))
-
-            metadata.update({
-                "engaged": True,
-                "engagement_message": engagement_message,
-                "is_interested": is_interested
-            })
-
-            if is_interested:
-                metadata["stage"] = "engaged"
-
-            collection.update(ids=[candidate_id],
-                              metadatas=[metadata],
-                              documents=[resume_text])
-
+            counts = {"engaged": 0, "interested": 0, "fallbacks": 0}
+            self._engage_candidates([(candidate_id, result['metadatas'][0])], job_title, counts)
+            is_interested = counts["interested"] > 0
             interest_status = "interested" if is_interested else "not interested"
-            db.log_activity(
-                self.name, "engage_candidate", "success",
-                f"Engaged {metadata.get('name', 'Candidate')} who was {interest_status}"
-            )
 
             return {
                 "success": True,
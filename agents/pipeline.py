@@ -0,0 +1,383 @@
+import queue
+import threading
+import time
+import uuid
+from utils import db, llm
+from utils.checkpoints import CheckpointStore
+from utils.status import HEARTBEAT_INTERVAL, StatusRegistry
+from agents.sourcing_agent import SourcingAgent
+from agents.screening_agent import ScreeningAgent
+from agents.engagement_agent import EngagementAgent
+from agents.scheduling_agent import SchedulingAgent
+
+STAGES = ["sourcing", "screening", "engagement", "scheduling"]
+
+# Result fields adding up to the items a stage handled
+_RESULT_COUNTS = {
+    "sourcing": ("candidates_count",),
+    "screening": ("screened_count", "rejected_count"),
+    "engagement": ("engaged_count",),
+    "scheduling": ("scheduled_count",)
+}
+
+# Counters each stage owns, saved with its checkpoints
+STAGE_COUNTS = {
+    "sourcing": ("sourced",),
+    "screening": ("screened", "rejected"),
+    "engagement": ("engaged", "interested", "fallbacks"),
+    "scheduling": ("scheduled",)
+}
+
+# Candidate stage each stage takes as input; a resumed run picks up what's left there
+_INPUT_STAGES = {"screening": "sourced", "engagement": "screened", "scheduling": "engaged"}
+
+# Left-over candidates handled per batch when a run resumes
+BACKLOG_BATCH = 1000
+
+# Sentinel telling a stage its upstream is finished
+_DONE = object()
+
+
+def run_pipeline(job_title, job_description, candidate_count=5, on_stage=None,
+                 streaming=True, min_match_score=60, queue_size=8, run_id=None):
+    """
+    Run sourcing, screening, engagement and scheduling for one job with a
+    fresh set of agents, so concurrent runs don't share agent state.
+
+    With `streaming`, all four stages run at once: each batch of sourced
+    candidates is handed straight to screening, and so on down the line,
+    through bounded queues of `queue_size` batches. Otherwise each stage
+    runs to completion and the next re-reads its candidates from storage.
+
+    Progress is checkpointed under `run_id` (a new id by default); calling
+    again with the id of an unfinished run resumes it. Each stage also
+    reports to the shared status registry (utils/status.py), heartbeating
+    until the run ends.
+
+    `on_stage(stage, result)` is called when a stage starts (result None)
+    and when it finishes. Returns {stage: result}.
+    """
+    run_id = run_id or uuid.uuid4().hex[:12]
+    checkpoints = CheckpointStore()
+    saved = checkpoints.load(run_id)
+    checkpoints.start_run(run_id, job_title, job_description, candidate_count)
+    status = StatusRegistry()
+
+    # Stages waiting on upstream have nothing to report; keep them visibly alive
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            status.heartbeat(run_id)
+
+    heartbeats = threading.Thread(target=heartbeat, name=f"heartbeat-{run_id}", daemon=True)
+    heartbeats.start()
+    try:
+        if streaming:
+            results = _run_streaming(job_title, job_description, candidate_count, on_stage,
+                                     min_match_score, queue_size, run_id, saved, checkpoints, status)
+        else:
+            results = _run_staged(job_title, job_description, candidate_count, on_stage,
+                                  min_match_score, run_id, saved, checkpoints, status)
+    except Exception:
+        checkpoints.finish_run(run_id, "failed")
+        raise
+    finally:
+        stop.set()
+        heartbeats.join()
+
+    failed = any(not result["success"] for result in results.values())
+    checkpoints.finish_run(run_id, "failed" if failed else "completed")
+    return results
+
+
+def resume_pipeline(run_id, on_stage=None, **options):
+    """Pick up a checkpointed run where it stopped"""
+    run = CheckpointStore().get_run(run_id)
+    if run is None:
+        raise ValueError(f"Unknown pipeline run: {run_id}")
+    return run_pipeline(run["job_title"], run["job_description"], run["candidate_count"],
+                        on_stage=on_stage, run_id=run_id, **options)
+
+
+def processed_count(stage, result):
+    """Items a stage handled, from its result"""
+    return sum(result.get(key) or 0 for key in _RESULT_COUNTS[stage])
+
+
+def _finished_results(saved):
+    return {stage: checkpoint["result"] for stage, checkpoint in saved.items()
+            if checkpoint["status"] == "completed"}
+
+
+def _sourcing_result(result, prior):
+    """Fold candidates sourced before a resume into the sourcing result"""
+    if not prior:
+        return result
+    return dict(result, candidates_count=result.get("candidates_count", 0) + prior,
+                message=f"{result['message']} ({prior} sourced before resuming)")
+
+
+def _run_staged(job_title, job_description, candidate_count, on_stage, min_match_score,
+                run_id, saved, checkpoints, status):
+    finished = _finished_results(saved)
+    prior = saved["sourcing"]["cursor"] if "sourcing" in saved else 0
+    sourced = [prior]
+
+    def on_sourced(records):
+        sourced[0] += len(records)
+        checkpoints.save(run_id, "sourcing", sourced[0], {"sourced": sourced[0]})
+
+    # Each stage re-reads its input by candidate stage (engagement skipping
+    # anyone already contacted), so a rerun never handles a candidate twice;
+    # sourcing only tops up what's missing
+    agents = {
+        "sourcing": (SourcingAgent(), (job_title, job_description, candidate_count - prior),
+                     {"on_sourced": on_sourced}),
+        "screening": (ScreeningAgent(), (job_title, job_description, min_match_score), {}),
+        "engagement": (EngagementAgent(), (job_title,), {}),
+        "scheduling": (SchedulingAgent(), (job_title,), {})
+    }
+
+    results = {}
+    upstream_finished = True
+    for stage in STAGES:
+        agent, args, kwargs = agents[stage]
+        if on_stage:
+            on_stage(stage, None)
+        if stage in finished:
+            results[stage] = finished[stage]
+        else:
+            worker_id = f"{run_id}:{stage}"
+            status.start(worker_id, stage, job_title, run_id)
+            stage_started = time.perf_counter()
+            # Stages run one at a time here, so a stage is busy for its whole run
+            results[stage] = dict(agent.start(*args, **kwargs),
+                                  busy_seconds=time.perf_counter() - stage_started)
+            status.finish(worker_id, "completed" if results[stage]["success"] else "failed",
+                          processed_count(stage, results[stage]))
+            counts = {}
+            if stage == "sourcing":
+                results[stage] = _sourcing_result(results[stage], prior)
+                counts = {"sourced": sourced[0]}
+            # After a failed stage, later ones run on partial input and must run again on resume
+            upstream_finished = upstream_finished and results[stage]["success"]
+            checkpoints.save(run_id, stage, sourced[0] if stage == "sourcing" else 0, counts,
+                             "completed" if upstream_finished else "failed", results[stage])
+        if on_stage:
+            on_stage(stage, results[stage])
+    return results
+
+
+def _next_batch(inbox):
+    """Wait for one batch, then take whatever else is queued. Returns (records, done)"""
+    item = inbox.get()
+    if item is _DONE:
+        return [], True
+    records = list(item)
+    while True:
+        try:
+            item = inbox.get_nowait()
+        except queue.Empty:
+            return records, False
+        if item is _DONE:
+            return records, True
+        records.extend(item)
+
+
+def _run_streaming(job_title, job_description, candidate_count, on_stage, min_match_score, queue_size,
+                   run_id, saved, checkpoints, status):
+    sourcing, screening = SourcingAgent(), ScreeningAgent()
+    engagement, scheduling = EngagementAgent(), SchedulingAgent()
+    to_screen, to_engage, to_schedule = (queue.Queue(maxsize=queue_size) for _ in range(3))
+
+    started = time.perf_counter()
+    results = {}
+    counts = {name: 0 for names in STAGE_COUNTS.values() for name in names}
+    # Items each stage has finished, the cursor saved with its checkpoints
+    processed = dict.fromkeys(STAGES, 0)
+    for stage, checkpoint in saved.items():
+        counts.update(checkpoint["counts"])
+        processed[stage] = checkpoint["cursor"]
+    finished = _finished_results(saved)
+    first_interview = []
+    # Stages that ended without finishing their work; anything downstream of
+    # one can't count as finished either, since its input was cut short
+    stopped = set()
+
+    # Candidates an interrupted run left between stages; nothing is in
+    # flight yet, so these can't also arrive through the queues
+    backlog = dict.fromkeys(_INPUT_STAGES, [])
+    if saved:
+        for stage, input_stage in _INPUT_STAGES.items():
+            if stage in finished:
+                continue
+            records = db.get_records(where={"stage": input_stage, "job_title": job_title})
+            rows = zip(records["ids"], records["metadatas"], records["documents"])
+            if stage == "screening":
+                backlog[stage] = list(rows)
+            else:
+                # Uninterested candidates stay "screened" once engaged; skip them
+                backlog[stage] = [(candidate_id, metadata) for candidate_id, metadata, _ in rows
+                                  if (metadata.get("is_interested", False) if stage == "scheduling"
+                                      else not metadata.get("engaged", False))]
+
+    def notify(stage, result):
+        if result is not None:
+            results[stage] = result
+        if on_stage:
+            on_stage(stage, result)
+
+    resumed_from = dict(processed)
+
+    def checkpoint(stage, state="running", result=None):
+        checkpoints.save(run_id, stage, processed[stage],
+                         {name: counts[name] for name in STAGE_COUNTS[stage]}, state, result)
+        # Throughput covers this attempt only, not work done before a resume
+        handled = processed[stage] - resumed_from[stage]
+        if state == "running":
+            status.progress(f"{run_id}:{stage}", handled)
+        else:
+            status.finish(f"{run_id}:{stage}", state, handled)
+
+    def source():
+        notify("sourcing", None)
+        if "sourcing" in finished:
+            to_screen.put(_DONE)
+            notify("sourcing", finished["sourcing"])
+            return
+
+        prior = processed["sourcing"]
+        status.start(f"{run_id}:sourcing", "sourcing", job_title, run_id)
+
+        def sourced(records):
+            processed["sourcing"] += len(records)
+            counts["sourced"] = processed["sourcing"]
+            checkpoint("sourcing")
+            to_screen.put(records)
+
+        result = {"success": False, "message": "Sourcing did not finish"}
+        source_started = time.perf_counter()
+        try:
+            if candidate_count > prior:
+                # Sourcing inserts in batches; each one flows on as soon as it is stored
+                result = sourcing.start(job_title, job_description, candidate_count - prior,
+                                        on_sourced=sourced)
+            else:
+                result = {"success": True, "message": "All candidates already sourced",
+                          "candidates_count": 0}
+            # Includes time blocked on a full queue, i.e. waiting on screening
+            result = dict(_sourcing_result(result, prior),
+                          busy_seconds=time.perf_counter() - source_started)
+            # Saved before downstream can finish, so finished stages always form a prefix
+            checkpoint("sourcing", "completed" if result["success"] else "failed", result)
+        finally:
+            if not result["success"]:
+                stopped.add("sourcing")
+            to_screen.put(_DONE)
+        notify("sourcing", result)
+
+    def run_stage(stage, upstream, agent, inbox, outbox, work, summarize):
+        notify(stage, None)
+        if stage in finished:
+            # Upstream finished before this did, so nothing new arrives; drain anyway
+            while inbox.get() is not _DONE:
+                pass
+            if outbox is not None:
+                outbox.put(_DONE)
+            notify(stage, finished[stage])
+            return
+
+        agent.status = "running"
+        status.start(f"{run_id}:{stage}", stage, job_title, run_id)
+        db.log_activity(agent.name, "start", "success", f"Started streaming {stage} for {job_title}")
+        error = None
+        busy = 0.0
+
+        def handle(records):
+            nonlocal error, busy
+            # After a failure keep draining, so upstream stages never block
+            if error is not None:
+                return
+            batch_started = time.perf_counter()
+            try:
+                passed = work(records)
+                processed[stage] += len(records)
+                checkpoint(stage)
+                if outbox is not None and passed:
+                    outbox.put(passed)
+            except Exception as e:
+                error = e
+                db.log_activity(agent.name, "error", "failed", str(e))
+            busy += time.perf_counter() - batch_started
+
+        pending = backlog[stage]
+        for offset in range(0, len(pending), BACKLOG_BATCH):
+            handle(pending[offset:offset + BACKLOG_BATCH])
+        done = False
+        while not done:
+            records, done = _next_batch(inbox)
+            if records:
+                handle(records)
+
+        elapsed = time.perf_counter() - started
+        if error is None:
+            agent.status = "idle"
+            result = dict(summarize(), success=True)
+            db.log_activity(agent.name, "complete", "success", f"{result['message']} for {job_title}")
+        else:
+            agent.status = "error"
+            result = {"success": False, "message": f"Error during {stage}: {str(error)}"}
+        result.update({"elapsed_seconds": elapsed, "busy_seconds": busy})
+        if error is None and upstream not in stopped:
+            checkpoint(stage, "completed", result)
+        else:
+            stopped.add(stage)
+            checkpoint(stage, "failed", result)
+        if outbox is not None:
+            outbox.put(_DONE)
+        notify(stage, result)
+    profile = screening._compile_profile(job_description)
+    model = llm.get_llm()
+
+    def screen(records):
+        return screening._screen_records(profile, records, min_match_score, counts)
+
+    def engage(records):
+        return engagement._engage_candidates(records, job_title, counts, model=model)
+
+    def schedule(records):
+        scheduled = scheduling._schedule_candidates(records, job_title)
+        counts["scheduled"] += scheduled
+        if scheduled and not first_interview:
+            first_interview.append(time.perf_counter() - started)
+
+    threads = [
+        threading.Thread(target=source, name="pipeline-sourcing"),
+        threading.Thread(target=run_stage, name="pipeline-screening", args=(
+            "screening", "sourcing", screening, to_screen, to_engage, screen, lambda: {
+                "message": f"Screened {counts['screened'] + counts['rejected']} candidates: "
+                           f"{counts['screened']} passed, {counts['rejected']} below {min_match_score}%",
+                "screened_count": counts["screened"],
+                "rejected_count": counts["rejected"]
+            })),
+        threading.Thread(target=run_stage, name="pipeline-engagement", args=(
+            "engagement", "screening", engagement, to_engage, to_schedule, engage, lambda: {
+                "message": f"Successfully engaged {counts['engaged']} candidates, "
+                           f"{counts['interested']} interested",
+                "engaged_count": counts["engaged"],
+                "interested_count": counts["interested"],
+                "fallback_count": counts["fallbacks"]
+            })),
+        threading.Thread(target=run_stage, name="pipeline-scheduling", args=(
+            "scheduling", "engagement", scheduling, to_schedule, None, schedule, lambda: {
+                "message": f"Scheduled {counts['scheduled']} candidates",
+                "scheduled_count": counts["scheduled"],
+                "time_to_first_interview": first_interview[0] if first_interview else None
+            }))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
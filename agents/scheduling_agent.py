@@ -1,15 +1,32 @@
-import streamlit as st
 from utils import db
-import time
+from utils.scheduler import InterviewScheduler
 
 
 class SchedulingAgent:
 
-    def __init__(self):
+    def __init__(self, interviewers=None, rooms=None, profiles=None):
         self.name = "Scheduling Agent"
         self.status = "idle"
+        self.interviewers = interviewers or [f"Interviewer {i}" for i in range(1, 6)]
+        self.rooms = rooms or ["Room A", "Room B", "Room C", "Video Call"]
+        # Interviewer skills and time zones, used by batch scheduling
+        self.profiles = profiles or {}
+        # Assign a whole job's candidates jointly rather than first come, first served
+        self.batch_mode = True
+        self._scheduler = None
 
-    def start(self, job_title):
+    @property
+    def scheduler(self):
+        # Built on first use; it loads existing bookings from the state store
+        if self._scheduler is None:
+            self._scheduler = InterviewScheduler(self.interviewers, self.rooms, profiles=self.profiles)
+        return self._scheduler
+
+    def start(self, job_title, candidates=None):
+        """
+        Book interviews for every interested, engaged candidate for a job.
+        `candidates` may be records already fetched with db.get_records.
+        """
         self.status = "running"
         db.log_activity(self.name, "start", "success",
                         f"Started scheduling for job: {job_title}")
@@ -17,13 +34,14 @@ class SchedulingAgent:
         scheduled_count = 0
 
         try:
-            client = st.session_state.chroma_client
-            collection = client.get_collection(db.CANDIDATE_COLLECTION)
+            if candidates is None:
+                candidates = db.get_records(where={"stage": "engaged", "job_title": job_title})
 
-            # Fix: Correct where clause with operator
-            results = collection.get(where={"stage": {"$eq": "engaged"}})
+            candidate_data = [(candidate_id, metadata) for candidate_id, metadata
+                              in zip(candidates.get('ids', []), candidates.get('metadatas', []))
+                              if metadata.get("is_interested", False)]
 
-            if not results or 'ids' not in results or not results['ids']:
+            if not candidate_data:
                 self.status = "idle"
                 db.log_activity(
                     self.name, "complete", "success",
@@ -34,23 +52,7 @@ class SchedulingAgent:
                     "scheduled_count": 0
                 }
 
-            for i, (candidate_id, metadata, resume_text) in enumerate(
-                    zip(results['ids'], results['metadatas'],
-                        results['documents'])):
-
-                # Filter manually in code
-                if metadata.get("job_title") != job_title or not metadata.get(
-                        "is_interested", False):
-                    continue
-
-                time.sleep(0.3)
-                metadata["stage"] = "interview_scheduled"
-                metadata["interview_time"] = f"2025-04-13 10:{i+1:02d} AM"
-
-                collection.update(ids=[candidate_id],
-                                  metadatas=[metadata],
-                                  documents=[resume_text])
-                scheduled_count += 1
+            scheduled_count = self._schedule_candidates(candidate_data, job_title)
 
             self.status = "idle"
             db.log_activity(
@@ -73,3 +75,58 @@ class SchedulingAgent:
 
     def get_status(self):
         return self.status
+
+    def _schedule_candidates(self, candidate_data, job_title):
+        """Allocate slots for all candidates at once and write them back in one batch"""
+        if self.batch_mode and len(candidate_data) > 1:
+            bookings = self.scheduler.schedule_batch(candidate_data, job_title)
+        else:
+            bookings = self.scheduler.schedule([candidate_id for candidate_id, _ in candidate_data], job_title)
+
+        ids, updates, entries = [], [], []
+        for candidate_id, metadata in candidate_data:
+            booking = bookings.get(candidate_id)
+            if booking is None:
+                entries.append((self.name, "schedule_interview", "failed",
+                                f"No interviewer available for {metadata.get('name', 'Candidate')}"))
+                continue
+            ids.append(candidate_id)
+            updates.append({
+                "stage": "scheduled",
+                "scheduled": True,
+                "interview_datetime": booking.start,
+                "interviewer": booking.interviewer,
+                "interview_room": booking.room
+            })
+            entries.append((self.name, "schedule_interview", "success",
+                            f"Scheduled interview for {metadata.get('name', 'Candidate')} at {booking.start} "
+                            f"with {booking.interviewer} ({booking.room})"))
+
+        if ids and not db.update_candidates(ids, updates):
+            raise RuntimeError("Failed to save interview bookings")
+        db.log_activities(entries)
+        return len(ids)
+
+    def _schedule_single_candidate(self, candidate_id, job_title):
+        """Book an interview for one candidate, e.g. from the candidate detail view"""
+        try:
+            result = db.get_records(ids=[candidate_id])
+            if not result['ids']:
+                return {"success": False, "message": "Candidate not found"}
+
+            metadata = result['metadatas'][0]
+            self._schedule_candidates([(candidate_id, metadata)], job_title)
+            booking = self.scheduler.get_booking(candidate_id)
+            if booking is None:
+                # The failed attempt is already in the activity log
+                return {
+                    "success": False,
+                    "message": f"No available interview slot for {metadata.get('name', 'Candidate')}"
+                }
+            return {
+                "success": True,
+                "message": f"Interview scheduled for {booking.start} with {booking.interviewer}"
+            }
+        except Exception as e:
+            db.log_activity(self.name, "schedule_interview", "failed", str(e))
+            return {"success": False, "message": f"Error during scheduling: {str(e)}"}
@@ -1,6 +1,30 @@
+import re
 import time
-import streamlit as st
-from utils import db
+import numpy as np
+from utils import db, parser
+
+# Weight of a "nice to have" skill against a required one in the match score
+PREFERRED_WEIGHT = 0.5
+
+# Word between a batch's resumes in its one regex pass; being upper case,
+# it can't occur in the lower-cased resumes
+_SEPARATOR = "NEXT"
+
+# A section heading on a line of its own, e.g. "Required Skills:"
+_HEADING = re.compile(r"^\s*[A-Za-z][\w /&-]*:\s*$")
+_PREFERRED_HEADING = re.compile(
+    r"^\s*(?:nice to have|preferred(?: skills| qualifications)?|bonus(?: points)?|pluses)\s*:", re.IGNORECASE)
+
+
+def _split_requirements(job_description):
+    """(required, preferred) parts of a job description; only "nice to have" style sections are preferred"""
+    required, preferred = [], []
+    section = required
+    for line in job_description.splitlines():
+        if _HEADING.match(line):
+            section = preferred if _PREFERRED_HEADING.match(line) else required
+        section.append(line)
+    return "\n".join(required), "\n".join(preferred)
 
 
 class ScreeningAgent:
@@ -8,65 +32,62 @@ class ScreeningAgent:
     def __init__(self):
         self.name = "Screening Agent"
         self.status = "idle"
+        # Candidates loaded, scored and written back per round trip
+        self.page_size = 1000
 
-    def start(self, job_title, min_match_score=60):
-        """Start the screening process for candidates"""
+    def start(self, job_title, job_description, min_match_score=60):
+        """Screen every sourced candidate for a job against its description"""
         self.status = "running"
         db.log_activity(self.name, "start", "success",
                         f"Started screening candidates for {job_title}")
 
-        screened_count = 0
+        counts = {"screened": 0, "rejected": 0}
+        started = time.perf_counter()
 
         try:
-            # Get ChromaDB client
-            client = st.session_state.chroma_client
-            collection = client.get_collection(db.CANDIDATE_COLLECTION)
-
-            # Retrieve candidates who are in the 'new' stage and match the job title
-            results = collection.get(where={"stage": "new"})
-
-            if not results or 'ids' not in results or not results['ids']:
-                self.status = "idle"
-                db.log_activity(
-                    self.name, "complete", "success",
-                    f"No new candidates found to screen for {job_title}")
-                return {
-                    "success": True,
-                    "message": "No candidates found to screen",
-                    "screened_count": 0
-                }
-
-            for i, (candidate_id, metadata, resume_text) in enumerate(
-                    zip(results['ids'], results['metadatas'],
-                        results['documents'])):
-
-                if metadata.get("job_title") != job_title:
-                    continue
-
-                match_score = metadata.get("match_score", 0)
-                if isinstance(match_score, str):
-                    try:
-                        match_score = float(match_score)
-                    except ValueError:
-                        match_score = 0
-
-                if match_score >= min_match_score:
-                    metadata["stage"] = "screened"
-                    collection.update(ids=[candidate_id],
-                                      metadatas=[metadata],
-                                      documents=[resume_text])
-                    screened_count += 1
-                time.sleep(0.2)
+            profile = self._compile_profile(job_description)
+            where = {"stage": "sourced", "job_title": job_title}
+            seen = set()
+
+            while True:
+                # Screened candidates leave the "sourced" set, so the first
+                # page is always the next batch of pending ones
+                page = db.get_backend().query(db.CANDIDATE_COLLECTION, where=where,
+                                              limit=self.page_size)
+                pending = [i for i, candidate_id in enumerate(page["ids"])
+                           if candidate_id not in seen]
+                if not pending:
+                    break
+
+                ids = [page["ids"][i] for i in pending]
+                seen.update(ids)
+                self._screen_records(profile, [(page["ids"][i], page["metadatas"][i] or {},
+                                                page["documents"][i]) for i in pending],
+                                     min_match_score, counts)
+
+            elapsed = time.perf_counter() - started
+            total = counts["screened"] + counts["rejected"]
+            rate = total / elapsed if elapsed else 0.0
 
             self.status = "idle"
             db.log_activity(
                 self.name, "complete", "success",
-                f"Screened {screened_count} candidates for {job_title}")
+                f"Screened {total} candidates for {job_title} in {elapsed:.2f}s "
+                f"({rate:.0f}/s): {counts['screened']} passed, {counts['rejected']} rejected")
+
+            if not total:
+                message = "No candidates found to screen"
+            else:
+                message = (f"Screened {total} candidates: {counts['screened']} passed, "
+                           f"{counts['rejected']} below {min_match_score}%")
 
             return {
                 "success": True,
-                "message": f"Screened {screened_count} candidates",
-                "screened_count": screened_count
+                "message": message,
+                "screened_count": counts["screened"],
+                "rejected_count": counts["rejected"],
+                "elapsed_seconds": elapsed,
+                "candidates_per_second": rate
             }
 
         except Exception as e:
@@ -75,9 +96,128 @@ class ScreeningAgent:
             return {
                 "success": False,
                 "message": f"Error during screening: {str(e)}",
-                "screened_count": screened_count
+                "screened_count": counts["screened"],
+                "rejected_count": counts["rejected"]
             }
 
     def get_status(self):
         """Get the current status of the agent"""
         return self.status
+
+    def _screen_single_candidate(self, candidate_id, job_title, job_description, min_match_score=60):
+        """Screen one candidate, e.g. from the candidate detail view"""
+        try:
+            record = db.get_records(ids=[candidate_id])
+            if not record["ids"]:
+                return {"success": False, "message": "Candidate not found"}
+
+            metadata = record["metadatas"][0]
+            profile = self._compile_profile(job_description)
+            result = self._screen_batch(profile, record["documents"], [metadata], min_match_score)[0]
+            if not db.update_candidate(candidate_id, result):
+                return {"success": False, "message": "Failed to save screening result"}
+
+            verdict = "passed" if result["stage"] == "screened" else "did not pass"
+            db.log_activity(self.name, "screen_candidate", "success",
+                            f"{metadata.get('name')} {verdict} screening for {job_title} "
+                            f"with a {result['match_score']}% match")
+            return {
+                "success": True,
+                "message": f"{metadata.get('name')} {verdict} screening ({result['match_score']}% match)",
+                "match_score": result["match_score"]
+            }
+        except Exception as e:
+            db.log_activity(self.name, "error", "failed", str(e))
+            return {"success": False, "message": f"Error during screening: {str(e)}"}
+
+    def _screen_records(self, profile, records, min_match_score, counts):
+        """
+        Score and save a batch of (id, metadata, resume_text) records.
+        Returns the candidates that passed as (id, updated metadata).
+        """
+        ids = [record[0] for record in records]
+        metadatas = [record[1] for record in records]
+        results = self._screen_batch(profile, [record[2] for record in records], metadatas,
+                                     min_match_score)
+        if not db.update_candidates(ids, results):
+            raise RuntimeError("Failed to save screening results")
+
+        passed = []
+        for candidate_id, metadata, result in zip(ids, metadatas, results):
+            counts[result["stage"]] += 1
+            if result["stage"] == "screened":
+                passed.append((candidate_id, dict(metadata, **result)))
+        return passed
+
+    def _compile_profile(self, job_description):
+        """
+        Reduce a job description to what scoring needs: its skills, required
+        ones first, with the column each takes and its weight; one regex
+        finding any of them or the batch separator; and the experience it
+        asks for.
+        """
+        nlp = parser.load_spacy_model()
+        required_text, preferred_text = _split_requirements(job_description)
+        required = parser.extract_skills(required_text, nlp)
+        preferred = [skill for skill in parser.extract_skills(preferred_text, nlp) if skill not in required]
+        skills = required + preferred
+        # Longest first, so "machine learning" wins over any shorter overlap
+        alternation = "|".join(re.escape(skill) for skill in sorted(skills, key=len, reverse=True))
+        return {
+            "skills": skills,
+            # Matched text to column; the separator's -1 starts the next row
+            "vocabulary": dict({skill: i for i, skill in enumerate(skills)}, **{_SEPARATOR: -1}),
+            "weights": np.array([1.0] * len(required) + [PREFERRED_WEIGHT] * len(preferred)),
+            # The separator is one more alternative, which keeps the scan as fast as the skills alone
+            "pattern": re.compile(r"\b(?:" + alternation + "|" + _SEPARATOR + r")\b") if skills else None,
+            "required_experience": parser.extract_experience(job_description)
+        }
+
+    def _encode(self, profile, texts):
+        """
+        (candidates x skills) boolean matrix of which skills each text
+        mentions, from one regex pass over the whole batch
+        """
+        hits = np.zeros((len(texts), len(profile["skills"])), dtype=bool)
+        if profile["pattern"] is None or not texts:
+            return hits
+        found = profile["pattern"].findall(f" {_SEPARATOR} ".join(texts))
+        columns = np.fromiter(map(profile["vocabulary"].__getitem__, found), dtype=np.int64, count=len(found))
+        separators = columns < 0
+        rows = np.cumsum(separators)
+        hits[rows[~separators], columns[~separators]] = True
+        return hits
+
+    def _screen_batch(self, profile, documents, metadatas, min_match_score):
+        """
+        Score a batch of candidates in one pass over a (candidates x skills)
+        matrix. Returns the metadata update for each candidate.
+        """
+        skills = profile["skills"]
+        texts = [(document or "").lower() for document in documents]
+        hits = self._encode(profile, texts)
+        # Resume text is only parsed for candidates sourced without a figure
+        years = [metadata.get("experience_years") for metadata in metadatas]
+        experience = np.array([value if isinstance(value, (int, float)) else parser.extract_experience(text)
+                               for value, text in zip(years, texts)], dtype=np.int32)
+
+        experience_match = experience >= profile["required_experience"]
+        if skills:
+            # Required and preferred hits, weighted, in one matrix product
+            scores = np.round(hits @ profile["weights"] * (100.0 / profile["weights"].sum()), 1)
+        else:
+            # Nothing to compare skills against; experience alone decides
+            scores = np.where(experience_match, 100.0, 0.0)
+        passed = scores >= min_match_score
+
+        results = []
+        for i in range(len(documents)):
+            results.append({
+                "stage": "screened" if passed[i] else "rejected",
+                "match_score": float(scores[i]),
+                "matching_skills": ", ".join(s for s, hit in zip(skills, hits[i]) if hit),
+                "missing_skills": ", ".join(s for s, hit in zip(skills, hits[i]) if not hit),
+                "experience_match": bool(experience_match[i]),
+                "experience_gap": int(max(0, profile["required_experience"] - experience[i]))
+            })
+        return results
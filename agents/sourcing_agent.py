@@ -1,124 +1,279 @@
+import asyncio
 import time
-import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from utils import db, parser
+from utils.ratelimit import TokenBucket
+from agents.connectors import StubConnector
 import random
 
+# Sentinel telling a pipeline stage its upstream is finished
+_DONE = object()
+
+
 class SourcingAgent:
-    def __init__(self):
+    def __init__(self, connectors=None):
         self.name = "Sourcing Agent"
         self.status = "idle"
         self.sources = ["LinkedIn", "Indeed", "Internal Database", "GitHub", "Stack Overflow"]
-    
-    def start(self, job_title, job_description, target_count=5):
-        """Start the sourcing process"""
+        # What to do with a resume that is a near-duplicate of a stored one:
+        # "merge" records the extra source on the stored candidate, "skip" drops it
+        self.near_duplicate_policy = "merge"
+        # One connector per source; the stubs simulate request latency locally
+        self.connectors = connectors or [
+            StubConnector(source, self._simulate_candidate) for source in self.sources
+        ]
+        # Bounded queues between fetch -> parse -> insert apply backpressure
+        # so fast sources can't run ahead of parsing and storage
+        self.queue_size = 50
+        self.parse_workers = 4
+        self.insert_batch_size = 25
+        # Only ask sources for candidates updated since the previous run
+        self.incremental_sync = False
+        self._on_sourced = None
+
+    def start(self, job_title, job_description, target_count=5, on_sourced=None):
+        """
+        Start the sourcing process. `on_sourced(records)` is called with each
+        batch of newly stored candidates as (id, metadata, resume_text), so a
+        downstream stage can start on them right away.
+        """
         self.status = "running"
+        self._on_sourced = on_sourced
         db.log_activity(self.name, "start", "success", f"Started sourcing for {job_title}")
-        
-        # In a real implementation, this would use APIs or web scraping to source candidates
-        # For this demo, we'll simulate the process
-        
-        sourced_count = 0
-        
+
+        # In a real implementation, connectors would call job board APIs
+        # For this demo, stub connectors simulate them
+
+        counts = {"sourced": 0, "duplicates": 0, "failed": 0}
+        started = time.perf_counter()
+
         try:
-            for i in range(target_count):
-                # Simulate API delay
-                time.sleep(0.5)
-                
-                # Generate a simulated candidate
-                candidate = self._simulate_candidate(job_title, job_description)
-                
-                # Parse the simulated resume
-                resume_data = parser.parse_resume(candidate["resume"])
-                
-                # Add to database
-                candidate_id = db.add_candidate(
-                    name=resume_data["name"],
-                    email=resume_data["email"],
-                    source=candidate["source"],
-                    resume_text=candidate["resume"],
-                    metadata={
-                        "stage": "sourced",
-                        "job_title": job_title,
-                        "skills": resume_data["skills"],
-                        "experience_years": resume_data["experience_years"]
-                    }
-                )
-                
-                if candidate_id:
-                    sourced_count += 1
-                    db.log_activity(self.name, "source_candidate", "success", 
-                                   f"Sourced candidate {resume_data['name']} from {candidate['source']}")
-                else:
-                    db.log_activity(self.name, "source_candidate", "failed", 
-                                   f"Failed to add candidate to database")
-            
+            asyncio.run(self._source(job_title, job_description, target_count, counts))
+            elapsed = time.perf_counter() - started
+
             self.status = "idle"
-            db.log_activity(self.name, "complete", "success", 
-                           f"Completed sourcing with {sourced_count} candidates for {job_title}")
-            
+            # Duplicates merged into stored candidates don't count toward the target
+            shortfall = max(0, target_count - counts["sourced"])
+            summary = f"{counts['sourced']} new candidates ({counts['duplicates']} duplicates merged)"
+            if shortfall:
+                summary += f", {shortfall} short of the {target_count} requested"
+            db.log_activity(self.name, "complete", "partial" if shortfall else "success",
+                           f"Completed sourcing with {summary} for {job_title} in {elapsed:.1f}s")
+
             return {
                 "success": True,
-                "message": f"Successfully sourced {sourced_count} candidates",
-                "candidates_count": sourced_count
+                "message": f"Successfully sourced {summary}",
+                "candidates_count": counts["sourced"],
+                "duplicates_count": counts["duplicates"],
+                "shortfall": shortfall,
+                "elapsed_seconds": elapsed
             }
-            
+
         except Exception as e:
             self.status = "error"
             db.log_activity(self.name, "error", "failed", str(e))
-            
+
             return {
                 "success": False,
                 "message": f"Error during sourcing: {str(e)}",
-                "candidates_count": sourced_count
+                "candidates_count": counts["sourced"],
+                "duplicates_count": counts["duplicates"]
             }
-    
+
     def get_status(self):
         """Get the current status of the agent"""
         return self.status
-    
-    def _simulate_candidate(self, job_title, job_description):
+
+    async def _source(self, job_title, job_description, target_count, counts):
+        """Fan out across connectors and stream candidates through parse and insert stages"""
+        raw_queue = asyncio.Queue(maxsize=self.queue_size)
+        parsed_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        # Spread the target evenly so total time tracks the slowest source
+        quotas = [target_count // len(self.connectors)] * len(self.connectors)
+        for i in range(target_count % len(self.connectors)):
+            quotas[i] += 1
+
+        with ThreadPoolExecutor(max_workers=self.parse_workers + 1) as executor:
+            fetchers = [asyncio.create_task(self._fetch(connector, quota, job_title, job_description, raw_queue))
+                        for connector, quota in zip(self.connectors, quotas) if quota]
+            parsers = [asyncio.create_task(self._parse(raw_queue, parsed_queue, executor, job_title, counts))
+                       for _ in range(self.parse_workers)]
+            inserter = asyncio.create_task(self._insert(parsed_queue, executor, counts))
+
+            async def feed():
+                counts["failed"] += sum(await asyncio.gather(*fetchers))
+                for _ in parsers:
+                    await raw_queue.put(_DONE)
+                await asyncio.gather(*parsers)
+                await parsed_queue.put(_DONE)
+
+            feeder = asyncio.create_task(feed())
+            try:
+                # If inserting fails, parsers would block on a full queue; stop at the first error
+                await asyncio.wait([feeder, inserter], return_when=asyncio.FIRST_EXCEPTION)
+                if inserter.done():
+                    inserter.result()
+                await feeder
+                await inserter
+            finally:
+                for task in fetchers + parsers + [feeder, inserter]:
+                    task.cancel()
+
+        if fetchers and counts["failed"] == len(fetchers):
+            raise RuntimeError("All sources failed")
+
+    async def _fetch(self, connector, quota, job_title, job_description, raw_queue):
+        """Page through one source within its rate limit; returns the number of failed requests"""
+        bucket = TokenBucket(connector.rate_limit)
+        since = connector.high_water.get(job_title) if self.incremental_sync else None
+        try:
+            # Waiting on the queue while parsing is behind pauses paging
+            async for candidate in connector.iter_candidates(job_title, job_description, quota,
+                                                             since=since, rate_limiter=bucket):
+                await raw_queue.put(candidate)
+            return 0
+        except Exception as e:
+            db.log_activity(self.name, "source_candidate", "failed",
+                           f"{connector.name}: {str(e)}")
+            return 1
+        finally:
+            await connector.close()
+
+    async def _parse(self, raw_queue, parsed_queue, executor, job_title, counts):
+        """Drop known and near-duplicate candidates, parse the rest"""
+        loop = asyncio.get_running_loop()
+        while True:
+            candidate = await raw_queue.get()
+            if candidate is _DONE:
+                return
+            parsed = await loop.run_in_executor(executor, self._parse_candidate, candidate, job_title)
+            if parsed is None:
+                counts["duplicates"] += 1
+            else:
+                await parsed_queue.put(parsed)
+
+    def _parse_candidate(self, candidate, job_title):
+        # Skip parsing people already in the pipeline; just remember the new source
+        email = parser.extract_email(candidate["resume"])
+        if db.find_candidate(email=email):
+            db.upsert_candidate(None, email, candidate["source"], candidate["resume"])
+            db.log_activity(self.name, "source_candidate", "skipped",
+                           f"{email} already in pipeline, merged source {candidate['source']}")
+            return None
+
+        # Parse the simulated resume
+        resume_data = parser.parse_resume(candidate["resume"])
+
+        # The same resume often arrives from several sources with small edits
+        near_duplicates = db.find_near_duplicates(candidate["resume"], name=resume_data["name"], limit=1)
+        if near_duplicates:
+            duplicate_id, similarity = near_duplicates[0]
+            if self.near_duplicate_policy == "merge":
+                db.merge_candidate(duplicate_id, candidate["source"])
+            db.log_activity(self.name, "source_candidate", "skipped",
+                           f"{resume_data['name']} from {candidate['source']} is a near-duplicate "
+                           f"({similarity:.0%}) of an existing candidate")
+            return None
+
+        return {
+            "name": resume_data["name"],
+            "email": resume_data["email"],
+            "source": candidate["source"],
+            "resume_text": candidate["resume"],
+            "metadata": {
+                "stage": "sourced",
+                "job_title": job_title,
+                "skills": resume_data["skills"],
+                "experience_years": resume_data["experience_years"]
+            }
+        }
+
+    async def _insert(self, parsed_queue, executor, counts):
+        """Upsert parsed candidates in batches"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        done = False
+        while not done:
+            item = await parsed_queue.get()
+            if item is _DONE:
+                done = True
+            else:
+                batch.append(item)
+                # Take whatever else is already waiting, up to a full batch
+                while len(batch) < self.insert_batch_size and not parsed_queue.empty():
+                    item = parsed_queue.get_nowait()
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+            if batch:
+                await loop.run_in_executor(executor, self._insert_batch, batch, counts)
+                batch = []
+
+    def _insert_batch(self, batch, counts):
+        results = db.add_candidates(batch)
+        entries = []
+        records = []
+        for candidate, (candidate_id, created) in zip(batch, results):
+            if created:
+                counts["sourced"] += 1
+                entries.append((self.name, "source_candidate", "success",
+                                f"Sourced candidate {candidate['name']} from {candidate['source']}"))
+                records.append((candidate_id,
+                                dict(candidate["metadata"], name=candidate["name"],
+                                     email=candidate["email"], source=candidate["source"]),
+                                candidate["resume_text"]))
+            else:
+                counts["duplicates"] += 1
+        if entries:
+            db.log_activities(entries)
+        if records and self._on_sourced is not None:
+            self._on_sourced(records)
+
+    def _simulate_candidate(self, job_title, job_description, source=None):
         """
         Simulate a candidate for demo purposes
         In a real implementation, this would be replaced with actual API calls
         """
-        source = random.choice(self.sources)
-        
+        source = source or random.choice(self.sources)
+
         # Extract skills mentioned in job description to make the simulation more relevant
         skills = parser.extract_skills(job_description)
-        
+
         # Pick a subset of relevant skills for this candidate
         candidate_skills = random.sample(skills, min(len(skills), random.randint(1, 5)))
-        
+
         # Common first and last names for simulation
         first_names = ["John", "Jane", "Michael", "Sarah", "David", "Lisa", "Robert", "Emily"]
         last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia"]
-        
+
         name = f"{random.choice(first_names)} {random.choice(last_names)}"
         email = f"{name.lower().replace(' ', '.')}@example.com"
-        
+
         # Create a simulated resume text
         experience_years = random.randint(1, 10)
         resume = f"""
         {name}
         {email}
-        
+
         Summary:
         Experienced professional with {experience_years} years of experience in {job_title} roles.
-        
+
         Skills:
         {', '.join(candidate_skills)}
-        
+
         Experience:
         - Senior {job_title} at Example Corp (2018-Present)
           Led teams and delivered successful projects
-          
+
         - {job_title} at Sample Inc (2015-2018)
           Developed and implemented solutions
-          
+
         Education:
         - Bachelor's Degree in Computer Science, Example University
         """
-        
+
         return {
             "source": source,
             "resume": resume
@@ -0,0 +1,101 @@
+"""
+Compare batch interview assignment with greedy first-fit.
+
+    python -m benchmarks.bench_assignment --candidates 1000 --interviewers 1000 --slots 10
+
+Interviewers have a few skills and a time zone; candidates apply to jobs
+with different skill sets from different time zones. With `--slots`
+slots per interviewer the batch solver works on a candidates x
+(interviewers * slots) matrix, e.g. 1k x 10k.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from utils import state
+from utils.scheduler import InterviewScheduler, _job_skills
+
+SKILLS = ["python", "java", "javascript", "sql", "react", "django", "aws", "docker",
+          "kubernetes", "machine learning", "data science", "agile"]
+ZONES = ["UTC", "Europe/Berlin", "America/New_York", "Asia/Kolkata"]
+
+
+def build(args, rng):
+    interviewers = [f"interviewer-{i}" for i in range(args.interviewers)]
+    profiles = {name: {"skills": rng.sample(SKILLS, 3), "timezone": rng.choice(ZONES[:2])}
+                for name in interviewers}
+    jobs = [rng.sample(SKILLS, 4) for _ in range(10)]
+    candidates = []
+    for i in range(args.candidates):
+        skills = rng.choice(jobs)
+        candidates.append((f"candidate-{i}", {
+            "matching_skills": ", ".join(skills[:2]),
+            "missing_skills": ", ".join(skills[2:]),
+            "timezone": rng.choice(ZONES)
+        }))
+    return interviewers, profiles, candidates
+
+
+def evaluate(scheduler, bookings, candidates, first_slot):
+    """Mean delay in slots, mean skill coverage, interviews outside local hours"""
+    delays, coverage, outside = [], [], 0
+    names = list(scheduler.interviewers.resources)
+    index = {name: i for i, name in enumerate(names)}
+    for candidate_id, metadata in candidates:
+        booking = bookings.get(candidate_id)
+        if booking is None:
+            continue
+        delays.append(booking.slot - first_slot)
+        coverage.append(scheduler._coverage(_job_skills(metadata), names)[index[booking.interviewer]])
+        hour = scheduler._local_hours([booking.slot], metadata["timezone"])[0]
+        if not scheduler.CANDIDATE_HOURS[0] <= hour < scheduler.CANDIDATE_HOURS[1]:
+            outside += 1
+    count = len(delays) or 1
+    return sum(delays) / count, sum(coverage) / count, outside
+
+
+def run(args, batch):
+    rng = random.Random(args.seed)
+    interviewers, profiles, candidates = build(args, rng)
+    rooms = [f"room-{i}" for i in range(args.rooms)]
+    not_before = datetime(2025, 1, 6, 9)
+
+    with tempfile.TemporaryDirectory() as directory:
+        state.set_state_path(os.path.join(directory, "state.db"))
+        scheduler = InterviewScheduler(interviewers, rooms, profiles=profiles)
+        first_slot = scheduler.calendar.slot_at_or_after(not_before)
+        started = time.perf_counter()
+        if batch:
+            bookings = scheduler.schedule_batch(candidates, "job", not_before=not_before,
+                                                max_columns=args.interviewers * args.slots)
+        else:
+            bookings = scheduler.schedule([candidate_id for candidate_id, _ in candidates], "job",
+                                          not_before=not_before)
+        elapsed = time.perf_counter() - started
+        state.close_connection()
+
+    delay, coverage, outside = evaluate(scheduler, bookings, candidates, first_slot)
+    return len(bookings), elapsed, delay, coverage, outside
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--candidates", type=int, default=1000)
+    arg_parser.add_argument("--interviewers", type=int, default=1000)
+    arg_parser.add_argument("--slots", type=int, default=10)
+    arg_parser.add_argument("--rooms", type=int, default=1000)
+    arg_parser.add_argument("--seed", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    print(f"{args.candidates} candidates x {args.interviewers * args.slots} interviewer slots")
+    for label, batch in (("first-fit", False), ("batch", True)):
+        placed, elapsed, delay, coverage, outside = run(args, batch)
+        print(f"  {label:<9} {elapsed:6.2f} s  {placed:5d} placed  mean delay {delay:5.2f} slots  "
+              f"skill coverage {coverage:4.0%}  {outside} outside candidate hours")
+
+
+if __name__ == "__main__":
+    main()
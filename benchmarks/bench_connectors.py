@@ -0,0 +1,86 @@
+"""
+Measure job-board connector throughput against local stand-in servers.
+
+    python -m benchmarks.bench_connectors --sources 5 --per-source 1000 --latency 0.05
+
+Compares connection reuse (keep-alive) and pagination prefetching with
+every source fetched concurrently, as the sourcing agent does.
+"""
+import argparse
+import asyncio
+import time
+
+from agents.connectors import HttpJobBoardConnector
+from utils.ratelimit import TokenBucket
+from utils.stub_server import start_job_boards
+
+
+async def _drain(connector, limit, rate_limit, prefetch, downstream_delay):
+    bucket = TokenBucket(rate_limit)
+    count = 0
+    try:
+        async for _ in connector.iter_candidates("Software Engineer", "", limit,
+                                                 rate_limiter=bucket, prefetch=prefetch):
+            count += 1
+            if downstream_delay:
+                await asyncio.sleep(downstream_delay)
+    finally:
+        await connector.close()
+    return count
+
+
+def run(servers, per_source, page_size, keep_alive, prefetch, rate_limit, downstream_delay):
+    connectors = [HttpJobBoardConnector(name, server.url, page_size=page_size,
+                                        keep_alive=keep_alive, rate_limit=rate_limit)
+                  for name, server in servers.items()]
+
+    async def fetch_all():
+        return await asyncio.gather(*(_drain(c, per_source, rate_limit, prefetch, downstream_delay)
+                                      for c in connectors))
+
+    started = time.perf_counter()
+    counts = asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - started
+    return {
+        "items": sum(counts),
+        "seconds": elapsed,
+        "items_per_second": sum(counts) / elapsed if elapsed else 0.0,
+        "requests": sum(c.stats["requests"] for c in connectors),
+        "connections": sum(c.stats["connections_opened"] for c in connectors),
+        "errors": sum(c.stats["errors"] for c in connectors)
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--sources", type=int, default=5)
+    arg_parser.add_argument("--per-source", type=int, default=1000)
+    arg_parser.add_argument("--page-size", type=int, default=50)
+    arg_parser.add_argument("--latency", type=float, default=0.05)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--rate-limit", type=float, default=100.0)
+    arg_parser.add_argument("--downstream-ms", type=float, default=0.5,
+                            help="simulated per-candidate processing time downstream")
+    args = arg_parser.parse_args()
+
+    names = [f"board-{i}" for i in range(args.sources)]
+    servers = start_job_boards(names, total=args.per_source, latency=args.latency,
+                               error_rate=args.error_rate)
+    try:
+        print(f"{args.sources} sources x {args.per_source} candidates, "
+              f"page size {args.page_size}, latency {args.latency * 1000:.0f} ms")
+        for keep_alive in (False, True):
+            for prefetch in (False, True):
+                result = run(servers, args.per_source, args.page_size, keep_alive, prefetch,
+                             args.rate_limit, args.downstream_ms / 1000)
+                print(f"  keep_alive={keep_alive!s:<5} prefetch={prefetch!s:<5} "
+                      f"{result['items_per_second']:9.0f} items/s  {result['seconds']:6.2f} s  "
+                      f"{result['requests']:5d} requests  {result['connections']:5d} connections  "
+                      f"{result['errors']} errors")
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure LLM generation throughput against the local stand-in inference server.
+
+    python -m benchmarks.bench_llm --prompts 200 --latency 0.2 --tokens-per-second 50
+
+Generates outreach emails the way the engagement agent does, one request
+per prompt over a thread pool and then as batched requests, with the
+response cache off so every prompt reaches the server.
+"""
+import argparse
+import time
+
+from utils.llm import ClientPool, MODELS
+from utils.stub_server import InferenceServer
+
+
+def _prompts(count):
+    return [f"""
+        Write a short, professional email to engage a potential job candidate.
+        Address the candidate as [CANDIDATE_NAME].
+        Job title: Software Engineer
+        Candidate skills that match the job: skill-{i}, python
+        """ for i in range(count)]
+
+
+def run(server, prompts, batched, concurrency):
+    model = ClientPool().get(models=MODELS[:1], backend="http", endpoint=server.url)
+    requests_before, tokens_before = server.stats["requests"], server.stats["tokens"]
+    started = time.perf_counter()
+    if batched:
+        responses = model.generate_batch(prompts, max_concurrency=concurrency)
+    else:
+        responses = model._concurrent_requests(prompts, concurrency, None)
+    elapsed = time.perf_counter() - started
+    return {
+        "responses": sum(1 for response in responses if response),
+        "seconds": elapsed,
+        "prompts_per_second": len(prompts) / elapsed if elapsed else 0.0,
+        "requests": server.stats["requests"] - requests_before,
+        "tokens": server.stats["tokens"] - tokens_before
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--prompts", type=int, default=200)
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="seconds to the first token")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    arg_parser.add_argument("--server-concurrency", type=int, default=4,
+                            help="requests the server generates at once")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    args = arg_parser.parse_args()
+
+    server = InferenceServer(tokens_per_second=args.tokens_per_second, concurrency=args.server_concurrency,
+                             latency=args.latency).start()
+    try:
+        prompts = _prompts(args.prompts)
+        print(f"{args.prompts} prompts, latency {args.latency * 1000:.0f} ms, "
+              f"{args.tokens_per_second:.0f} tokens/s, server concurrency {args.server_concurrency}")
+        for batched in (False, True):
+            result = run(server, prompts, batched, args.concurrency)
+            print(f"  batched={batched!s:<5} {result['prompts_per_second']:8.1f} prompts/s  "
+                  f"{result['seconds']:6.2f} s  {result['requests']:4d} requests  "
+                  f"{result['responses']} responses  {result['tokens']} tokens")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
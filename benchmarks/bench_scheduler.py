@@ -0,0 +1,59 @@
+"""
+Measure interview slot allocation with many interviewers and bookings.
+
+    python -m benchmarks.bench_scheduler --interviewers 2000 --rooms 400 --bookings 50000
+
+Bookings are made in bulk batches (one transaction each, as the scheduling
+agent does) against a temporary state database, then checked for double
+bookings.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from utils import state
+from utils.scheduler import InterviewScheduler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--interviewers", type=int, default=2000)
+    arg_parser.add_argument("--rooms", type=int, default=400)
+    arg_parser.add_argument("--bookings", type=int, default=50000)
+    arg_parser.add_argument("--batch", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        state.set_state_path(os.path.join(directory, "state.db"))
+        scheduler = InterviewScheduler([f"interviewer-{i}" for i in range(args.interviewers)],
+                                       [f"room-{i}" for i in range(args.rooms)])
+        not_before = datetime(2025, 1, 6, 9)
+
+        started = time.perf_counter()
+        for offset in range(0, args.bookings, args.batch):
+            ids = [f"candidate-{i}" for i in range(offset, min(offset + args.batch, args.bookings))]
+            scheduler.schedule(ids, f"job-{offset // args.batch % 20}", not_before=not_before)
+        elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reloaded = InterviewScheduler(list(scheduler.interviewers.resources), list(scheduler.rooms.resources))
+        reloaded.get_booking("candidate-0")
+        reload_seconds = time.perf_counter() - started
+
+        connection = state.get_connection()
+        clashes = connection.execute(
+            "SELECT COUNT(*) FROM (SELECT interviewer, slot FROM bookings GROUP BY interviewer, slot "
+            "HAVING COUNT(*) > 1)").fetchone()[0]
+        last_slot = connection.execute("SELECT MAX(start) FROM bookings").fetchone()[0]
+        state.close_connection()
+
+    print(f"{args.bookings} bookings over {args.interviewers} interviewers and {args.rooms} rooms")
+    print(f"  allocate: {elapsed:6.2f} s  {args.bookings / elapsed:9.0f} bookings/s")
+    print(f"  reload:   {reload_seconds:6.2f} s")
+    print(f"  last interview {last_slot}, {clashes} double bookings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Run the same candidate workload against each storage backend.
+
+    python -m benchmarks.bench_storage --records 20000
+    python -m benchmarks.bench_storage --backend memory --records 200000
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from utils import db
+from utils.storage import ChromaBackend, MemoryBackend
+
+JOB_TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer"]
+STAGES = ["sourced", "screened", "engaged", "scheduled"]
+SOURCES = ["LinkedIn", "Indeed", "Internal Database", "GitHub", "Stack Overflow"]
+
+
+def _records(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield (
+            f"cand-{i}",
+            {
+                "name": f"Candidate {i}",
+                "email": f"candidate.{i}@example.com",
+                "source": rng.choice(SOURCES),
+                "job_title": rng.choice(JOB_TITLES),
+                "stage": rng.choices(STAGES, weights=[0.4, 0.3, 0.2, 0.1])[0],
+                "experience_years": rng.randint(0, 15)
+            },
+            f"Candidate {i}\ncandidate.{i}@example.com\nResume text for candidate {i}"
+        )
+
+
+def _timed(label, fn, results):
+    start = time.perf_counter()
+    value = fn()
+    results.append((label, time.perf_counter() - start))
+    return value
+
+
+def run_workload(backend, count, batch_size=1000, seed=7):
+    """Load, patch, query and aggregate `count` candidates; return (label, seconds) pairs"""
+    db.set_backend(backend)
+    results = []
+
+    def load():
+        batch = []
+        for record in _records(count, seed):
+            batch.append(record)
+            if len(batch) == batch_size:
+                backend.add(db.CANDIDATE_COLLECTION, *map(list, zip(*batch)))
+                batch = []
+        if batch:
+            backend.add(db.CANDIDATE_COLLECTION, *map(list, zip(*batch)))
+
+    def patch():
+        page = backend.query(db.CANDIDATE_COLLECTION, where={"stage": "sourced"}, limit=count // 10)
+        backend.patch(db.CANDIDATE_COLLECTION, page["ids"],
+                      [{"stage": "screened", "match_score": 70}] * len(page["ids"]))
+        return len(page["ids"])
+
+    def query():
+        return sum(len(backend.query(db.CANDIDATE_COLLECTION,
+                                     where={"job_title": title, "stage": "screened"})["ids"])
+                   for title in JOB_TITLES)
+
+    def iterate():
+        return sum(len(page["ids"]) for page in backend.iterate(db.CANDIDATE_COLLECTION))
+
+    def aggregate():
+        return backend.aggregate(db.CANDIDATE_COLLECTION, "stage")
+
+    def cached_group_counts():
+        for _ in range(100):
+            db.group_counts("stage")
+
+    _timed("add", load, results)
+    _timed("patch", patch, results)
+    _timed("query", query, results)
+    _timed("iterate", iterate, results)
+    _timed("aggregate", aggregate, results)
+    _timed("group_counts x100 (cached)", cached_group_counts, results)
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--records", type=int, default=20000)
+    arg_parser.add_argument("--batch-size", type=int, default=1000)
+    arg_parser.add_argument("--backend", choices=["memory", "chroma", "all"], default="all")
+    args = arg_parser.parse_args()
+
+    backends = []
+    if args.backend in ("memory", "all"):
+        backends.append(("memory", MemoryBackend, None))
+    if args.backend in ("chroma", "all"):
+        backends.append(("chroma", ChromaBackend, tempfile.mkdtemp(prefix="bench_chroma_")))
+
+    for name, factory, path in backends:
+        try:
+            backend = factory(path) if path else factory()
+        except Exception as e:
+            print(f"{name}: unavailable ({e})")
+            continue
+        try:
+            results = run_workload(backend, args.records, args.batch_size)
+        finally:
+            if path:
+                shutil.rmtree(path, ignore_errors=True)
+        print(f"\n{name} backend, {args.records} records")
+        for label, seconds in results:
+            print(f"  {label:<28} {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Headless pipeline runs, without Streamlit:
+
+    python cli.py --job "Python Developer" --description-file jd.txt --count 50
+    python cli.py --jobs-file nightly.json --workers 8 --config talentcrew.json
+
+Storage, the state database and pipeline options come from the command
+line or a JSON config file, never from session state. With --workers,
+jobs are spread over that many processes, each running its jobs through
+its own PipelineRunner, so leases, checkpoints and the status registry
+work exactly as they do for runs started from the app.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Headless, Streamlit's "missing ScriptRunContext" warnings are just noise.
+# Set before anything imports Streamlit; worker processes inherit it
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+DEFAULTS = {
+    "backend": "chroma",
+    "chroma_path": "./chroma_db",
+    "state_db": None,
+    "workers": 1,
+    "streaming": True,
+    "min_match_score": 60,
+    "queue_size": 8,
+    "wait": False
+}
+
+
+def load_config(path):
+    """Settings from a JSON file; unknown keys are rejected"""
+    with open(path) as f:
+        config = json.load(f)
+    unknown = set(config) - set(DEFAULTS) - {"jobs"}
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+    return config
+
+
+def load_jobs(path):
+    """Jobs from a JSON list or JSON Lines file of {"title", "description", "candidate_count"}"""
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def _init_worker(config):
+    """Point this process at the configured storage and state database"""
+    from utils import db, state
+
+    if config["state_db"]:
+        state.set_state_path(config["state_db"])
+    if config["backend"] == "memory":
+        from utils.storage import MemoryBackend
+        db.initialize_db(backend=MemoryBackend())
+    elif not db.initialize_db(config["chroma_path"]):
+        raise RuntimeError(f"Could not open Chroma storage at {config['chroma_path']}")
+
+
+def _run_job(job, config):
+    """Run one job (or resume one run) to completion in this process; returns its snapshot"""
+    from utils.runner import get_runner
+
+    runner = get_runner()
+    options = {"streaming": config["streaming"], "min_match_score": config["min_match_score"],
+               "queue_size": config["queue_size"]}
+    if "resume" in job:
+        run_id = runner.resume(job["resume"], wait=config["wait"], **options)
+        label = job["resume"]
+    else:
+        run_id = runner.submit(job["title"], job["description"], job.get("candidate_count", 5),
+                               wait=config["wait"], **options)
+        label = job["title"]
+    if run_id is None:
+        return {"job_title": label, "status": "skipped", "results": {},
+                "error": "already running elsewhere, finished, or unknown"}
+    return runner.wait(run_id)
+
+
+def run_jobs(jobs, config, on_finished=None):
+    """Run `jobs`, in parallel processes if config["workers"] > 1. Returns run snapshots"""
+    if config["workers"] <= 1:
+        _init_worker(config)
+        runs = []
+        for job in jobs:
+            runs.append(_run_job(job, config))
+            if on_finished:
+                on_finished(runs[-1])
+        return runs
+
+    runs = []
+    with ProcessPoolExecutor(max_workers=config["workers"], initializer=_init_worker,
+                             initargs=(config,)) as executor:
+        futures = [executor.submit(_run_job, job, config) for job in jobs]
+        for future in as_completed(futures):
+            runs.append(future.result())
+            if on_finished:
+                on_finished(runs[-1])
+    return runs
+
+
+def stage_throughput(runs):
+    """
+    Per stage across all runs: items handled, busy seconds (time spent
+    working rather than waiting on upstream) and items per busy second.
+    """
+    from agents.pipeline import STAGES, processed_count
+
+    totals = {}
+    for stage in STAGES:
+        processed, busy = 0, 0.0
+        for run in runs:
+            result = run["results"].get(stage)
+            if result is None:
+                continue
+            processed += processed_count(stage, result)
+            busy += result.get("busy_seconds") or 0.0
+        totals[stage] = {
+            "processed": processed,
+            "busy_seconds": busy,
+            "per_second": processed / busy if busy else 0.0
+        }
+    return totals
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the recruitment pipeline without the web app")
+    jobs = parser.add_argument_group("jobs")
+    jobs.add_argument("--job", help="job title to run")
+    jobs.add_argument("--description", help="job description text")
+    jobs.add_argument("--description-file", help="file holding the job description")
+    jobs.add_argument("--count", type=int, default=5, help="candidates to source for --job")
+    jobs.add_argument("--jobs-file", help="JSON or JSON Lines file of jobs to run")
+    jobs.add_argument("--resume", action="append", default=[], metavar="RUN_ID",
+                      help="resume a stopped run from its last checkpoint (repeatable)")
+
+    settings = parser.add_argument_group("settings (override --config)")
+    settings.add_argument("--config", help="JSON file with any of: " + ", ".join(DEFAULTS) + ", jobs")
+    settings.add_argument("--backend", choices=["chroma", "memory"])
+    settings.add_argument("--chroma-path")
+    settings.add_argument("--state-db", help="shared state database (default: $TALENTCREW_STATE_DB)")
+    settings.add_argument("--workers", type=int, help="processes to spread jobs over")
+    settings.add_argument("--staged", dest="streaming", action="store_false", default=None,
+                          help="run each stage to completion before the next")
+    settings.add_argument("--min-match-score", type=float)
+    settings.add_argument("--queue-size", type=int)
+    settings.add_argument("--wait", action="store_true", default=None,
+                          help="queue jobs whose runs are locked elsewhere instead of skipping them")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    config = dict(DEFAULTS)
+    jobs = []
+    if args.config:
+        file_config = load_config(args.config)
+        jobs.extend(file_config.pop("jobs", []))
+        config.update(file_config)
+    for key in DEFAULTS:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    if config["backend"] == "memory" and config["workers"] > 1:
+        print("note: with the memory backend every worker process has its own store", file=sys.stderr)
+
+    if args.jobs_file:
+        jobs.extend(load_jobs(args.jobs_file))
+    if args.job:
+        description = args.description
+        if args.description_file:
+            with open(args.description_file) as f:
+                description = f.read()
+        if not description:
+            build_parser().error("--job needs --description or --description-file")
+        jobs.append({"title": args.job, "description": description, "candidate_count": args.count})
+    jobs.extend({"resume": run_id} for run_id in args.resume)
+    if not jobs:
+        build_parser().error("nothing to run: give --job, --jobs-file, --resume or jobs in --config")
+
+    def report(run):
+        if not args.json:
+            seconds = (run.get("finished_at") or 0) - (run.get("started_at") or 0)
+            print(f"{run['job_title']}: {run['status']}"
+                  + (f" in {seconds:.1f}s (run {run['id']})" if run.get("id") else "")
+                  + (f" - {run['error']}" if run.get("error") else ""))
+            sourcing = (run.get("results") or {}).get("sourcing") or {}
+            if sourcing.get("shortfall"):
+                print(f"  sourcing: {sourcing['message']}")
+
+    started = time.perf_counter()
+    runs = run_jobs(jobs, config, on_finished=report)
+    wall = time.perf_counter() - started
+    throughput = stage_throughput(runs)
+
+    if args.json:
+        print(json.dumps({"wall_seconds": wall, "stages": throughput, "runs": runs}, indent=2, default=str))
+    else:
+        print(f"\n{len(runs)} job(s) in {wall:.1f}s")
+        print(f"{'stage':<12}{'processed':>10}{'busy s':>10}{'per s':>10}")
+        for stage, totals in throughput.items():
+            print(f"{stage:<12}{totals['processed']:>10}{totals['busy_seconds']:>10.1f}"
+                  f"{totals['per_second']:>10.1f}")
+
+    return 0 if all(run["status"] == "completed" for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
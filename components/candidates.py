@@ -8,13 +8,9 @@ def render(view="All Candidates"):
     """
     st.title("Candidates")
     
-    # Get the candidates from the database
-    client = st.session_state.chroma_client
-    collection = client.get_collection(db.CANDIDATE_COLLECTION)
-    
     # Query the database based on the selected view
     if view == "All Candidates":
-        results = collection.get()
+        results = db.get_records()
     else:
         # Map view names to stages in the database
         stage_map = {
@@ -25,9 +21,7 @@ def render(view="All Candidates"):
         }
         
         # Query based on the stage
-        results = collection.get(
-            where={"stage": stage_map[view]}
-        )
+        results = db.get_records(where={"stage": stage_map[view]})
     
     if not results or 'metadatas' not in results or not results['metadatas']:
         st.info(f"No candidates found in {view.lower()} stage.")
@@ -145,7 +139,7 @@ def render(view="All Candidates"):
             st.write("**Resume**")
             
             # Get the resume text for this candidate
-            result = collection.get(ids=[candidate_id])
+            result = db.get_records(ids=[candidate_id])
             if result and 'documents' in result and result['documents']:
                 resume_text = result['documents'][0]
                 st.text_area("", value=resume_text, height=400, label_visibility="collapsed")
@@ -1,6 +1,7 @@
+import textwrap
+
 import streamlit as st
 from utils import llm, db
-import time
 
 
 def render():
@@ -36,9 +37,6 @@ def render():
 
         # Generate response
         with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
-
             lower_prompt = prompt.lower()
 
             # Handle known commands
@@ -69,6 +67,22 @@ def render():
                 ])
                 response = f"Here are the number of candidates per open role:\n\n{role_summary}"
 
+            elif "candidates" in lower_prompt and "source" in lower_prompt:
+                source_data = db.group_counts("source")
+                source_summary = "\n".join([
+                    f"- {source}: {count} candidate(s)"
+                    for source, count in source_data.items()
+                ])
+                response = f"Here are the number of candidates per source:\n\n{source_summary}"
+
+            elif "candidates" in lower_prompt and "experience" in lower_prompt:
+                band_data = db.group_counts("experience_band")
+                band_summary = "\n".join([
+                    f"- {band}: {count} candidate(s)"
+                    for band, count in sorted(band_data.items())
+                ])
+                response = f"Here are the number of candidates per experience band:\n\n{band_summary}"
+
             elif "candidates" in lower_prompt:
                    
                     candidates = db.get_candidates()
@@ -78,7 +92,7 @@ def render():
                         candidate_list = []
                         for idx, c in enumerate(candidates, start=1):
                             item = (
-                                f"{idx}. {c.get('name', 'N/A')} - {c.get('role', 'N/A')} - "
+                                f"{idx}. {c.get('name', 'N/A')} - {c.get('job_title', 'N/A')} - "
                                 f"{c.get('stage', 'N/A')} - {c.get('status', 'N/A')} - "
                                 f"Engagement: {c.get('engagement_score', 'N/A')} - "
                                 f"Next: {c.get('next_step', 'N/A')}"
@@ -88,28 +102,27 @@ def render():
 
 
             elif prompt.lower().startswith(("sourcing", "source")):
-                response = llm.get_agent_response("sourcing", prompt)
+                response = llm.stream_agent_response("sourcing", prompt)
 
             elif prompt.lower().startswith(("screening", "screen")):
-                response = llm.get_agent_response("screening", prompt)
+                response = llm.stream_agent_response("screening", prompt)
 
             elif prompt.lower().startswith(("engagement", "engage")):
-                response = llm.get_agent_response("engagement", prompt)
+                response = llm.stream_agent_response("engagement", prompt)
 
             elif prompt.lower().startswith(("scheduling", "schedule")):
-                response = llm.get_agent_response("scheduling", prompt)
+                response = llm.stream_agent_response("scheduling", prompt)
 
             else:
                 # Handle unknown/random queries
                 response = "Sorry, I don’t have information about that."
 
-            # Simulate typing effect
-            for chunk in response.split():
-                full_response += chunk + " "
-                message_placeholder.markdown(full_response + "▌")
-                time.sleep(0.03)
-
-            message_placeholder.markdown(full_response)
+            if isinstance(response, str):
+                full_response = textwrap.dedent(response).strip()
+                st.markdown(full_response)
+            else:
+                # Agent answers are shown token by token as the model produces them
+                full_response = st.write_stream(response)
 
         # Add assistant response to chat history
         st.session_state.messages.append({
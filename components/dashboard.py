@@ -3,34 +3,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from utils import db
-from agents import sourcing_agent, screening_agent, engagement_agent, scheduling_agent
+from components import runs
 
 def render():
     st.title("TalentCrew Dashboard")
     
-    # Status indicators for agents
+    # Status indicators for agents, across every session and process
     st.subheader("Agent Status")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        sourcing_status = st.session_state.sourcing_agent.get_status()
-        status_color = "🟢" if sourcing_status == "idle" else "🔴" if sourcing_status == "error" else "🟡"
-        st.info(f"{status_color} Sourcing Agent: {sourcing_status}")
-    
-    with col2:
-        screening_status = st.session_state.screening_agent.get_status()
-        status_color = "🟢" if screening_status == "idle" else "🔴" if screening_status == "error" else "🟡"
-        st.info(f"{status_color} Screening Agent: {screening_status}")
-    
-    with col3:
-        engagement_status = st.session_state.engagement_agent.get_status()
-        status_color = "🟢" if engagement_status == "idle" else "🔴" if engagement_status == "error" else "🟡"
-        st.info(f"{status_color} Engagement Agent: {engagement_status}")
-    
-    with col4:
-        scheduling_status = st.session_state.scheduling_agent.get_status()
-        status_color = "🟢" if scheduling_status == "idle" else "🔴" if scheduling_status == "error" else "🟡"
-        st.info(f"{status_color} Scheduling Agent: {scheduling_status}")
+    runs.render_agent_status()
     
     # Recruitment metrics
     st.subheader("Recruitment Pipeline")
@@ -240,45 +220,6 @@ def render():
         submit = st.form_submit_button("Start Automation")
         
         if submit:
-            # Check if any agent is already running
-            if (st.session_state.sourcing_agent.get_status() == "running" or
-                st.session_state.screening_agent.get_status() == "running" or
-                st.session_state.engagement_agent.get_status() == "running" or
-                st.session_state.scheduling_agent.get_status() == "running"):
-                st.error("An agent is already running. Please wait for it to complete.")
-            else:
-                # Start the workflow
-                with st.spinner("Running Sourcing Agent..."):
-                    sourcing_result = st.session_state.sourcing_agent.start(
-                        job_title, job_description, candidate_count
-                    )
-                    if sourcing_result["success"]:
-                        st.success(sourcing_result["message"])
-                    else:
-                        st.error(sourcing_result["message"])
-                
-                with st.spinner("Running Screening Agent..."):
-                    screening_result = st.session_state.screening_agent.start(
-                        job_title, job_description
-                    )
-                    if screening_result["success"]:
-                        st.success(screening_result["message"])
-                    else:
-                        st.error(screening_result["message"])
-                
-                with st.spinner("Running Engagement Agent..."):
-                    engagement_result = st.session_state.engagement_agent.start(job_title)
-                    if engagement_result["success"]:
-                        st.success(engagement_result["message"])
-                    else:
-                        st.error(engagement_result["message"])
-                
-                with st.spinner("Running Scheduling Agent..."):
-                    scheduling_result = st.session_state.scheduling_agent.start(job_title)
-                    if scheduling_result["success"]:
-                        st.success(scheduling_result["message"])
-                    else:
-                        st.error(scheduling_result["message"])
-                
-                st.success("Automation workflow completed!")
-                st.rerun()
+            runs.start_run(job_title, job_description, candidate_count)
+    
+    runs.render_runs()
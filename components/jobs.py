@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from utils import db
+from components import runs
 import plotly.express as px
 
 
@@ -10,12 +11,8 @@ def render():
     """
     st.title("Active Job Positions")
 
-    # Get the candidates from the database
-    client = st.session_state.chroma_client
-    collection = client.get_collection(db.CANDIDATE_COLLECTION)
-
-    # Get all candidates
-    results = collection.get()
+    # Get all candidates from the database
+    results = db.get_records()
 
     if not results or 'metadatas' not in results or not results['metadatas']:
         st.info("No active job positions found.")
@@ -52,7 +49,8 @@ def render():
                 job_df = df[df['job_title'] == job_title]
 
                 # Count candidates in each stage
-                stage_counts = job_df['stage'].value_counts().to_dict()
+                stage_counts = db.group_counts("stage",
+                                               where={"job_title": job_title})
 
                 # Make sure all stages are represented for consistency
                 all_stages = {
@@ -263,56 +261,10 @@ def render():
                         submit = st.form_submit_button("Start Automation")
 
                         if submit:
-                            # Check if any agent is already running
-                            if (st.session_state.sourcing_agent.get_status()
-                                    == "running" or st.session_state.
-                                    screening_agent.get_status() == "running"
-                                    or st.session_state.engagement_agent.
-                                    get_status() == "running"
-                                    or st.session_state.scheduling_agent.
-                                    get_status() == "running"):
-                                st.error(
-                                    "An agent is already running. Please wait for it to complete."
-                                )
-                            else:
-                                # Start the workflow
-                                with st.spinner("Running Sourcing Agent..."):
-                                    sourcing_result = st.session_state.sourcing_agent.start(
-                                        job_title, job_description,
-                                        candidate_count)
-                                    if sourcing_result["success"]:
-                                        st.success(sourcing_result["message"])
-                                    else:
-                                        st.error(sourcing_result["message"])
-
-                                with st.spinner("Running Screening Agent..."):
-                                    screening_result = st.session_state.screening_agent.start(
-                                        job_title, job_description)
-                                    if screening_result["success"]:
-                                        st.success(screening_result["message"])
-                                    else:
-                                        st.error(screening_result["message"])
-
-                                with st.spinner("Running Engagement Agent..."):
-                                    engagement_result = st.session_state.engagement_agent.start(
-                                        job_title)
-                                    if engagement_result["success"]:
-                                        st.success(
-                                            engagement_result["message"])
-                                    else:
-                                        st.error(engagement_result["message"])
-
-                                with st.spinner("Running Scheduling Agent..."):
-                                    scheduling_result = st.session_state.scheduling_agent.start(
-                                        job_title)
-                                    if scheduling_result["success"]:
-                                        st.success(
-                                            scheduling_result["message"])
-                                    else:
-                                        st.error(scheduling_result["message"])
-
-                                st.success("Automation workflow completed!")
-                                st.rerun()
+                            runs.start_run(job_title, job_description,
+                                           candidate_count)
+
+                    runs.render_runs(job_title)
     else:
         st.error(
             "The database does not contain the required fields for job tracking"
@@ -0,0 +1,118 @@
+import streamlit as st
+from agents.pipeline import STAGES
+from utils.runner import get_runner
+from utils.status import StatusRegistry
+
+STAGE_LABELS = {
+    "sourcing": "Sourcing Agent",
+    "screening": "Screening Agent",
+    "engagement": "Engagement Agent",
+    "scheduling": "Scheduling Agent"
+}
+
+
+def start_run(job_title, job_description, candidate_count):
+    """Queue a pipeline run in the background; returns its id, or None if one is already active"""
+    # Leases cover runs from every session and process, not just this runner's
+    run_id = get_runner().submit(job_title, job_description, candidate_count)
+    if run_id is None:
+        st.error(f"A run for {job_title} is already in progress. Please wait for it to complete.")
+        return None
+
+    st.success(f"Started recruitment automation for {job_title}. You can leave this page; "
+               f"progress is shown under Pipeline Runs.")
+    return run_id
+
+
+def resume_run(run_id):
+    """Resume a stopped run from its last checkpoint; returns its id, or None if it can't start"""
+    if get_runner().resume(run_id) is None:
+        st.error("This run can't be resumed right now: it has finished, is already running, "
+                 "or another run holds its job.")
+        return None
+    st.success("Resumed the run from its last checkpoint.")
+    return run_id
+
+
+def agent_statuses():
+    """
+    Status per stage across every worker in every session and process:
+    {"state", "jobs", "throughput"} from the shared status registry
+    """
+    return StatusRegistry().agent_statuses(STAGES)
+
+
+@st.fragment(run_every=2)
+def render_agent_status():
+    """Status row for the four agents; re-polls the registry every couple of seconds"""
+    statuses = agent_statuses()
+    for column, stage in zip(st.columns(4), STAGES):
+        with column:
+            status = statuses[stage]
+            if status["state"] == "running":
+                jobs = "1 job" if status["jobs"] == 1 else f"{status['jobs']} jobs"
+                st.info(f"🟡 {STAGE_LABELS[stage]}: running ({jobs}, "
+                        f"{status['throughput']:.1f} candidates/s)")
+            elif status["state"] == "stale":
+                st.info(f"🔴 {STAGE_LABELS[stage]}: no heartbeat, worker may have stopped")
+            elif status["state"] == "error":
+                st.info(f"🔴 {STAGE_LABELS[stage]}: error")
+            else:
+                st.info(f"🟢 {STAGE_LABELS[stage]}: idle")
+
+
+@st.fragment(run_every=2)
+def render_runs(job_title=None, limit=5):
+    """Progress of recent runs; re-polls the runner every couple of seconds"""
+    runner = get_runner()
+    runs = runner.list_runs()
+    if job_title is not None:
+        runs = [run for run in runs if run["job_title"] == job_title]
+    # Stopped runs from any session or an earlier server process
+    stopped = runner.resumable_runs(job_title)
+    if not runs and not stopped:
+        return
+
+    st.subheader("Pipeline Runs")
+    for run in runs[:limit]:
+        done = len(run["completed_stages"])
+        if run["status"] == "running":
+            running = ", ".join(STAGE_LABELS[stage] for stage in run["running_stages"])
+            label = f"{run['job_title']}: running {running}..." if running else \
+                f"{run['job_title']}: starting..."
+        elif run["status"] == "queued":
+            label = f"{run['job_title']}: queued"
+        elif run["status"] == "failed":
+            label = f"{run['job_title']}: failed"
+        else:
+            label = f"{run['job_title']}: completed"
+        st.progress(done / len(STAGES), text=label)
+
+        with st.expander("Details", expanded=False):
+            for stage in run["completed_stages"]:
+                result = run["results"][stage]
+                if result["success"] and result.get("shortfall"):
+                    st.warning(f"{STAGE_LABELS[stage]}: {result['message']}")
+                elif result["success"]:
+                    st.success(f"{STAGE_LABELS[stage]}: {result['message']}")
+                else:
+                    st.error(f"{STAGE_LABELS[stage]}: {result['message']}")
+            if run["error"]:
+                st.error(run["error"])
+
+    for saved in stopped[:limit]:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.warning(f"{saved['job_title']}: run {saved['run_id']} stopped before finishing")
+        with col2:
+            if st.button("Resume", key=f"resume_{job_title or 'all'}_{saved['run_id']}"):
+                resume_run(saved["run_id"])
+
+    # Refresh the whole page once when a run this session has seen finishes,
+    # so metrics and charts pick up its results
+    active = {run["id"] for run in runs if run["status"] in ("queued", "running")}
+    key = f"active_runs_{job_title or 'all'}"
+    finished = st.session_state.get(key, set()) - active
+    st.session_state[key] = active
+    if finished:
+        st.rerun()
@@ -1,4 +1,3 @@
-import streamlit as st
 from utils import db
 from agents import sourcing_agent
 import time
@@ -10,10 +9,6 @@ def populate_database():
     # Make sure database is initialized
     db.initialize_db()
     
-    # Create a session state for the client
-    if not hasattr(st, 'session_state'):
-        st.session_state = {}
-    
     # Initialize the sourcing agent
     agent = sourcing_agent.SourcingAgent()
     
@@ -0,0 +1,113 @@
+"""
+Generate synthetic candidates and activity logs for load testing:
+
+    python generate_data.py --count 100000 --seed 7
+    python generate_data.py --count 10000000 --workers 8 --backend memory
+    python generate_data.py --count 1000000 --output candidates.jsonl --digest
+
+Rows are streamed into storage (or JSON Lines files) one block at a time,
+so memory stays flat whatever the count. The same --seed and --count always
+produce the same bytes; --digest prints a SHA-256 of the output to check.
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import db
+from utils.synthetic import generate
+
+
+def _jsonl(ids, metadatas, documents, document_key):
+    """One JSON line per record: its id, metadata fields and document"""
+    return "".join(json.dumps({"id": record_id, **metadata, document_key: document},
+                              separators=(",", ":")) + "\n"
+                   for record_id, metadata, document in zip(ids, metadatas, documents))
+
+
+def generate_data(count, seed=0, workers=1, output=None, logs_output=None, digest=False,
+                  on_progress=None):
+    """
+    Generate `count` candidates with their logs, writing them to the active
+    storage backend, or to JSON Lines files when `output` is given. Returns
+    {"candidates", "logs", "seconds", "digest"}; the digest (a SHA-256 of the
+    candidates as JSON Lines) is only computed when asked for or written.
+    """
+    hasher = hashlib.sha256() if digest or output else None
+    candidates = logs = 0
+    started = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    outputs = [open(path, "w", encoding="utf-8") if path else None for path in (output, logs_output)]
+    try:
+        for candidate_records, log_records in generate(count, seed, executor=executor):
+            if output:
+                lines = _jsonl(*candidate_records, "resume_text")
+                outputs[0].write(lines)
+                hasher.update(lines.encode("utf-8"))
+                if outputs[1]:
+                    outputs[1].write(_jsonl(*log_records, "document"))
+            else:
+                db.load_records(db.CANDIDATE_COLLECTION, *candidate_records)
+                db.load_records(db.LOG_COLLECTION, *log_records)
+                if hasher:
+                    hasher.update(_jsonl(*candidate_records, "resume_text").encode("utf-8"))
+            candidates += len(candidate_records[0])
+            logs += len(log_records[0])
+            if on_progress:
+                on_progress(candidates, logs)
+    finally:
+        for handle in outputs:
+            if handle:
+                handle.close()
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    return {
+        "candidates": candidates,
+        "logs": logs,
+        "seconds": time.perf_counter() - started,
+        "digest": hasher.hexdigest() if hasher else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic candidates for load testing")
+    parser.add_argument("--count", type=int, default=100000, help="candidates to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="processes generating blocks in parallel")
+    parser.add_argument("--backend", choices=["chroma", "memory"], default="chroma")
+    parser.add_argument("--chroma-path", default="./chroma_db")
+    parser.add_argument("--output", help="write candidates to this JSON Lines file instead of storage")
+    parser.add_argument("--logs-output", help="with --output, write activity logs to this file")
+    parser.add_argument("--digest", action="store_true", help="print a SHA-256 of the candidate data")
+    args = parser.parse_args(argv)
+
+    if not args.output:
+        if args.backend == "memory":
+            from utils.storage import MemoryBackend
+            db.initialize_db(backend=MemoryBackend())
+        elif not db.initialize_db(args.chroma_path):
+            print(f"Could not open Chroma storage at {args.chroma_path}", file=sys.stderr)
+            return 1
+
+    started = time.perf_counter()
+
+    def progress(candidates, logs):
+        elapsed = time.perf_counter() - started
+        print(f"\r{candidates:,}/{args.count:,} candidates, {logs:,} logs "
+              f"({candidates / elapsed:,.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    result = generate_data(args.count, args.seed, args.workers, args.output, args.logs_output,
+                           digest=args.digest, on_progress=progress)
+    print(file=sys.stderr)
+    print(f"Generated {result['candidates']:,} candidates and {result['logs']:,} log entries "
+          f"in {result['seconds']:.1f}s ({result['candidates'] / result['seconds']:,.0f} candidates/s)")
+    if args.digest:
+        print(f"sha256 {result['digest']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
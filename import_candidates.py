@@ -0,0 +1,79 @@
+"""
+Import candidates from a JSON Lines or CSV export, or from a directory or
+archive (.zip, .tar, .tar.gz) of PDF, DOCX and text resumes:
+
+    python import_candidates.py exports/candidates.jsonl
+    python import_candidates.py linkedin.csv --source LinkedIn --job-title "Data Scientist" --workers 8
+    python import_candidates.py resumes/ --source "Career Fair"
+
+Each record needs a resume ("resume_text" or "resume") or an email; "name",
+"email" and "source" are used as given, and any other field is stored as
+candidate metadata. People already stored are merged, not duplicated.
+Running the same command again after an interruption resumes from the last
+written batch; --restart reads the file from the beginning. Resume files
+are parsed from their text alone; text already extracted from a file with
+the same contents is reused.
+"""
+import argparse
+import os
+import sys
+
+from utils import db, state
+from utils.documents import ingest_documents, is_archive
+from utils.importer import BATCH_SIZE, import_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import candidates from JSON Lines, CSV or resume files")
+    parser.add_argument("path", help="export file, or directory or archive of resume files")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="default: from the file extension")
+    parser.add_argument("--workers", type=int, help="processes parsing resumes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--source", help="source for records that don't name one "
+                                         "(default: Import, or Upload for resume files)")
+    parser.add_argument("--job-title", help="job title for records that don't name one")
+    parser.add_argument("--fuzzy", action="store_true", help="also match existing people by name and email")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved offset of an earlier run")
+    parser.add_argument("--backend", choices=["chroma", "memory"], default="chroma")
+    parser.add_argument("--chroma-path", default="./chroma_db")
+    parser.add_argument("--state-db", help="state database holding import offsets "
+                                           "(default: $TALENTCREW_STATE_DB)")
+    args = parser.parse_args(argv)
+
+    if args.state_db:
+        state.set_state_path(args.state_db)
+    if args.backend == "memory":
+        from utils.storage import MemoryBackend
+        db.initialize_db(backend=MemoryBackend())
+    elif not db.initialize_db(args.chroma_path):
+        print(f"Could not open Chroma storage at {args.chroma_path}", file=sys.stderr)
+        return 1
+
+    if os.path.isdir(args.path) or is_archive(args.path):
+        def file_progress(counts):
+            print(f"\r{counts['files']:,} files, {counts['imported']:,} imported, {counts['merged']:,} merged, "
+                  f"{counts['cached']:,} cached, {counts['failed']:,} failed",
+                  end="", file=sys.stderr, flush=True)
+
+        result = ingest_documents(args.path, args.workers, args.source or "Upload", args.job_title,
+                                  args.batch_size, fuzzy=args.fuzzy, on_progress=file_progress)
+        print(file=sys.stderr)
+        for name, error in result["errors"]:
+            print(f"  {name}: {error}", file=sys.stderr)
+    else:
+        def progress(done, total, counts):
+            percent = 100 * done / total if total else 100
+            print(f"\r{percent:5.1f}%  {counts['imported']:,} imported, {counts['merged']:,} merged, "
+                  f"{counts['invalid']:,} invalid", end="", file=sys.stderr, flush=True)
+
+        result = import_file(args.path, args.format, args.workers, args.batch_size, args.source or "Import",
+                             args.job_title, restart=args.restart, fuzzy=args.fuzzy, on_progress=progress)
+        print(file=sys.stderr)
+    print(result["message"])
+    if result["success"] and result["seconds"]:
+        print(f"{result['seconds']:.1f}s")
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
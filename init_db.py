@@ -1,61 +1,21 @@
-import os
-import chromadb
-from chromadb.config import Settings
 from datetime import datetime, timedelta
 import uuid
 import random
 
-# Default collection names
-RESUME_COLLECTION = "resume_collection"
-LOG_COLLECTION = "log_collection"
-CANDIDATE_COLLECTION = "candidate_collection"
+from utils import db
 
 def init_database():
     """Initialize and seed the database with sample data"""
     print("Initializing and seeding database...")
     
-    # Create the directory if it doesn't exist
-    if not os.path.exists("./chroma_db"):
-        os.makedirs("./chroma_db")
-        
-    # Create a persistent client
-    client = chromadb.PersistentClient(
-        path="./chroma_db",
-        settings=Settings(
-            anonymized_telemetry=False
-        )
-    )
-    
-    # Initialize collections
-    collections = client.list_collections()
-    collection_names = [c.name for c in collections]
-    
-    # Create collections if they don't exist
-    if RESUME_COLLECTION not in collection_names:
-        resume_collection = client.create_collection(RESUME_COLLECTION)
-        print(f"Created {RESUME_COLLECTION} collection")
-    else:
-        resume_collection = client.get_collection(RESUME_COLLECTION)
-        print(f"{RESUME_COLLECTION} collection already exists")
-        
-    if LOG_COLLECTION not in collection_names:
-        log_collection = client.create_collection(LOG_COLLECTION)
-        print(f"Created {LOG_COLLECTION} collection")
-    else:
-        log_collection = client.get_collection(LOG_COLLECTION)
-        print(f"{LOG_COLLECTION} collection already exists")
-        
-    if CANDIDATE_COLLECTION not in collection_names:
-        candidate_collection = client.create_collection(CANDIDATE_COLLECTION)
-        print(f"Created {CANDIDATE_COLLECTION} collection")
-    else:
-        candidate_collection = client.get_collection(CANDIDATE_COLLECTION)
-        print(f"{CANDIDATE_COLLECTION} collection already exists")
+    # Open (creating if needed) the persistent Chroma store and its collections
+    if not db.initialize_db("./chroma_db"):
+        return False
     
     # Check if we already have candidates
-    existing_candidates = candidate_collection.get()
-    if existing_candidates and 'ids' in existing_candidates and len(existing_candidates['ids']) > 0:
-        print(f"Database already contains {len(existing_candidates['ids'])} candidates. Skipping seeding.")
+    existing_count = db.get_backend().count(db.CANDIDATE_COLLECTION)
+    if existing_count > 0:
+        print(f"Database already contains {existing_count} candidates. Skipping seeding.")
         return
     
     # Sample candidate data for seeding the database
@@ -220,7 +180,9 @@ def init_database():
         }
     ]
     
-    # Add sample candidates to the database
+    # Add sample candidates to the database. Going through db bumps the
+    # write versions, so running apps and workers see them without a restart.
+    ids, metadatas, documents = [], [], []
     for candidate in sample_candidates:
         candidate_id = candidate.pop("id")
         resume_text = candidate.pop("resume_text")
@@ -230,11 +192,10 @@ def init_database():
             if isinstance(value, list):
                 candidate[key] = ", ".join(value)
         
-        candidate_collection.add(
-            ids=[candidate_id],
-            metadatas=[candidate],
-            documents=[resume_text]
-        )
+        ids.append(candidate_id)
+        metadatas.append(candidate)
+        documents.append(resume_text)
+    db.load_records(db.CANDIDATE_COLLECTION, ids, metadatas, documents)
     
     # Add some sample log entries
     log_entries = [
@@ -281,15 +242,15 @@ def init_database():
     ]
     
     # Add log entries
+    ids, metadatas, documents = [], [], []
     for log in log_entries:
         log_id = log.pop("id")
         log_details = log.pop("details")
         
-        log_collection.add(
-            ids=[log_id],
-            metadatas=[log],
-            documents=[log_details]
-        )
+        ids.append(log_id)
+        metadatas.append(log)
+        documents.append(log_details)
+    db.load_records(db.LOG_COLLECTION, ids, metadatas, documents)
     
     print(f"Successfully seeded database with {len(sample_candidates)} candidates and {len(log_entries)} log entries")
     return True
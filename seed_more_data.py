@@ -1,29 +1,15 @@
-import os
-import chromadb
-from chromadb.config import Settings
 from datetime import datetime, timedelta
 import uuid
 import random
-import streamlit as st
 
-# Default collection names
-RESUME_COLLECTION = "resume_collection"
-LOG_COLLECTION = "log_collection"
-CANDIDATE_COLLECTION = "candidate_collection"
+from utils import db
 
 def seed_more_data():
     """Seed the database with additional jobs and candidates"""
     print("Seeding more data...")
     
-    # Initialize ChromaDB client
-    client = chromadb.PersistentClient(
-        path="./chroma_db",
-        settings=Settings(
-            anonymized_telemetry=False
-        )
-    )
-    
-    collection = client.get_collection(CANDIDATE_COLLECTION)
+    if not db.initialize_db("./chroma_db"):
+        return 0
     
     # Additional job positions to seed
     job_positions = [
@@ -89,6 +75,9 @@ def seed_more_data():
     }
     
     all_candidates = []
+    # (ids, metadatas, documents) of the new candidates and their logs
+    candidate_records = ([], [], [])
+    log_records = ([], [], [])
     stage_distrib = ["sourced", "screened", "engaged", "scheduled"]
     
     # Generate candidates for each job position
@@ -200,77 +189,64 @@ def seed_more_data():
             - Bachelor's Degree in {"Computer Science" if job_title in ["Data Scientist", "DevOps Engineer"] else "Business" if job_title == "Product Manager" else "Design" if job_title == "UX Designer" else "Marketing"}, Example University
             """
             
-            # Add to the collection
-            collection.add(
-                ids=[candidate_id],
-                metadatas=[metadata],
-                documents=[resume_text]
-            )
+            candidate_records[0].append(candidate_id)
+            candidate_records[1].append(metadata)
+            candidate_records[2].append(resume_text)
             
             all_candidates.append(metadata)
     
-    # Add log entries for the new candidates
-    log_collection = client.get_collection(LOG_COLLECTION)
-    
     # Generate some log entries for the activities
     for candidate in all_candidates:
         # Source log
-        log_id = str(uuid.uuid4())
         timestamp = (datetime.now() - timedelta(days=random.randint(1, 5))).timestamp()
-        log_collection.add(
-            ids=[log_id],
-            metadatas=[{
-                "agent": "Sourcing Agent",
-                "action": "source_candidate",
-                "status": "success",
-                "timestamp": timestamp
-            }],
-            documents=[f"Sourced candidate {candidate['name']} from {candidate['source']}"]
-        )
+        log_records[0].append(str(uuid.uuid4()))
+        log_records[1].append({
+            "agent": "Sourcing Agent",
+            "action": "source_candidate",
+            "status": "success",
+            "timestamp": timestamp
+        })
+        log_records[2].append(f"Sourced candidate {candidate['name']} from {candidate['source']}")
         
         # Add logs based on stage
         if candidate["stage"] in ["screened", "engaged", "scheduled"]:
-            log_id = str(uuid.uuid4())
             timestamp = (datetime.now() - timedelta(days=random.randint(1, 4))).timestamp()
-            log_collection.add(
-                ids=[log_id],
-                metadatas=[{
-                    "agent": "Screening Agent",
-                    "action": "screen_candidate",
-                    "status": "success",
-                    "timestamp": timestamp
-                }],
-                documents=[f"Screened {candidate['name']} with score {candidate.get('match_score', 0)}%"]
-            )
+            log_records[0].append(str(uuid.uuid4()))
+            log_records[1].append({
+                "agent": "Screening Agent",
+                "action": "screen_candidate",
+                "status": "success",
+                "timestamp": timestamp
+            })
+            log_records[2].append(f"Screened {candidate['name']} with score {candidate.get('match_score', 0)}%")
         
         if candidate["stage"] in ["engaged", "scheduled"]:
-            log_id = str(uuid.uuid4())
             timestamp = (datetime.now() - timedelta(days=random.randint(1, 3))).timestamp()
             interest = "interested" if candidate.get("is_interested", False) else "not interested"
-            log_collection.add(
-                ids=[log_id],
-                metadatas=[{
-                    "agent": "Engagement Agent",
-                    "action": "engage_candidate",
-                    "status": "success",
-                    "timestamp": timestamp
-                }],
-                documents=[f"Engaged {candidate['name']} who was {interest}"]
-            )
+            log_records[0].append(str(uuid.uuid4()))
+            log_records[1].append({
+                "agent": "Engagement Agent",
+                "action": "engage_candidate",
+                "status": "success",
+                "timestamp": timestamp
+            })
+            log_records[2].append(f"Engaged {candidate['name']} who was {interest}")
         
         if candidate["stage"] == "scheduled":
-            log_id = str(uuid.uuid4())
             timestamp = (datetime.now() - timedelta(days=random.randint(1, 2))).timestamp()
-            log_collection.add(
-                ids=[log_id],
-                metadatas=[{
-                    "agent": "Scheduling Agent",
-                    "action": "schedule_interview",
-                    "status": "success",
-                    "timestamp": timestamp
-                }],
-                documents=[f"Scheduled interview for {candidate['name']} at {candidate.get('interview_datetime', '')}"]
-            )
+            log_records[0].append(str(uuid.uuid4()))
+            log_records[1].append({
+                "agent": "Scheduling Agent",
+                "action": "schedule_interview",
+                "status": "success",
+                "timestamp": timestamp
+            })
+            log_records[2].append(f"Scheduled interview for {candidate['name']} at {candidate.get('interview_datetime', '')}")
+    
+    # Written through db so the write versions advance and running apps and
+    # workers see the new candidates without a restart
+    db.load_records(db.CANDIDATE_COLLECTION, *candidate_records)
+    db.load_records(db.LOG_COLLECTION, *log_records)
     
     print(f"Successfully added {len(all_candidates)} new candidates across {len(job_positions)} job positions")
     print("Added corresponding log entries for each candidate's actions")
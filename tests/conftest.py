@@ -0,0 +1,21 @@
+import pytest
+
+from utils import db, state
+from utils.storage import MemoryBackend
+
+
+@pytest.fixture(autouse=True)
+def state_path(tmp_path):
+    """Give every test its own state store instead of talentcrew_state.db"""
+    previous = state.get_state_path()
+    path = tmp_path / "state.db"
+    state.set_state_path(str(path))
+    yield path
+    state.close_connection()
+    state.set_state_path(previous)
+
+
+@pytest.fixture
+def backend():
+    """A fresh in-memory backend installed as the active one"""
+    return db.set_backend(MemoryBackend())
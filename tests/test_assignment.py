@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from utils.assignment import solve_assignment
+
+
+def brute_force(cost, unassigned_cost=None):
+    """Lowest total cost over every assignment, by enumeration"""
+    n_rows, n_columns = cost.shape
+    options = list(range(n_columns)) + ([None] * n_rows if unassigned_cost is not None else [])
+    best = np.inf
+    for choice in itertools.permutations(options, n_rows):
+        total = sum(unassigned_cost if column is None else cost[row, column]
+                    for row, column in enumerate(choice))
+        best = min(best, total)
+    return best
+
+
+def total(cost, assignment, unassigned_cost=None):
+    return sum(unassigned_cost if column < 0 else cost[row, column]
+               for row, column in enumerate(assignment))
+
+
+def test_square_problem():
+    cost = np.array([[4, 1, 3], [2, 0, 5], [3, 2, 2]])
+    assert solve_assignment(cost).tolist() == [1, 0, 2]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force_on_random_rectangular_problems(seed):
+    rng = np.random.default_rng(seed)
+    n_rows = int(rng.integers(1, 5))
+    cost = rng.integers(0, 20, size=(n_rows, int(rng.integers(n_rows, 7)))).astype(float)
+    assignment = solve_assignment(cost)
+    assert len(set(assignment.tolist())) == n_rows
+    assert total(cost, assignment) == brute_force(cost)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force_with_forbidden_pairs_and_unassigned_rows(seed):
+    rng = np.random.default_rng(100 + seed)
+    cost = rng.integers(0, 20, size=(int(rng.integers(1, 6)), int(rng.integers(1, 5)))).astype(float)
+    cost[rng.random(cost.shape) < 0.3] = np.inf
+    assignment = solve_assignment(cost, unassigned_cost=15)
+    placed = assignment[assignment >= 0]
+    assert len(set(placed.tolist())) == len(placed)
+    assert np.isfinite(cost[assignment >= 0, placed]).all()
+    assert total(cost, assignment, 15) == brute_force(cost, 15)
+
+
+def test_rows_without_a_feasible_column_stay_unassigned():
+    cost = np.array([[np.inf, np.inf], [1.0, 2.0], [1.0, 5.0]])
+    assert solve_assignment(cost, unassigned_cost=100).tolist() == [-1, 1, 0]
+
+
+def test_every_row_must_be_assigned_without_an_unassigned_cost():
+    with pytest.raises(ValueError):
+        solve_assignment(np.ones((3, 2)))
+    with pytest.raises(ValueError):
+        solve_assignment(np.array([[1.0, np.inf], [np.inf, np.inf]]))
+
+
+def test_ties_between_identical_rows():
+    assignment = solve_assignment(np.zeros((4, 6)))
+    assert len(set(assignment.tolist())) == 4
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from utils import db
+from utils.dedup import (EMPTY_SIGNATURE, NUM_PERM, NearDuplicateIndex, estimate_similarity, minhash_signature,
+                         names_compatible, shingles)
+
+WORDS = ("python django flask postgres docker kubernetes aws terraform react typescript "
+         "graphql redis kafka spark airflow pandas numpy pytorch linux nginx").split()
+
+
+def resume(seed, length=120):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(length))
+
+
+def edited(text, fraction, seed=0):
+    """`text` with about `fraction` of its words replaced"""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = f"edit{i}"
+    return " ".join(words)
+
+
+def test_shingles():
+    assert shingles("One two THREE four") == {"one two three", "two three four"}
+    assert shingles("just two") == {"just two"}
+    assert shingles("") == set()
+
+
+def test_signature_is_deterministic_and_fixed_size():
+    text = resume(1)
+    assert minhash_signature(text) == minhash_signature(text)
+    assert len(minhash_signature(text)) == NUM_PERM
+    assert minhash_signature("") == EMPTY_SIGNATURE
+
+
+def test_similarity_estimate_tracks_jaccard():
+    text = resume(1)
+    assert estimate_similarity(minhash_signature(text), minhash_signature(text)) == 1.0
+    assert estimate_similarity(minhash_signature(text), minhash_signature(edited(text, 0.03))) > 0.8
+    assert estimate_similarity(minhash_signature(text), minhash_signature(resume(2))) < 0.2
+
+
+def test_empty_resumes_are_never_near_duplicates():
+    assert estimate_similarity(minhash_signature(""), minhash_signature("   ")) == 0.0
+    index = NearDuplicateIndex()
+    index.insert("a", minhash_signature(""), None)
+    assert len(index) == 0
+    assert index.query(minhash_signature("   "), name="Bob Smith") == []
+
+
+def test_names_compatible():
+    assert names_compatible("Ann Lee", "ann lee")
+    assert names_compatible("Ann Lee", "Ann Marie Lee")
+    assert not names_compatible("Ann Lee", "Bob Roy")
+    assert names_compatible(None, "Bob Roy")
+    assert names_compatible("Unknown Candidate", "Bob Roy")
+
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex()
+    texts = {f"c{i}": resume(i) for i in range(200)}
+    for key, text in texts.items():
+        index.insert(key, minhash_signature(text))
+    assert len(index) == 200
+
+    matches = index.query(minhash_signature(edited(texts["c42"], 0.03)))
+    assert [key for key, _ in matches] == ["c42"]
+    assert matches[0][1] >= index.threshold
+    assert index.query(minhash_signature(resume(1000))) == []
+
+
+def test_index_checks_names_and_supports_removal():
+    index = NearDuplicateIndex()
+    signature = minhash_signature(resume(7))
+    index.insert("c7", signature, "Ann Lee")
+    index.insert("c7", minhash_signature(resume(8)), "Ann Lee")
+    assert index.query(signature, name="Bob Roy") == []
+    assert index.query(signature, name="ann lee") == [("c7", 1.0)]
+
+    index.remove("c7")
+    index.remove("c7")
+    assert len(index) == 0
+    assert index.query(signature) == []
+
+
+def test_bands_must_divide_the_signature():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(bands=NUM_PERM - 1)
+
+
+def test_find_near_duplicates_sees_new_candidates(backend):
+    text = resume(3)
+    first, _ = db.upsert_candidate("Ann Lee", "ann@mail.com", "LinkedIn", text)
+    assert db.find_near_duplicates(edited(text, 0.03), name="Ann Lee")[0][0] == first
+
+    # Added after the index was built, in this process and by a raw bulk load
+    second, _ = db.upsert_candidate("Bob Roy", "bob@mail.com", "LinkedIn", resume(4))
+    db.load_records(db.CANDIDATE_COLLECTION, ["raw-1"], [{"name": "Cy Fox", "email": "cy@mail.com"}],
+                    [resume(5)])
+    assert db.find_near_duplicates(resume(4), name="Bob Roy")[0][0] == second
+    assert db.find_near_duplicates(resume(5))[0][0] == "raw-1"
+
+
+def test_candidates_with_empty_resumes_stay_distinct(backend):
+    first, _ = db.upsert_candidate("Ann Lee", "ann@mail.com", "LinkedIn", "")
+    assert db.find_near_duplicates("   ", name="Bob Smith") == []
+    second, _ = db.upsert_candidate("Bob Smith", "bob@mail.com", "LinkedIn", "   ")
+    assert second != first
+    assert db.find_near_duplicates("", name="Ann Lee") == []
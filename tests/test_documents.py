@@ -0,0 +1,104 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from utils import db, documents
+from utils.documents import TextCache, extract_text, ingest_documents, iter_files
+
+DOCX_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:t>Ann Lee</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>ann@mail.com</w:t><w:tab/><w:t>Python</w:t><w:br/><w:t>Django</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def docx(xml=DOCX_XML):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as document:
+        document.writestr("word/document.xml", xml)
+    return buffer.getvalue()
+
+
+def resume(i):
+    return f"Person {i}\np{i}@mail.com\nSkills: Python, SQL\n{i} years of experience\n"
+
+
+def write_resumes(directory, count):
+    directory.mkdir(exist_ok=True)
+    for i in range(count):
+        (directory / f"{i:02d}.txt").write_text(resume(i))
+    return str(directory)
+
+
+def test_extracts_text_and_docx():
+    assert extract_text("cv.txt", "Ann Lee\nPython".encode()) == "Ann Lee\nPython"
+    assert extract_text("cv.DOCX", docx()) == "Ann Lee\nann@mail.com\tPython\nDjango"
+
+
+def test_walks_directories_and_archives_in_name_order(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "two.txt").write_text("two")
+    (tmp_path / "a.md").write_text("one")
+    (tmp_path / "skip.png").write_bytes(b"\x89PNG")
+    assert [name for name, _ in iter_files(str(tmp_path))] == \
+        [str(tmp_path / "a.md"), str(tmp_path / "b" / "two.txt")]
+
+    with zipfile.ZipFile(tmp_path / "cvs.zip", "w") as archive:
+        archive.writestr("z.txt", "last")
+        archive.writestr("a/cv.docx", docx())
+        archive.writestr("notes.bin", "skipped")
+    assert list(iter_files(str(tmp_path / "cvs.zip"))) == [("a/cv.docx", docx()), ("z.txt", b"last")]
+
+    with tarfile.open(tmp_path / "cvs.tar.gz", "w:gz") as archive:
+        for name, data in (("one.txt", b"one"), ("two.pdf", b"%PDF")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    assert list(iter_files(str(tmp_path / "cvs.tar.gz"))) == [("one.txt", b"one"), ("two.pdf", b"%PDF")]
+
+
+def test_text_cache():
+    cache = TextCache()
+    assert cache.get("abc") is None
+    cache.put_many([("abc", "text")])
+    assert cache.get("abc") == "text"
+
+
+def test_second_run_reuses_extracted_text_and_merges(backend, tmp_path):
+    pytest.importorskip("en_core_web_sm")
+    source = write_resumes(tmp_path / "cvs", 5)
+
+    first = ingest_documents(source, workers=2)
+    assert first["success"], first["message"]
+    assert (first["files"], first["imported"], first["cached"], first["failed"]) == (5, 5, 0, 0)
+    assert backend.count(db.CANDIDATE_COLLECTION) == 5
+
+    second = ingest_documents(source, workers=2)
+    assert (second["files"], second["imported"], second["merged"], second["cached"]) == (5, 0, 5, 5)
+    assert backend.count(db.CANDIDATE_COLLECTION) == 5
+
+
+def test_worker_crash_only_fails_its_own_file(backend, tmp_path, monkeypatch):
+    pytest.importorskip("en_core_web_sm")
+    source = write_resumes(tmp_path / "cvs", 6)
+    (tmp_path / "cvs" / "03.txt").write_text("crash")
+    (tmp_path / "cvs" / "empty.txt").write_text("   ")
+    real_extract = documents.extract_text
+
+    def extract(name, data):
+        if data == b"crash":
+            os._exit(1)
+        return real_extract(name, data)
+
+    # Workers are forked, so they see the patched function
+    monkeypatch.setattr(documents, "extract_text", extract)
+    result = ingest_documents(str(tmp_path / "cvs"), workers=2)
+
+    assert result["success"], result["message"]
+    assert (result["files"], result["imported"], result["failed"]) == (7, 5, 2)
+    assert dict(result["errors"]) == {str(tmp_path / "cvs" / "03.txt"): "worker process crashed",
+                                      str(tmp_path / "cvs" / "empty.txt"): "ValueError: no text found"}
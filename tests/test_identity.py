@@ -0,0 +1,107 @@
+import uuid
+
+from utils import db
+from utils.identity import IdentityIndex, fuzzy_identity_key, identity_key, normalize_email
+
+
+def candidate(name, email, source="LinkedIn", **metadata):
+    return {"name": name, "email": email, "source": source,
+            "resume_text": f"{name} resume", "metadata": metadata}
+
+
+def stored(candidate_id):
+    return db.get_backend().query(db.CANDIDATE_COLLECTION, ids=[candidate_id])["metadatas"][0]
+
+
+def test_normalize_email_drops_placeholders():
+    assert normalize_email("  Ann@Example.ORG ") == "ann@example.org"
+    assert normalize_email("unknown@example.com") is None
+    assert normalize_email("not-an-email") is None
+    assert normalize_email(None) is None
+    assert identity_key("ann@example.org") == "email:ann@example.org"
+
+
+def test_fuzzy_key_ignores_cosmetic_differences():
+    assert fuzzy_identity_key("Ann Lee", "ann.lee+jobs@mail.com") == \
+        fuzzy_identity_key("lee ann", "Ann_Lee@mail.com")
+    assert fuzzy_identity_key("Ann Lee", "ann@mail.com") != fuzzy_identity_key("Ann Lee", "ann@other.com")
+    assert fuzzy_identity_key("", "ann@mail.com") is None
+
+
+def test_index_lookup_is_exact_unless_asked_for_fuzzy():
+    index = IdentityIndex()
+    index.register("c1", "Ann Lee", "ann.lee@mail.com")
+    assert index.lookup("Somebody", "ANN.LEE@mail.com") == "c1"
+    assert index.lookup("Lee Ann", "annlee+x@mail.com") is None
+    assert index.lookup("Lee Ann", "annlee+x@mail.com", fuzzy=True) == "c1"
+    assert index.lookup("Ann Lee", "unknown@example.com", fuzzy=True) is None
+
+
+def test_repeat_sighting_merges_into_the_stored_candidate(backend):
+    [(first, created)] = db.add_candidates([candidate("Ann Lee", "ann@mail.com", location="Paris")])
+    assert created
+    db.update_candidate(first, {"stage": "screened"})
+
+    [(second, created)] = db.add_candidates([candidate("Ann Lee", "Ann@Mail.com", source="GitHub",
+                                                       stage="sourced", location="Berlin", github="annl")])
+    assert (second, created) == (first, False)
+    metadata = stored(first)
+    # Stored values win, new fields fill gaps and every source is kept
+    assert metadata["stage"] == "screened"
+    assert metadata["location"] == "Paris"
+    assert metadata["github"] == "annl"
+    assert metadata["sources"] == "LinkedIn, GitHub"
+    assert backend.count(db.CANDIDATE_COLLECTION) == 1
+
+
+def test_repeats_within_one_batch_are_merged_before_writing(backend):
+    results = db.add_candidates([
+        candidate("Ann Lee", "ann@mail.com", location="Paris"),
+        candidate("Bob Roy", "bob@mail.com"),
+        candidate("Ann Lee", "ann@mail.com", source="GitHub", github="annl")
+    ])
+    assert [created for _, created in results] == [True, True, False]
+    assert results[0][0] == results[2][0]
+    metadata = stored(results[0][0])
+    assert metadata["sources"] == "LinkedIn, GitHub"
+    assert metadata["github"] == "annl"
+    assert backend.count(db.CANDIDATE_COLLECTION) == 2
+
+
+def test_placeholder_emails_never_merge_people(backend):
+    results = db.add_candidates([candidate("Ann Lee", "unknown@example.com"),
+                                 candidate("Bob Roy", "unknown@example.com")])
+    assert [created for _, created in results] == [True, True]
+
+
+def test_fuzzy_upsert(backend):
+    first, _ = db.upsert_candidate("Ann Lee", "ann.lee@mail.com", "LinkedIn", "resume")
+    assert db.upsert_candidate("Lee Ann", "annlee+jobs@mail.com", "GitHub", "resume")[1]
+    assert db.upsert_candidate("Lee Ann", "ann_lee@mail.com", "Indeed", "resume", fuzzy=True) == (first, False)
+
+
+def test_merge_candidate_adds_the_source(backend):
+    candidate_id, _ = db.upsert_candidate("Ann Lee", "ann@mail.com", "LinkedIn", "resume")
+    assert db.merge_candidate(candidate_id, "GitHub", {"github": "annl"})
+    assert stored(candidate_id)["sources"] == "LinkedIn, GitHub"
+    assert not db.merge_candidate("missing", "GitHub")
+
+
+def test_candidates_added_by_another_process_are_found(backend):
+    db.upsert_candidate("Ann Lee", "ann@mail.com", "LinkedIn", "resume")
+    assert db.find_candidate(email="bob@mail.com") is None
+
+    # Another process writes straight to the shared store and bumps the version
+    bob = str(uuid.uuid4())
+    backend.add(db.CANDIDATE_COLLECTION, ids=[bob], metadatas=[{"name": "Bob Roy", "email": "bob@mail.com"}],
+                documents=["resume"])
+    backend.bump_version(db.IDENTITY_VERSION)
+
+    assert db.find_candidate(email="bob@mail.com") == bob
+    assert db.upsert_candidate("Bob Roy", "bob@mail.com", "GitHub", "resume") == (bob, False)
+
+
+def test_load_records_are_picked_up_by_the_index(backend):
+    db.find_candidate(email="anyone@mail.com")
+    db.load_records(db.CANDIDATE_COLLECTION, ["raw-1"], [{"name": "Cy", "email": "cy@mail.com"}], ["resume"])
+    assert db.find_candidate(email="cy@mail.com") == "raw-1"
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from utils import db
+from utils.importer import (MAX_CSV_ROW_LINES, ImportOffsets, fingerprint, import_file, read_batches,
+                            read_records)
+
+CSV = (
+    'name,email,source,experience_years,resume_text\n'
+    'Ann Lee,ann@mail.com,LinkedIn,5,"Ann Lee\n'
+    'Python developer, ""senior""\n'
+    '5 years of experience"\n'
+    'Bob Roy,bob@mail.com,,2.5,short\n'
+    '\n'
+    'Cy Fox,cy@mail.com,GitHub,true,"unterminated\n'
+)
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def person(i, **fields):
+    return dict({"name": f"Person {i}", "email": f"p{i}@mail.com", "source": "Export",
+                 "resume_text": f"Person {i} resume", "skills": ["python"], "experience_years": 3}, **fields)
+
+
+def test_csv_cells_may_span_lines(tmp_path):
+    path = tmp_path / "candidates.csv"
+    path.write_text(CSV)
+    records = list(read_records(str(path), "csv"))
+
+    ann, bob = records[0][1], records[1][1]
+    assert ann["resume_text"] == 'Ann Lee\nPython developer, "senior"\n5 years of experience'
+    assert ann["experience_years"] == 5
+    # Empty cells are left out; numbers and booleans come back typed
+    assert bob == {"name": "Bob Roy", "email": "bob@mail.com", "experience_years": 2.5,
+                   "resume_text": "short"}
+    # A quote still open at the end of the file makes one bad record
+    assert records[2] == (len(CSV.encode()), None)
+    assert len(records) == 3
+
+
+def test_stray_quote_loses_only_its_own_row(tmp_path):
+    rows = [f"Person {i},p{i}@mail.com,Export,3,resume {i}\n" for i in range(MAX_CSV_ROW_LINES + 5)]
+    rows[2] = 'Broken "Row,broken@mail.com,Export,3,resume\n'
+    path = tmp_path / "candidates.csv"
+    path.write_text("name,email,source,experience_years,resume_text\n" + "".join(rows))
+    records = [record for _, record in read_records(str(path), "csv")]
+
+    assert len(records) == len(rows)
+    assert records[2] is None
+    assert [record["name"] for record in records if record] == \
+        [f"Person {i}" for i in range(len(rows)) if i != 2]
+
+
+def test_offsets_point_at_the_next_record(tmp_path):
+    path = tmp_path / "candidates.csv"
+    path.write_text(CSV)
+    records = list(read_records(str(path), "csv"))
+    for (offset, record), (_, following) in zip(records, records[1:]):
+        assert list(read_records(str(path), "csv", offset))[0][1] == following
+    # Resuming at 0 still skips the header
+    assert list(read_records(str(path), "csv", 0)) == records
+
+
+def test_jsonl_skips_blank_lines_and_flags_bad_ones(tmp_path):
+    path = tmp_path / "candidates.jsonl"
+    path.write_text('{"name": "Ann"}\n\n{broken\n{"name": "Bob"}\n')
+    assert [record for _, record in read_records(str(path), "jsonl")] == [{"name": "Ann"}, None, {"name": "Bob"}]
+    batches = list(read_batches(str(path), "jsonl", batch_size=2))
+    assert [len(records) for _, records in batches] == [2, 1]
+    assert batches[-1][0] == path.stat().st_size
+
+
+def test_offsets_are_kept_per_file_and_fingerprint(tmp_path):
+    offsets = ImportOffsets()
+    offsets.save("/data/a.jsonl", "10:abc", 120, {"imported": 3})
+    assert offsets.get("/data/a.jsonl", "10:abc") == {"offset": 120, "counts": {"imported": 3}, "status": "running"}
+    assert offsets.get("/data/a.jsonl", "11:def") is None
+
+    path = tmp_path / "a.jsonl"
+    path.write_text("one\n")
+    before = fingerprint(str(path))
+    path.write_text("two\n")
+    assert fingerprint(str(path)) != before
+
+
+def test_import_resumes_from_the_saved_offset(backend, tmp_path):
+    pytest.importorskip("spacy")
+    path = write_jsonl(tmp_path / "export.jsonl", [person(i) for i in range(5)] + ["not a dict"])
+    key = fingerprint(path)
+    # An earlier run got through the first two lines
+    second_line = sum(len(line) for line in open(path).readlines()[:2])
+    ImportOffsets().save(path, key, second_line, {"imported": 2, "merged": 0, "invalid": 0})
+
+    result = import_file(path, workers=1, batch_size=2)
+    assert result["success"], result["message"]
+    assert (result["imported"], result["merged"], result["invalid"]) == (5, 0, 1)
+    assert backend.count(db.CANDIDATE_COLLECTION) == 3
+    assert db.find_candidate(email="p0@mail.com") is None
+    assert ImportOffsets().get(path, key)["status"] == "completed"
+
+    assert import_file(path, workers=1)["message"].endswith("was already imported")
+
+
+def test_import_merges_people_already_stored(backend, tmp_path):
+    pytest.importorskip("spacy")
+    db.upsert_candidate("Person 1", "p1@mail.com", "LinkedIn", "resume")
+    path = write_jsonl(tmp_path / "export.jsonl", [person(1, source="GitHub"), person(2)])
+
+    result = import_file(path, workers=1, job_title="Dev")
+    assert (result["imported"], result["merged"]) == (1, 1)
+    stored = backend.query(db.CANDIDATE_COLLECTION, ids=[db.find_candidate(email="p1@mail.com")])
+    assert stored["metadatas"][0]["sources"] == "LinkedIn, GitHub"
+    # Fields the stored record lacked are filled in, the job title among them
+    assert stored["metadatas"][0]["job_title"] == "Dev"
+    assert backend.count(db.CANDIDATE_COLLECTION, where={"job_title": "Dev"}) == 2
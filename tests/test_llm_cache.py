@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import llm_cache
+from utils.llm_cache import ResponseCache, from_environment, make_namespace
+
+NAMESPACE = make_namespace("model-a", {"temperature": 0.7})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def test_prompts_match_whatever_their_indentation(clock):
+    cache = ResponseCache()
+    cache.put(NAMESPACE, "Write an email\n        to Ann", "Hi Ann")
+    assert cache.get(NAMESPACE, "  Write an email to   Ann ") == "Hi Ann"
+    assert cache.get(NAMESPACE, "Write an email to Bob") is None
+
+
+def test_namespaces_are_separate(clock):
+    cache = ResponseCache()
+    cache.put(NAMESPACE, "prompt", "from a")
+    assert cache.get(make_namespace("model-b", {"temperature": 0.7}), "prompt") is None
+    assert make_namespace("model-a", {"temperature": 0.7}) == NAMESPACE
+    assert make_namespace("model-a", {"temperature": 0.2}) != NAMESPACE
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.put(NAMESPACE, "prompt", "answer")
+    clock.now += 59
+    assert cache.get(NAMESPACE, "prompt") == "answer"
+    clock.now += 2
+    assert cache.get(NAMESPACE, "prompt") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(clock, monkeypatch):
+    monkeypatch.setattr(llm_cache, "EVICT_FRACTION", 0)
+    cache = ResponseCache(max_entries=3)
+    for i in range(3):
+        cache.put(NAMESPACE, f"prompt {i}", f"answer {i}")
+        clock.now += 1
+    # Reading prompt 0 makes prompt 1 the least recently used
+    assert cache.get(NAMESPACE, "prompt 0") == "answer 0"
+    clock.now += 1
+    cache.put(NAMESPACE, "prompt 3", "answer 3")
+
+    assert cache.get(NAMESPACE, "prompt 1") is None
+    assert [cache.get(NAMESPACE, f"prompt {i}") for i in (0, 2, 3)] == ["answer 0", "answer 2", "answer 3"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_a_full_cache_evicts_a_fraction_at_once(clock):
+    cache = ResponseCache(max_entries=10)
+    for i in range(11):
+        cache.put(NAMESPACE, f"prompt {i}", "answer")
+        clock.now += 1
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 9
+
+
+def test_near_duplicate_prompts_reuse_responses_when_enabled(clock):
+    prompt = ("Summarize the hiring pipeline for the senior backend engineer role, listing candidates "
+              "by stage with their match scores and the skills each one is missing")
+    similar = prompt + " please"
+    near = ResponseCache(near_duplicate_threshold=0.8)
+    near.put(NAMESPACE, prompt, "summary")
+    assert ResponseCache().get(NAMESPACE, similar) is None
+
+    # Signatures are stored with the entries, so another instance finds them too
+    near = ResponseCache(near_duplicate_threshold=0.8)
+    assert near.get(NAMESPACE, similar) == "summary"
+    assert near.get(NAMESPACE, "Write an outreach email to a data scientist") is None
+    stats = near.stats()
+    assert (stats["near_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_cache_is_shared_through_the_state_store(clock):
+    ResponseCache().put(NAMESPACE, "prompt", "answer")
+    other = ResponseCache()
+    assert other.get(NAMESPACE, "prompt") == "answer"
+    other.clear()
+    assert ResponseCache().get(NAMESPACE, "prompt") is None
+
+
+def test_counters_add_up_across_threads(clock):
+    cache = ResponseCache()
+    cache.put(NAMESPACE, "cached", "answer")
+
+    def lookups(worker):
+        for i in range(50):
+            cache.get(NAMESPACE, "cached")
+            cache.get(NAMESPACE, f"missing {worker} {i}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lookups, range(8)))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (400, 400, 0.5)
+
+
+def test_configuration_from_the_environment(monkeypatch):
+    monkeypatch.setenv("TALENTCREW_LLM_CACHE_TTL", "120")
+    monkeypatch.setenv("TALENTCREW_LLM_CACHE_SIZE", "50")
+    monkeypatch.delenv("TALENTCREW_LLM_CACHE_NEAR_DUPLICATES", raising=False)
+    cache = from_environment()
+    assert (cache.ttl, cache.max_entries, cache.near_duplicate_threshold) == (120.0, 50, None)
+    monkeypatch.setenv("TALENTCREW_LLM_CACHE_NEAR_DUPLICATES", "0.9")
+    assert from_environment().near_duplicate_threshold == 0.9
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+
+from agents.scheduling_agent import SchedulingAgent
+from utils import db
+from utils.scheduler import FreeSlots, InterviewScheduler, ResourcePool, WorkCalendar
+
+# A Monday, at the start of the working day
+MONDAY = datetime(2026, 1, 5, 9)
+
+
+def test_calendar_maps_slots_to_working_hours():
+    calendar = WorkCalendar()
+    assert calendar.slots_per_day == 8
+    assert calendar.to_datetime(0) == datetime(2024, 1, 1, 9)
+    assert calendar.to_datetime(8) == datetime(2024, 1, 2, 9)
+    # Friday's last slot is followed by Monday's first
+    assert calendar.to_datetime(39) == datetime(2024, 1, 5, 16)
+    assert calendar.to_datetime(40) == datetime(2024, 1, 8, 9)
+
+
+def test_calendar_rounds_up_to_the_next_slot():
+    calendar = WorkCalendar()
+    for slot in (0, 5, 39, 40, 1234):
+        assert calendar.slot_at_or_after(calendar.to_datetime(slot)) == slot
+    assert calendar.slot_at_or_after(datetime(2024, 1, 1, 9, 0, 1)) == 1
+    assert calendar.slot_at_or_after(datetime(2024, 1, 1, 7)) == 0
+    assert calendar.slot_at_or_after(datetime(2024, 1, 1, 17)) == 8
+    assert calendar.slot_at_or_after(datetime(2024, 1, 6, 12)) == 40
+
+
+def test_calendar_needs_room_for_a_slot():
+    with pytest.raises(ValueError):
+        WorkCalendar(slot_minutes=60 * 9)
+
+
+def test_free_slots():
+    slots = FreeSlots("Room A")
+    for slot in (5, 3, 4, 9):
+        slots.book(slot)
+    assert slots.booked == [3, 4, 5, 9]
+    assert slots.next_free(0) == 0
+    assert slots.next_free(3) == 6
+    assert slots.next_free(9) == 10
+    assert not slots.is_free(4)
+    slots.release(4)
+    slots.release(7)
+    assert slots.is_free(4)
+    assert slots.next_free(3) == 4
+
+
+def test_pool_finds_the_earliest_free_resource():
+    pool = ResourcePool(["a", "b"])
+    for slot in range(3):
+        pool.book("a", slot)
+    pool.book("b", 0)
+    pool.book("b", 1)
+    assert pool.earliest(0) == (2, "b")
+    pool.book("b", 2)
+    assert pool.earliest(0) == (3, "a")
+    with pytest.raises(ValueError):
+        ResourcePool([])
+
+
+def test_schedule_never_double_books():
+    scheduler = InterviewScheduler(["Ann", "Bob"], ["Room A", "Room B", "Room C"])
+    bookings = scheduler.schedule([f"c{i}" for i in range(10)], "Dev", not_before=MONDAY)
+    assert len(bookings) == 10
+    assert len({(b.interviewer, b.slot) for b in bookings.values()}) == 10
+    assert len({(b.room, b.slot) for b in bookings.values()}) == 10
+    # Two interviewers, so two interviews per slot, from the first slot on
+    first = WorkCalendar().slot_at_or_after(MONDAY)
+    assert sorted(b.slot for b in bookings.values()) == [first + i // 2 for i in range(10)]
+    assert bookings["c0"].start == "2026-01-05T09:00:00"
+
+
+def test_existing_bookings_are_kept_and_cancellation_frees_the_slot():
+    scheduler = InterviewScheduler(["Ann"], ["Room A"])
+    first = scheduler.schedule(["c1", "c2"], "Dev", not_before=MONDAY)
+    assert scheduler.schedule(["c1"], "Dev", not_before=MONDAY)["c1"] == first["c1"]
+
+    assert scheduler.cancel("c1")
+    assert not scheduler.cancel("c1")
+    assert scheduler.get_booking("c1") is None
+    assert scheduler.schedule(["c3"], "Dev", not_before=MONDAY)["c3"].slot == first["c1"].slot
+
+
+def test_a_late_booking_does_not_hide_earlier_slots():
+    scheduler = InterviewScheduler(["Ann"], ["Room A"])
+    late = scheduler.schedule(["c1"], "Dev", not_before=datetime(2026, 1, 19, 9))["c1"]
+    assert late.start == "2026-01-19T09:00:00"
+    assert scheduler.schedule(["c2"], "Dev", not_before=MONDAY)["c2"].start == "2026-01-05T09:00:00"
+
+
+def test_schedulers_sharing_the_state_store_see_each_other():
+    one = InterviewScheduler(["Ann"], ["Room A"])
+    two = InterviewScheduler(["Ann"], ["Room A"])
+    booked = one.schedule(["c1"], "Dev", not_before=MONDAY)["c1"]
+    assert two.get_booking("c1") == booked
+    assert two.schedule(["c2"], "Dev", not_before=MONDAY)["c2"].slot == booked.slot + 1
+
+
+def test_batch_gives_scarce_experts_to_the_candidates_that_need_them():
+    profiles = {"Ann": {"skills": ["python"]}, "Bob": {"skills": ["java"]}}
+    scheduler = InterviewScheduler(["Ann", "Bob"], ["Room A"], profiles=profiles)
+    bookings = scheduler.schedule_batch([("py", {"matching_skills": "python"}),
+                                         ("jv", {"missing_skills": ["java"]})], "Dev", not_before=MONDAY)
+    assert bookings["py"].interviewer == "Ann"
+    assert bookings["jv"].interviewer == "Bob"
+    # One room: the two interviews go in different slots
+    assert bookings["py"].slot != bookings["jv"].slot
+
+
+def test_batch_leaves_out_candidates_that_cannot_be_placed():
+    scheduler = InterviewScheduler(["Ann"], ["Room A"])
+    candidates = [(f"c{i}", {}) for i in range(5)]
+    bookings = scheduler.schedule_batch(candidates, "Dev", not_before=MONDAY, horizon_days=1,
+                                        max_columns=3)
+    assert len(bookings) == 3
+    assert len({b.slot for b in bookings.values()}) == 3
+
+
+def test_agent_reports_when_no_slot_is_free(backend, monkeypatch):
+    candidate_id, _ = db.upsert_candidate("Ann Lee", "ann@mail.com", "LinkedIn", "resume")
+    agent = SchedulingAgent(interviewers=["Ann"], rooms=["Room A"])
+    monkeypatch.setattr(agent.scheduler, "schedule", lambda *args, **kwargs: {})
+
+    result = agent._schedule_single_candidate(candidate_id, "Dev")
+    assert result == {"success": False, "message": "No available interview slot for Ann Lee"}
@@ -0,0 +1,101 @@
+import pytest
+
+from utils.storage import MemoryBackend, flatten_metadata
+
+PEOPLE = "people"
+
+
+@pytest.fixture
+def store():
+    store = MemoryBackend()
+    store.add(PEOPLE, ids=["a", "b", "c", "d"], metadatas=[
+        {"name": "Ann", "stage": "sourced", "job_title": "Dev", "score": 80},
+        {"name": "Bob", "stage": "screened", "job_title": "Dev", "score": 55},
+        {"name": "Cy", "stage": "sourced", "job_title": "QA"},
+        {"name": "Di", "job_title": "Dev", "skills": ["python", "sql"]}
+    ], documents=["ann resume", "bob resume", "cy resume", None])
+    return store
+
+
+def test_flatten_metadata_joins_lists_and_drops_none():
+    assert flatten_metadata({"skills": ["python", "sql"], "note": None, "age": 3}) == \
+        {"skills": "python, sql", "age": 3}
+
+
+def test_equality_filters_use_indexes_and_keep_insertion_order(store):
+    assert store.query(PEOPLE, where={"job_title": "Dev"})["ids"] == ["a", "b", "d"]
+    assert store.query(PEOPLE, where={"stage": "sourced", "job_title": "Dev"})["ids"] == ["a"]
+    # Unindexed fields are filtered by a scan
+    assert store.query(PEOPLE, where={"name": "Cy"})["ids"] == ["c"]
+    assert store.query(PEOPLE, where={"stage": "hired"})["ids"] == []
+
+
+def test_operator_filters(store):
+    assert store.query(PEOPLE, where={"stage": {"$in": ["sourced", "screened"]}})["ids"] == ["a", "b", "c"]
+    assert store.query(PEOPLE, where={"job_title": {"$ne": "Dev"}})["ids"] == ["c"]
+    assert store.query(PEOPLE, where={"name": {"$eq": "Bob"}})["ids"] == ["b"]
+
+
+def test_query_by_ids_limit_and_offset(store):
+    page = store.query(PEOPLE, ids=["c", "zz", "a"])
+    assert page["ids"] == ["c", "a"]
+    assert page["documents"] == ["cy resume", "ann resume"]
+    assert store.query(PEOPLE, limit=2, offset=1)["ids"] == ["b", "c"]
+    assert store.query(PEOPLE, ids=["a", "b"], where={"stage": "screened"})["ids"] == ["b"]
+    # An id list filtered down to nothing matches nothing, not everything
+    assert store.query(PEOPLE, ids=[]) == {"ids": [], "metadatas": [], "documents": []}
+
+
+def test_lists_are_stored_flattened(store):
+    assert store.query(PEOPLE, ids=["d"])["metadatas"][0]["skills"] == "python, sql"
+
+
+def test_results_are_copies(store):
+    store.query(PEOPLE, ids=["a"])["metadatas"][0]["stage"] = "hired"
+    assert store.query(PEOPLE, ids=["a"])["metadatas"][0]["stage"] == "sourced"
+
+
+def test_patch_merges_fields_and_moves_index_entries(store):
+    store.patch(PEOPLE, ids=["a", "missing"], metadatas=[{"stage": "screened"}, {"stage": "hired"}])
+    assert store.query(PEOPLE, ids=["a"])["metadatas"][0] == \
+        {"name": "Ann", "stage": "screened", "job_title": "Dev", "score": 80}
+    assert store.query(PEOPLE, where={"stage": "sourced"})["ids"] == ["c"]
+    assert store.query(PEOPLE, where={"stage": "screened"})["ids"] == ["a", "b"]
+    assert store.count(PEOPLE) == 4
+
+
+def test_patch_documents(store):
+    store.patch(PEOPLE, ids=["d"], documents=["di resume"])
+    assert store.query(PEOPLE, ids=["d"])["documents"] == ["di resume"]
+
+
+def test_add_rejects_existing_ids(store):
+    with pytest.raises(ValueError):
+        store.add(PEOPLE, ids=["e", "a"], metadatas=[{}, {}])
+    assert store.count(PEOPLE) == 4
+
+
+def test_aggregate_counts_missing_values_as_unknown(store):
+    assert store.aggregate(PEOPLE, "stage") == {"sourced": 2, "screened": 1, "Unknown": 1}
+    assert store.aggregate(PEOPLE, "job_title", where={"stage": "sourced"}) == {"Dev": 1, "QA": 1}
+    assert store.aggregate(PEOPLE, "name", where={"job_title": "QA"}) == {"Cy": 1}
+
+
+def test_count_iterate_and_ids(store):
+    assert store.count(PEOPLE, where={"job_title": "Dev"}) == 3
+    pages = list(store.iterate(PEOPLE, batch_size=3))
+    assert [page["ids"] for page in pages] == [["a", "b", "c"], ["d"]]
+    assert store.ids(PEOPLE) == ["a", "b", "c", "d"]
+    assert store.count("empty") == 0
+
+
+def test_writes_bump_the_collection_version(store):
+    version = store.write_version(PEOPLE)
+    store.query(PEOPLE)
+    assert store.write_version(PEOPLE) == version
+    store.patch(PEOPLE, ids=["a"], metadatas=[{"score": 90}])
+    assert store.write_version(PEOPLE) == version + 1
+    store.add(PEOPLE, ids=[], metadatas=[])
+    assert store.write_version(PEOPLE) == version + 1
+    assert store.write_version("other") == 0
+    assert store.bump_version("derived") == 1
@@ -0,0 +1,86 @@
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from generate_data import generate_data
+from utils import db
+from utils.synthetic import BLOCK_SIZE, STAGES, blocks, generate, generate_block, generate_records
+
+
+def flatten(results):
+    ids, metadatas, documents, log_ids = [], [], [], []
+    for (block_ids, block_metadatas, block_documents), (block_log_ids, _, _) in results:
+        ids += block_ids
+        metadatas += block_metadatas
+        documents += block_documents
+        log_ids += block_log_ids
+    return ids, metadatas, documents, log_ids
+
+
+def test_same_seed_same_rows_different_seed_different_rows():
+    first = generate_records(7, 0, 200)
+    assert generate_records(7, 0, 200) == first
+    assert generate_records(8, 0, 200)[0][0] != first[0][0]
+
+
+def test_short_blocks_are_a_prefix_of_the_full_block():
+    full, short = generate_block(3, 1), generate_block(3, 1, 10)
+    for name, column in short.items():
+        assert len(column) == 10
+        assert (column == full[name][:10]).all()
+    assert short["index"][0] == BLOCK_SIZE
+
+
+def test_blocks_cover_the_count():
+    assert blocks(0) == []
+    assert blocks(BLOCK_SIZE) == [(0, BLOCK_SIZE)]
+    assert blocks(BLOCK_SIZE + 3) == [(0, BLOCK_SIZE), (1, 3)]
+
+
+def test_parallel_generation_gives_the_same_rows_in_order():
+    count = BLOCK_SIZE + 700
+    serial = flatten(generate(count, seed=5))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert flatten(generate(count, seed=5, executor=executor, lookahead=2)) == serial
+    assert len(serial[0]) == count
+
+
+def test_ids_are_unique_version_4_uuids():
+    ids, _, _, log_ids = flatten(generate(3000, seed=1))
+    assert len(set(ids + log_ids)) == len(ids) + len(log_ids)
+    assert all(uuid.UUID(value).version == 4 for value in ids[:100] + log_ids[:100])
+
+
+def test_records_are_consistent_with_their_stage():
+    (_, metadatas, documents), (_, log_metadatas, _) = generate_records(2, 0, 2000)
+    reached = 0
+    for metadata, document in zip(metadatas, documents):
+        stage = STAGES.index(metadata["stage"])
+        reached += 1 + stage + (stage == 1 and bool(metadata.get("engaged")))
+        assert metadata["name"] in document
+        assert ("match_score" in metadata) == (stage >= 1)
+        assert metadata.get("is_interested", False) == (stage >= 2)
+        assert ("interview_datetime" in metadata) == (stage == 3)
+    # One activity log entry per stage a candidate reached
+    assert len(log_metadatas) == reached
+
+
+def test_digest_is_the_sha256_of_the_output(tmp_path):
+    output = tmp_path / "candidates.jsonl"
+    result = generate_data(1200, seed=9, output=str(output), logs_output=str(tmp_path / "logs.jsonl"))
+    assert result["candidates"] == 1200
+    assert result["digest"] == hashlib.sha256(output.read_bytes()).hexdigest()
+    assert len(output.read_text().splitlines()) == 1200
+
+    assert generate_data(1200, seed=9, digest=True, output=str(tmp_path / "again.jsonl"))["digest"] == \
+        result["digest"]
+    assert generate_data(1200, seed=10, digest=True, output=str(tmp_path / "other.jsonl"))["digest"] != \
+        result["digest"]
+
+
+def test_loading_into_storage_gives_the_same_digest(backend, tmp_path):
+    written = generate_data(600, seed=4, output=str(tmp_path / "candidates.jsonl"))
+    loaded = generate_data(600, seed=4, digest=True)
+    assert loaded["digest"] == written["digest"]
+    assert backend.count(db.CANDIDATE_COLLECTION) == 600
+    assert backend.count(db.LOG_COLLECTION) == loaded["logs"]
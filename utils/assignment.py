@@ -0,0 +1,95 @@
+"""
+Minimum-cost assignment of rows (e.g. candidates) to columns (e.g.
+interview slots).
+
+solve_assignment is the shortest augmenting path algorithm for rectangular
+problems (Jonker-Volgenant, as in scipy's linear_sum_assignment), with the
+inner loop vectorized over columns: one augmentation costs a few numpy
+passes over a row per row in its search tree, and nearly all trees are a
+single row when columns outnumber rows.
+"""
+import numpy as np
+
+
+def solve_assignment(cost, unassigned_cost=None):
+    """
+    Assign each row to a distinct column minimizing total cost. `cost` is a
+    (rows x columns) array; np.inf marks forbidden pairs. Returns an array
+    with the column of each row, or -1 for rows left unassigned.
+
+    With `unassigned_cost`, a row may stay unassigned at that cost (so rows
+    with no feasible column, or more rows than columns, are allowed);
+    without it every row must be assigned or ValueError is raised.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    n_rows, n_columns = cost.shape
+    if unassigned_cost is not None:
+        # One private "unassigned" column per row
+        dummy = np.full((n_rows, n_rows), np.inf)
+        np.fill_diagonal(dummy, unassigned_cost)
+        cost = np.hstack([cost, dummy])
+    elif n_rows > n_columns:
+        raise ValueError("more rows than columns")
+
+    assignment = _augmenting_paths(cost)
+    if unassigned_cost is not None:
+        assignment[assignment >= n_columns] = -1
+    return assignment
+
+
+def _augmenting_paths(cost):
+    n_rows, n_columns = cost.shape
+    u = np.zeros(n_rows)
+    v = np.zeros(n_columns)
+    column_of_row = np.full(n_rows, -1, dtype=np.int64)
+    row_of_column = np.full(n_columns, -1, dtype=np.int64)
+
+    for current_row in range(n_rows):
+        shortest = np.full(n_columns, np.inf)
+        path = np.full(n_columns, -1, dtype=np.int64)
+        scanned = np.zeros(n_columns, dtype=bool)
+        tree_rows = []
+        min_value = 0.0
+        row = current_row
+        sink = -1
+
+        while sink == -1:
+            tree_rows.append(row)
+            reduced = min_value + cost[row] - u[row] - v
+            better = (reduced < shortest) & ~scanned
+            path[better] = row
+            shortest[better] = reduced[better]
+
+            candidates = np.where(scanned, np.inf, shortest)
+            column = int(np.argmin(candidates))
+            lowest = candidates[column]
+            if lowest == np.inf:
+                raise ValueError(f"row {current_row} cannot be assigned")
+            # On ties, finish at a free column rather than extending the tree
+            free = (candidates == lowest) & (row_of_column == -1)
+            if free.any():
+                column = int(np.argmax(free))
+
+            min_value = lowest
+            scanned[column] = True
+            if row_of_column[column] == -1:
+                sink = column
+            else:
+                row = row_of_column[column]
+
+        # Update the dual variables
+        u[current_row] += min_value
+        for row in tree_rows[1:]:
+            u[row] += min_value - shortest[column_of_row[row]]
+        v[scanned] -= min_value - shortest[scanned]
+
+        # Flip the path
+        column = sink
+        while True:
+            row = path[column]
+            row_of_column[column] = row
+            column_of_row[row], column = column, column_of_row[row]
+            if row == current_row:
+                break
+
+    return column_of_row
@@ -0,0 +1,103 @@
+"""
+Progress of pipeline runs, saved after every stage batch in the shared
+state store. A run that died part way (an LLM outage, a restarted process)
+can be resumed under the same run id: finished stages are skipped and
+sourcing only tops up what is still missing. Candidates themselves carry
+their stage, so each stage only picks up those it hasn't handled yet.
+"""
+import json
+import time
+
+from utils import state
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS pipeline_runs (
+        run_id TEXT PRIMARY KEY,
+        job_title TEXT NOT NULL,
+        job_description TEXT NOT NULL,
+        candidate_count INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        run_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        status TEXT NOT NULL,
+        cursor INTEGER NOT NULL,
+        counts TEXT NOT NULL,
+        result TEXT,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (run_id, stage)
+    )""",
+    "CREATE INDEX IF NOT EXISTS pipeline_runs_status ON pipeline_runs (status, job_title)"
+]
+
+
+class CheckpointStore:
+
+    def _connection(self):
+        return state.ensure_schema("checkpoints", _SCHEMA)
+
+    def start_run(self, run_id, job_title, job_description, candidate_count):
+        """Record a run, or mark an existing one as running again"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT INTO pipeline_runs (run_id, job_title, job_description, candidate_count, "
+                "status, created_at, updated_at) VALUES (?, ?, ?, ?, 'running', ?, ?) "
+                "ON CONFLICT (run_id) DO UPDATE SET status = 'running', updated_at = excluded.updated_at",
+                (run_id, job_title, job_description, candidate_count, now, now))
+
+    def finish_run(self, run_id, status):
+        with state.transaction(self._connection()) as connection:
+            connection.execute("UPDATE pipeline_runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                               (status, time.time(), run_id))
+
+    def get_run(self, run_id):
+        """The run's parameters and status, or None if unknown"""
+        row = self._connection().execute(
+            "SELECT run_id, job_title, job_description, candidate_count, status, created_at, updated_at "
+            "FROM pipeline_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._run_dict(row) if row else None
+
+    def unfinished_runs(self, job_title=None):
+        """Runs that failed or never finished, newest first"""
+        query = ("SELECT run_id, job_title, job_description, candidate_count, status, created_at, "
+                 "updated_at FROM pipeline_runs WHERE status IN ('running', 'failed')")
+        params = []
+        if job_title is not None:
+            query += " AND job_title = ?"
+            params.append(job_title)
+        rows = self._connection().execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [self._run_dict(row) for row in rows]
+
+    def save(self, run_id, stage, cursor, counts, status="running", result=None):
+        """Record a stage's progress: items handled so far, its counters and, once done, its result"""
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, stage, status, cursor, counts, result, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, stage, status, cursor, json.dumps(counts),
+                 json.dumps(result) if result is not None else None, time.time()))
+
+    def load(self, run_id):
+        """Latest checkpoint per stage: {stage: {"status", "cursor", "counts", "result"}}"""
+        rows = self._connection().execute(
+            "SELECT stage, status, cursor, counts, result FROM checkpoints WHERE run_id = ?",
+            (run_id,)).fetchall()
+        return {
+            row[0]: {
+                "status": row[1],
+                "cursor": row[2],
+                "counts": json.loads(row[3]),
+                "result": json.loads(row[4]) if row[4] else None
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def _run_dict(row):
+        keys = ("run_id", "job_title", "job_description", "candidate_count", "status",
+                "created_at", "updated_at")
+        return dict(zip(keys, row))
@@ -1,39 +1,183 @@
-import os
 import uuid
 import time
-import chromadb
-from chromadb.config import Settings
+import threading
+from collections import OrderedDict
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings.fake import FakeEmbeddings
 import streamlit as st
+from utils.storage import ChromaBackend, flatten_metadata
+from utils.identity import IdentityIndex
+from utils.dedup import NearDuplicateIndex, minhash_signature
 
 # Default collection names
 RESUME_COLLECTION = "resume_collection"
 LOG_COLLECTION = "log_collection"
 CANDIDATE_COLLECTION = "candidate_collection"
 
-
-def initialize_db():
+# Read-through cache bounds: total cached records across all entries, and
+# the number of distinct queries kept.
+CACHE_MAX_RECORDS = 200000
+CACHE_MAX_ENTRIES = 512
+
+
+class QueryCache:
+    """
+    LRU cache of query results. Each entry remembers the write version of
+    the collection it was read from and is treated as a miss once that
+    version moves on.
+    """
+
+    def __init__(self, max_records=CACHE_MAX_RECORDS,
+                 max_entries=CACHE_MAX_ENTRIES):
+        self.max_records = max_records
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._records = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value, cost=1):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if cost > self.max_records:
+                return
+            self._entries[key] = (version, value, cost)
+            self._records += cost
+            while (self._records > self.max_records
+                   or len(self._entries) > self.max_entries):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, _, cost = self._entries.pop(key)
+        self._records -= cost
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._records = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "records": self._records,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+
+# The active storage backend. Set once by initialize_db() (or set_backend()
+# in tests, benchmarks and headless runs) and shared by every session in
+# the process. Backends keep a per-collection write version that every write
+# bumps, so cached reads can tell whether the underlying data has changed;
+# a ChromaBackend shares them with other processes through the state store.
+_backend = None
+_query_cache = QueryCache()
+
+# Identity index over the active backend's candidates, built on first use
+# and kept current by the candidate write functions below. Candidates added
+# by other processes (imports, the CLI) bump the backend's IDENTITY_VERSION;
+# on next use, the indexes built before that take in just those candidates.
+IDENTITY_VERSION = "candidate_identities"
+_identity_index = None
+_identity_version = None
+_identity_lock = threading.RLock()
+
+# MinHash LSH index of candidate resumes for near-duplicate detection, built
+# on first use from the "minhash" signature stored on each candidate.
+_near_duplicate_index = None
+
+# Candidates in every index built so far
+_indexed_ids = set()
+
+
+def set_backend(backend):
+    """Install a storage backend and create the default collections on it"""
+    global _backend
+    for collection_name in (RESUME_COLLECTION, LOG_COLLECTION, CANDIDATE_COLLECTION):
+        backend.ensure_collection(collection_name)
+    _backend = backend
+    _query_cache.clear()
+    _reset_identity_index()
+    return backend
+
+
+def get_backend():
+    """Return the active storage backend"""
+    if _backend is None:
+        raise RuntimeError("Database not initialized; call initialize_db() first")
+    return _backend
+
+
+def get_write_version(collection_name):
+    """Return the current write version of a collection"""
+    return get_backend().write_version(collection_name)
+
+
+def get_cache_stats():
+    """Return hit/miss counters and occupancy of the read-through cache"""
+    return _query_cache.stats()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _experience_band(metadata):
     try:
-        if not os.path.exists("./chroma_db"):
-            os.makedirs("./chroma_db")
-
-        client = chromadb.PersistentClient(
-            path="./chroma_db",
-            settings=Settings(anonymized_telemetry=False)
-        )
-
-        collections = client.list_collections()
-        collection_names = [c.name for c in collections]
-
-        if RESUME_COLLECTION not in collection_names:
-            client.create_collection(RESUME_COLLECTION)
-        if LOG_COLLECTION not in collection_names:
-            client.create_collection(LOG_COLLECTION)
-        if CANDIDATE_COLLECTION not in collection_names:
-            client.create_collection(CANDIDATE_COLLECTION)
-
-        st.session_state.chroma_client = client
+        years = int(metadata.get("experience_years", 0))
+    except (TypeError, ValueError):
+        return "Unknown"
+    if years <= 2:
+        return "0-2 years"
+    if years <= 5:
+        return "3-5 years"
+    if years <= 9:
+        return "6-9 years"
+    return "10+ years"
+
+
+# Fields computed from candidate metadata rather than stored on it
+DERIVED_FIELDS = {
+    "experience_band": _experience_band
+}
+
+
+def initialize_db(path="./chroma_db", backend=None):
+    """
+    Initialize storage. Uses a persistent Chroma backend at `path` unless a
+    backend is passed in, e.g. utils.storage.MemoryBackend() for tests.
+    """
+    try:
+        if backend is None:
+            if isinstance(_backend, ChromaBackend) and _backend.path == path:
+                return True
+            backend = ChromaBackend(path)
+        set_backend(backend)
         return True
     except Exception as e:
         st.error(f"Failed to initialize database: {str(e)}")
@@ -56,13 +200,11 @@ def get_langchain_db(collection_name=CANDIDATE_COLLECTION):
 
 def log_activity(agent_name, action, status, details=""):
     try:
-        client = st.session_state.chroma_client
-        collection = client.get_collection(LOG_COLLECTION)
-
         log_id = str(uuid.uuid4())
         timestamp = time.time()
 
-        collection.add(
+        get_backend().add(
+            LOG_COLLECTION,
             ids=[log_id],
             metadatas=[{
                 "agent": agent_name,
@@ -79,31 +221,38 @@ def log_activity(agent_name, action, status, details=""):
         return False
 
 
+def log_activities(entries):
+    """Bulk version of log_activity for (agent_name, action, status, details) tuples"""
+    try:
+        entries = list(entries)
+        timestamp = time.time()
+        get_backend().add(
+            LOG_COLLECTION,
+            ids=[str(uuid.uuid4()) for _ in entries],
+            metadatas=[{
+                "agent": agent_name,
+                "action": action,
+                "status": status,
+                "details": details,
+                "timestamp": timestamp
+            } for agent_name, action, status, details in entries],
+            documents=[f"{agent_name} {action}: {status} - {details}"
+                       for agent_name, action, status, details in entries]
+        )
+        return True
+    except Exception as e:
+        print(f"Error logging activity: {str(e)}")
+        return False
+
+
 def get_metrics():
     try:
-        client = st.session_state.chroma_client
-        candidates_collection = client.get_collection(CANDIDATE_COLLECTION)
-        logs_collection = client.get_collection(LOG_COLLECTION)
-
-        candidates = candidates_collection.get()
-        logs = logs_collection.get()
-
-        total_sourced = 0
-        total_screened = 0
-        total_engaged = 0
-        total_scheduled = 0
-
-        if candidates and 'metadatas' in candidates and candidates['metadatas']:
-            for metadata in candidates['metadatas']:
-                stage = metadata.get('stage', '')
-                if stage == 'sourced':
-                    total_sourced += 1
-                elif stage == 'screened':
-                    total_screened += 1
-                elif stage == 'engaged':
-                    total_engaged += 1
-                elif stage == 'scheduled':
-                    total_scheduled += 1
+        stage_counts = group_counts("stage")
+
+        total_sourced = stage_counts.get('sourced', 0)
+        total_screened = stage_counts.get('screened', 0)
+        total_engaged = stage_counts.get('engaged', 0)
+        total_scheduled = stage_counts.get('scheduled', 0)
 
         if total_sourced == 0:
             total_sourced = 1
@@ -129,54 +278,295 @@ def get_metrics():
         }
 
 
+def _reset_identity_index():
+    global _identity_index, _near_duplicate_index
+    with _identity_lock:
+        _identity_index = None
+        _near_duplicate_index = None
+        _indexed_ids.clear()
+
+
+def _stored_candidates(ids=None, batch_size=1000):
+    """(id, metadata, document) for every stored candidate, or for `ids` only"""
+    backend = get_backend()
+    if ids is None:
+        pages = backend.iterate(CANDIDATE_COLLECTION, batch_size=batch_size)
+    else:
+        pages = (backend.query(CANDIDATE_COLLECTION, ids=ids[start:start + batch_size])
+                 for start in range(0, len(ids), batch_size))
+    for page in pages:
+        for candidate_id, metadata, document in zip(page["ids"], page["metadatas"], page["documents"]):
+            yield candidate_id, metadata or {}, document
+
+
+def _index_candidate(candidate_id, metadata, document, identities=None, near_duplicates=None):
+    if identities is not None:
+        identities.register(candidate_id, metadata.get("name"), metadata.get("email"))
+    if near_duplicates is not None:
+        near_duplicates.insert(candidate_id, _signature_of(metadata, document), metadata.get("name"))
+
+
+def _built(scanned):
+    """Record that an index was just built from the candidates `scanned`"""
+    global _indexed_ids
+    others = _identity_index is not None or _near_duplicate_index is not None
+    _indexed_ids = _indexed_ids & scanned if others else scanned
+
+
+def _check_identity_version():
+    """Add candidates stored elsewhere since the indexes were built to them"""
+    global _identity_version
+    version = get_backend().write_version(IDENTITY_VERSION)
+    if version == _identity_version:
+        return
+    if _identity_index is not None or _near_duplicate_index is not None:
+        added = [candidate_id for candidate_id in get_backend().ids(CANDIDATE_COLLECTION)
+                 if candidate_id not in _indexed_ids]
+        for candidate_id, metadata, document in _stored_candidates(added):
+            _index_candidate(candidate_id, metadata, document, _identity_index, _near_duplicate_index)
+        _indexed_ids.update(added)
+    _identity_version = version
+
+
+def _identities_changed():
+    """
+    Record that candidates were added. The indexes here already include
+    them; they only need rebuilding if another process added some too.
+    """
+    global _identity_version
+    version = get_backend().bump_version(IDENTITY_VERSION)
+    if _identity_version is not None and version == _identity_version + 1:
+        _identity_version = version
+
+
+def _get_identity_index():
+    global _identity_index
+    with _identity_lock:
+        _check_identity_version()
+        if _identity_index is None:
+            index, scanned = IdentityIndex(), set()
+            for candidate_id, metadata, document in _stored_candidates():
+                _index_candidate(candidate_id, metadata, document, identities=index)
+                scanned.add(candidate_id)
+            _built(scanned)
+            _identity_index = index
+        return _identity_index
+
+
+def find_candidate(name=None, email=None, fuzzy=False):
+    """Return the id of an existing candidate with this identity, or None"""
+    return _get_identity_index().lookup(name, email, fuzzy=fuzzy)
+
+
+def _signature_of(metadata, document):
+    stored = metadata.get("minhash")
+    if stored:
+        try:
+            return bytes.fromhex(stored)
+        except ValueError:
+            pass
+    return minhash_signature(document or "")
+
+
+def _get_near_duplicate_index():
+    global _near_duplicate_index
+    with _identity_lock:
+        _check_identity_version()
+        if _near_duplicate_index is None:
+            index, scanned = NearDuplicateIndex(), set()
+            for candidate_id, metadata, document in _stored_candidates():
+                _index_candidate(candidate_id, metadata, document, near_duplicates=index)
+                scanned.add(candidate_id)
+            _built(scanned)
+            _near_duplicate_index = index
+        return _near_duplicate_index
+
+
+def find_near_duplicates(resume_text, name=None, limit=5):
+    """
+    Return (candidate_id, similarity) pairs for stored candidates whose resume
+    is a near-duplicate of `resume_text`, most similar first.
+    """
+    return _get_near_duplicate_index().query(minhash_signature(resume_text),
+                                             name=name, limit=limit)
+
+
+def _merge_candidate(existing, incoming):
+    """
+    Fields to patch onto an existing candidate when the same person is
+    ingested again: stored values win (so a re-sourced candidate never falls
+    back to an earlier stage), new fields fill gaps, and every source the
+    candidate was seen on is remembered.
+    """
+    patch = {key: value for key, value in incoming.items() if key not in existing}
+    known = existing.get("sources") or existing.get("source") or ""
+    sources = [s for s in str(known).split(", ") if s]
+    source = incoming.get("source")
+    if source and source not in sources:
+        sources.append(source)
+        patch["sources"] = ", ".join(sources)
+    return patch
+
+
+def add_candidates(candidates, fuzzy=False):
+    """
+    Bulk upsert of candidates. Each candidate is a dict with "name", "email",
+    "source", "resume_text" and optional "metadata". People already stored
+    (matched by normalized email, or also by name plus email when `fuzzy`)
+    are merged instead of inserted again.
+
+    Returns one (candidate_id, created) pair per input, in order.
+    """
+    results = []
+    new_ids, new_metadatas, new_documents = [], [], []
+    # Position in new_ids of each candidate created in this batch
+    new_positions = {}
+    matched = {}
+
+    with _identity_lock:
+        index = _get_identity_index()
+        try:
+            for candidate in candidates:
+                metadata = dict(candidate.get("metadata") or {})
+                metadata.setdefault("stage", "sourced")
+                metadata.update({
+                    "name": candidate["name"],
+                    "email": candidate["email"],
+                    "source": candidate["source"]
+                })
+
+                candidate_id = index.lookup(candidate["name"], candidate["email"], fuzzy=fuzzy)
+                if candidate_id is None:
+                    candidate_id = str(uuid.uuid4())
+                    index.register(candidate_id, candidate["name"], candidate["email"])
+                    signature = _signature_of(metadata, candidate.get("resume_text", ""))
+                    metadata["minhash"] = signature.hex()
+                    if _near_duplicate_index is not None:
+                        _near_duplicate_index.insert(candidate_id, signature, candidate["name"])
+                    _indexed_ids.add(candidate_id)
+                    new_positions[candidate_id] = len(new_ids)
+                    new_ids.append(candidate_id)
+                    new_metadatas.append(metadata)
+                    new_documents.append(candidate.get("resume_text", ""))
+                    results.append((candidate_id, True))
+                elif candidate_id in new_positions:
+                    # Seen earlier in this batch: merge into the record about to be written
+                    pending = new_metadatas[new_positions[candidate_id]]
+                    pending.update(_merge_candidate(flatten_metadata(pending), flatten_metadata(metadata)))
+                    results.append((candidate_id, False))
+                else:
+                    matched.setdefault(candidate_id, []).append(metadata)
+                    results.append((candidate_id, False))
+
+            backend = get_backend()
+            backend.add(CANDIDATE_COLLECTION, ids=new_ids,
+                        metadatas=new_metadatas, documents=new_documents)
+            if new_ids:
+                _identities_changed()
+
+            if matched:
+                existing = backend.query(CANDIDATE_COLLECTION, ids=list(matched))
+                patch_ids, patches = [], []
+                for candidate_id, stored in zip(existing["ids"], existing["metadatas"]):
+                    stored = flatten_metadata(stored)
+                    patch = {}
+                    for incoming in matched[candidate_id]:
+                        change = _merge_candidate(stored, flatten_metadata(incoming))
+                        stored.update(change)
+                        patch.update(change)
+                    if patch:
+                        patch_ids.append(candidate_id)
+                        patches.append(patch)
+                backend.patch(CANDIDATE_COLLECTION, ids=patch_ids, metadatas=patches)
+        except Exception:
+            # The index may now reference ids that were never written
+            _reset_identity_index()
+            raise
+
+    return results
+
+
+def merge_candidate(candidate_id, source, metadata=None):
+    """Merge a near-duplicate sighting into an existing candidate record"""
+    incoming = dict(metadata or {})
+    incoming["source"] = source
+    existing = get_backend().query(CANDIDATE_COLLECTION, ids=[candidate_id])
+    if not existing["ids"]:
+        return False
+    patch = _merge_candidate(flatten_metadata(existing["metadatas"][0]),
+                             flatten_metadata(incoming))
+    if patch:
+        return update_candidate(candidate_id, patch)
+    return True
+
+
+def upsert_candidate(name, email, source, resume_text, metadata=None, fuzzy=False):
+    """Insert a candidate, or merge into the existing record for the same person. Returns (candidate_id, created)."""
+    return add_candidates([{
+        "name": name,
+        "email": email,
+        "source": source,
+        "resume_text": resume_text,
+        "metadata": metadata
+    }], fuzzy=fuzzy)[0]
+
+
 def add_candidate(name, email, source, resume_text, metadata=None):
     try:
-        client = st.session_state.chroma_client
-        collection = client.get_collection(CANDIDATE_COLLECTION)
-        candidate_id = str(uuid.uuid4())
-
-        if metadata is None:
-            metadata = {}
-
-        if 'stage' not in metadata:
-            metadata['stage'] = 'sourced'
-
-        metadata.update({
-            "name": name,
-            "email": email,
-            "source": source
-        })
-
-        collection.add(
-            ids=[candidate_id],
-            metadatas=[metadata],
-            documents=[resume_text]
-        )
+        candidate_id, created = upsert_candidate(name, email, source, resume_text, metadata)
 
-        log_activity("system", "add_candidate", "success", f"Added candidate {name}")
+        if created:
+            log_activity("system", "add_candidate", "success", f"Added candidate {name}")
+        else:
+            log_activity("system", "add_candidate", "success", f"Merged duplicate of {name}")
         return candidate_id
     except Exception as e:
         log_activity("system", "add_candidate", "failed", str(e))
         return None
 
 
-def update_candidate_stage(candidate_id, new_stage):
+def load_records(collection_name, ids, metadatas, documents):
+    """
+    Raw bulk insert for data known to be new and distinct, e.g. generated
+    load-test data: no identity matching, merging or signatures. Identity
+    indexes take the records in on next use, in every process.
+    """
+    get_backend().add(collection_name, ids=ids, metadatas=metadatas, documents=documents)
+    if collection_name == CANDIDATE_COLLECTION:
+        with _identity_lock:
+            get_backend().bump_version(IDENTITY_VERSION)
+
+
+def update_candidate(candidate_id, metadata, document=None):
+    """Write back a candidate's metadata (and optionally its resume text)"""
+    return update_candidates([candidate_id], [metadata],
+                             None if document is None else [document])
+
+
+def update_candidates(candidate_ids, metadatas, documents=None):
+    """Merge metadata updates into many candidates with one backend write"""
     try:
-        client = st.session_state.chroma_client
-        collection = client.get_collection(CANDIDATE_COLLECTION)
+        get_backend().patch(CANDIDATE_COLLECTION,
+                            ids=list(candidate_ids),
+                            metadatas=list(metadatas),
+                            documents=documents)
+        return True
+    except Exception as e:
+        log_activity("system", "update_candidate", "failed", str(e))
+        return False
 
-        result = collection.get(ids=[candidate_id])
-        if not result or not result['metadatas']:
+
+def update_candidate_stage(candidate_id, new_stage):
+    try:
+        result = get_records(ids=[candidate_id])
+        if not result['metadatas']:
             return False
 
         metadata = result['metadatas'][0]
         metadata['stage'] = new_stage
 
-        collection.update(
-            ids=[candidate_id],
-            metadatas=[metadata],
-            documents=[result['documents'][0]]
-        )
+        if not update_candidate(candidate_id, {"stage": new_stage}):
+            return False
 
         log_activity("system", "update_candidate", "success", f"Updated {metadata.get('name')} to {new_stage}")
         return True
@@ -185,13 +575,32 @@ def update_candidate_stage(candidate_id, new_stage):
         return False
 
 
-def get_candidates():
+def get_records(collection_name=CANDIDATE_COLLECTION, where=None, ids=None):
+    """
+    Read-through cached query against the active backend. Returns a dict with
+    "ids", "metadatas" and "documents"; metadata dicts are copies, so callers
+    may modify them freely.
+    """
+    cache_key = (collection_name, "get", _freeze(where), _freeze(ids))
+    version = get_write_version(collection_name)
+
+    result = _query_cache.get(cache_key, version)
+    if result is None:
+        result = get_backend().query(collection_name, where=where, ids=ids)
+        _query_cache.put(cache_key, version, result,
+                         cost=len(result["ids"]) + 1)
+
+    return {
+        "ids": list(result["ids"]),
+        "metadatas": [dict(m or {}) for m in result["metadatas"]],
+        "documents": list(result["documents"])
+    }
+
+
+def get_candidates(where=None):
     """Return a list of all candidate metadata"""
     try:
-        client = st.session_state.chroma_client
-        collection = client.get_collection(CANDIDATE_COLLECTION)
-        result = collection.get()
-        return result.get("metadatas", [])
+        return get_records(CANDIDATE_COLLECTION, where=where)["metadatas"]
     except Exception as e:
         st.error(f"Error getting candidates: {str(e)}")
         return []
@@ -208,19 +617,38 @@ def get_hiring_status():
 - Engagement Rate: {metrics["engagement_rate"]:.2f}%"""
 
 
+def group_counts(field, where=None, collection_name=CANDIDATE_COLLECTION):
+    """
+    Count records per value of a metadata field, optionally filtered by a
+    flat {field: value} where clause. Derived fields such as
+    "experience_band" are computed from the stored metadata.
+
+    Results are served from the read-through cache until the collection's
+    write version changes.
+    """
+    cache_key = (collection_name, "group_counts", field, _freeze(where))
+    version = get_write_version(collection_name)
+
+    counts = _query_cache.get(cache_key, version)
+    if counts is None:
+        derive = DERIVED_FIELDS.get(field)
+        if derive is None:
+            counts = get_backend().aggregate(collection_name, field, where=where)
+        else:
+            counts = {}
+            for page in get_backend().iterate(collection_name, where=where):
+                for metadata in page["metadatas"]:
+                    value = derive(metadata or {})
+                    counts[value] = counts.get(value, 0) + 1
+        _query_cache.put(cache_key, version, counts, cost=1)
+
+    return dict(counts)
+
+
 def get_candidates_per_role():
     """Count number of candidates per job role (from metadata)"""
     try:
-        client = st.session_state.chroma_client
-        collection = client.get_collection(CANDIDATE_COLLECTION)
-        result = collection.get()
-        role_counts = {}
-
-        for metadata in result.get("metadatas", []):
-            role = metadata.get("role", "Unknown")
-            role_counts[role] = role_counts.get(role, 0) + 1
-
-        return role_counts
+        return group_counts("job_title")
     except Exception as e:
         st.error(f"Error counting candidates per role: {str(e)}")
         return {}
@@ -0,0 +1,159 @@
+import hashlib
+import random
+import re
+import threading
+
+import numpy as np
+
+# MinHash parameters. Signatures keep the low 8 bits of each of NUM_PERM
+# min-hashes (b-bit minwise hashing), so a resume costs NUM_PERM bytes in
+# the index. BANDS x ROWS must equal NUM_PERM; with 16 bands of 8 rows,
+# pairs above ~0.7 Jaccard similarity are very likely to share a bucket.
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+# Signature of a document without any tokens. Empty resumes share nothing,
+# so this signature is never similar to anything, including itself.
+EMPTY_SIGNATURE = bytes(NUM_PERM)
+
+_MERSENNE_61 = (1 << 61) - 1
+_rng = random.Random(20250413)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_61), _rng.randrange(0, _MERSENNE_61))
+                 for _ in range(NUM_PERM)]
+# Permutation coefficients split into 31-bit halves, so that a * h mod the
+# Mersenne prime can be computed exactly in uint64 arithmetic
+_A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+_B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)[:, None]
+_A_HIGH, _A_LOW = _A >> np.uint64(31), _A & np.uint64((1 << 31) - 1)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9@.+#]+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of word n-grams of a document"""
+    tokens = _TOKEN_PATTERN.findall((text or "").lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text):
+    """b-bit MinHash signature of a document as NUM_PERM bytes"""
+    hashes = b"".join(hashlib.blake2b(s.encode(), digest_size=8).digest() for s in shingles(text))
+    if not hashes:
+        return EMPTY_SIGNATURE
+    h = _mod_mersenne(np.frombuffer(hashes, dtype="<u8").astype(np.uint64))
+    return (_permute(h).min(axis=1) & np.uint64(0xFF)).astype(np.uint8).tobytes()
+
+
+def _mod_mersenne(x):
+    """x mod 2^61 - 1 for uint64 arrays"""
+    p = np.uint64(_MERSENNE_61)
+    x = (x & p) + (x >> np.uint64(61))
+    x = (x & p) + (x >> np.uint64(61))
+    return np.where(x >= p, x - p, x)
+
+
+def _permute(h):
+    """
+    (a * h + b) mod 2^61 - 1 for every permutation (rows) and hash h < 2^61
+    (columns). The product is assembled from 31-bit halves, using 2^61 = 1,
+    so no intermediate value overflows 64 bits.
+    """
+    h_high, h_low = h >> np.uint64(31), h & np.uint64((1 << 31) - 1)
+    middle = _A_HIGH * h_low + _A_LOW * h_high
+    total = ((_A_HIGH * h_high) << np.uint64(1)) + (middle >> np.uint64(30)) \
+        + ((middle & np.uint64((1 << 30) - 1)) << np.uint64(31)) + _A_LOW * h_low + _B
+    return _mod_mersenne(total)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two signatures, corrected for 8-bit collisions"""
+    if signature_a == EMPTY_SIGNATURE or signature_b == EMPTY_SIGNATURE:
+        return 0.0
+    agree = sum(1 for x, y in zip(signature_a, signature_b) if x == y) / NUM_PERM
+    return max(0.0, (agree - 1 / 256) / (1 - 1 / 256))
+
+
+def _name_tokens(name):
+    if not name or name.lower().startswith("unknown"):
+        return None
+    return frozenset(re.findall(r"[a-z]+", name.lower())) or None
+
+
+def names_compatible(name_a, name_b):
+    """
+    Templated resumes from different people can be textually very close,
+    so a near-duplicate also needs compatible names: one name's tokens must
+    contain the other's. Missing names are compatible with anything.
+    """
+    tokens_a, tokens_b = _name_tokens(name_a), _name_tokens(name_b)
+    if tokens_a is None or tokens_b is None:
+        return True
+    return tokens_a <= tokens_b or tokens_b <= tokens_a
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index. A lookup only compares against documents sharing at
+    least one band bucket, so its cost depends on the number of similar
+    documents rather than the size of the index.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, bands=BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows] for i in range(self.bands)]
+
+    def insert(self, key, signature, name=None):
+        if signature == EMPTY_SIGNATURE:
+            return
+        with self._lock:
+            if key in self._signatures:
+                return
+            self._signatures[key] = signature
+            self._names[key] = name
+            for bucket, band in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(band, []).append(key)
+
+    def remove(self, key):
+        with self._lock:
+            signature = self._signatures.pop(key, None)
+            if signature is None:
+                return
+            del self._names[key]
+            for bucket, band in zip(self._buckets, self._band_keys(signature)):
+                keys = bucket[band]
+                keys.remove(key)
+                if not keys:
+                    del bucket[band]
+
+    def query(self, signature, name=None, limit=5):
+        """Return up to `limit` (key, similarity) pairs above the threshold, best first"""
+        if signature == EMPTY_SIGNATURE:
+            return []
+        with self._lock:
+            candidates = set()
+            for bucket, band in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(bucket.get(band, ()))
+            matches = []
+            for key in candidates:
+                if not names_compatible(name, self._names[key]):
+                    continue
+                similarity = estimate_similarity(signature, self._signatures[key])
+                if similarity >= self.threshold:
+                    matches.append((key, similarity))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
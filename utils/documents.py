@@ -0,0 +1,306 @@
+"""
+Ingestion of resume files (PDF, DOCX, TXT) from a directory or archive.
+
+Files are handed out in small chunks to a process pool, where each one is
+read, hashed, turned into text and parsed; a failure only costs that file.
+Extracted text is cached in the shared state store by SHA-256 of the file
+contents, so a file that was seen before, under any name, is not extracted
+again. Parsed candidates are written in batches through db.add_candidates(),
+which merges people already stored.
+"""
+import hashlib
+import io
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+
+from utils import db, state
+from utils.importer import BATCH_SIZE, parse_records
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS extracted_text (
+        sha256 TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        extracted_at REAL NOT NULL
+    )"""
+]
+
+SUPPORTED = (".pdf", ".docx", ".txt", ".md")
+ARCHIVES = (".zip", ".tar", ".tar.gz", ".tgz")
+# Larger files are reported as failed rather than holding up a worker
+MAX_FILE_BYTES = 20 * 1024 * 1024
+# Files per task sent to a worker
+CHUNK_SIZE = 32
+# Errors kept in the result; all of them are logged
+MAX_ERRORS = 100
+
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class TextCache:
+    """Extracted text by SHA-256 of the file it came from"""
+
+    def _connection(self):
+        return state.ensure_schema("extracted_text", _SCHEMA)
+
+    def get(self, sha256):
+        row = self._connection().execute("SELECT text FROM extracted_text WHERE sha256 = ?",
+                                         (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items):
+        """Store (sha256, text) pairs"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO extracted_text (sha256, text, extracted_at) VALUES (?, ?, ?)",
+                [(sha256, text, now) for sha256, text in items])
+
+
+def is_archive(path):
+    return os.path.isfile(path) and path.lower().endswith(ARCHIVES)
+
+
+def _supported(name):
+    return name.lower().endswith(SUPPORTED)
+
+
+def iter_files(source):
+    """
+    Yield (name, data) for every supported file under a directory or in an
+    archive, in name order. For directories data is None and the worker
+    reads the file itself; archive members are read here, one at a time.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if _supported(name):
+                    yield os.path.join(root, name), None
+    elif source.lower().endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                if not info.is_dir() and _supported(info.filename):
+                    if info.file_size > MAX_FILE_BYTES:
+                        yield info.filename, ValueError(f"larger than {MAX_FILE_BYTES} bytes")
+                    else:
+                        yield info.filename, archive.read(info)
+    else:
+        with tarfile.open(source) as archive:
+            # Members are read in archive order, which is all a compressed tar allows
+            for member in archive:
+                if member.isfile() and _supported(member.name):
+                    if member.size > MAX_FILE_BYTES:
+                        yield member.name, ValueError(f"larger than {MAX_FILE_BYTES} bytes")
+                    else:
+                        yield member.name, archive.extractfile(member).read()
+
+
+def _docx_text(data):
+    """Paragraph text of a .docx file, from its document XML"""
+    with zipfile.ZipFile(io.BytesIO(data)) as document:
+        root = ElementTree.fromstring(document.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{_WORD}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_WORD}br", f"{_WORD}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("reading PDF files needs the pypdf package") from None
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(name, data):
+    """Text of a PDF, DOCX or plain text file given its name and contents"""
+    extension = os.path.splitext(name.lower())[1]
+    if extension == ".pdf":
+        return _pdf_text(data)
+    if extension == ".docx":
+        return _docx_text(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def _process_chunk(files, default_source, job_title):
+    """
+    Worker task: read, hash, extract (unless cached) and parse each file.
+    Returns one dict per file with "name", "sha256", "text" (only when
+    newly extracted), "candidate" and "error".
+    """
+    cache = TextCache()
+    results = []
+    for name, data in files:
+        result = {"name": name, "sha256": None, "text": None, "candidate": None, "error": None}
+        try:
+            if isinstance(data, Exception):
+                raise data
+            if data is None:
+                if os.path.getsize(name) > MAX_FILE_BYTES:
+                    raise ValueError(f"larger than {MAX_FILE_BYTES} bytes")
+                with open(name, "rb") as f:
+                    data = f.read()
+            result["sha256"] = hashlib.sha256(data).hexdigest()
+            text = cache.get(result["sha256"])
+            if text is None:
+                text = extract_text(name, data)
+                result["text"] = text
+            if not text.strip():
+                raise ValueError("no text found")
+            candidates, _ = parse_records([{"resume_text": text}], default_source, job_title)
+            result["candidate"] = candidates[0]
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+def _isolated(files, default_source, job_title):
+    """_process_chunk() one file at a time, each in a process of its own, so a crash only fails that file"""
+    results = []
+    for item in files:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                results.extend(executor.submit(_process_chunk, [item], default_source, job_title).result())
+            except BrokenProcessPool:
+                results.append({"name": item[0], "error": "worker process crashed"})
+    return results
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ingest_documents(source, workers=None, default_source="Upload", job_title=None,
+                     batch_size=BATCH_SIZE, fuzzy=False, on_progress=None):
+    """
+    Extract, parse and store every resume file in a directory or archive.
+    `on_progress` is called after each chunk with the running counts.
+
+    Returns {"success", "message", "files", "imported", "merged", "cached",
+    "failed", "errors", "seconds"}, where errors lists (file, reason) pairs.
+    """
+    started = time.perf_counter()
+    counts = {"files": 0, "imported": 0, "merged": 0, "cached": 0, "failed": 0}
+    errors = []
+    cache = TextCache()
+    workers = workers or os.cpu_count() or 1
+
+    def flush(batch):
+        results = db.add_candidates(batch, fuzzy=fuzzy)
+        created = sum(1 for _, is_new in results if is_new)
+        counts["imported"] += created
+        counts["merged"] += len(results) - created
+
+    def collect(results, batch):
+        new_text, failures = [], []
+        for result in results:
+            counts["files"] += 1
+            if result["error"]:
+                counts["failed"] += 1
+                failures.append(("Ingestion", "extract_resume", "failed", f"{result['name']}: {result['error']}"))
+                if len(errors) < MAX_ERRORS:
+                    errors.append((result["name"], result["error"]))
+                continue
+            if result["text"] is None:
+                counts["cached"] += 1
+            else:
+                new_text.append((result["sha256"], result["text"]))
+            batch.append(result["candidate"])
+        if new_text:
+            cache.put_many(new_text)
+        if failures:
+            db.log_activities(failures)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch.clear()
+        if on_progress:
+            on_progress(dict(counts))
+
+    batch = []
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+
+        def submit(chunk):
+            try:
+                future = executor.submit(_process_chunk, chunk, default_source, job_title)
+            except BrokenProcessPool:
+                # A worker died since the last drain(); the chunk that crashed it is
+                # still pending, and this one is sent again once the pool is replaced
+                future = None
+            pending.append((chunk, future))
+
+        def restart():
+            """Replace a broken pool and send it every pending chunk again"""
+            nonlocal executor
+            executor.shutdown(cancel_futures=True)
+            executor = ProcessPoolExecutor(max_workers=workers)
+            for _ in range(len(pending)):
+                submit(pending.popleft()[0])
+
+        def drain(keep):
+            while len(pending) > keep:
+                chunk, future = pending.popleft()
+                if future is None:
+                    pending.appendleft((chunk, None))
+                    restart()
+                    continue
+                try:
+                    collect(future.result(), batch)
+                except BrokenProcessPool:
+                    # A worker died, e.g. on a malformed PDF, taking every queued task with it.
+                    # Requeue the rest on a new pool and find the culprit in this chunk alone
+                    restart()
+                    collect(_isolated(chunk, default_source, job_title), batch)
+
+        try:
+            for chunk in _chunks(iter_files(source), CHUNK_SIZE):
+                submit(chunk)
+                # Enough chunks in flight to keep every worker busy
+                drain(2 * workers)
+            drain(0)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        if batch:
+            flush(batch)
+            batch.clear()
+
+        message = (f"Ingested {counts['files']} resume files from {os.path.basename(source.rstrip(os.sep))}: "
+                   f"{counts['imported']} new candidates, {counts['merged']} merged, {counts['failed']} failed")
+        db.log_activity("Ingestion", "ingest_resumes", "success", message)
+        return dict(counts, success=True, message=message, errors=errors,
+                    seconds=time.perf_counter() - started)
+    except Exception as e:
+        # Keep the candidates already parsed; a rerun merges them rather than adding them twice
+        if batch:
+            try:
+                flush(batch)
+            except Exception:
+                pass
+        db.log_activity("Ingestion", "ingest_resumes", "failed", f"{source}: {str(e)}")
+        return dict(counts, success=False, message=f"Ingestion stopped: {str(e)}", errors=errors,
+                    seconds=time.perf_counter() - started)
@@ -0,0 +1,83 @@
+import re
+import threading
+
+# Addresses the parser falls back to when a resume has no email; they say
+# nothing about who the candidate is and must never be used as identity.
+PLACEHOLDER_EMAILS = {"unknown@example.com", ""}
+
+
+def normalize_email(email):
+    """Lower-case and trim an email; returns None for missing/placeholder addresses"""
+    if not email:
+        return None
+    email = str(email).strip().lower()
+    if email in PLACEHOLDER_EMAILS or "@" not in email:
+        return None
+    return email
+
+
+def identity_key(email):
+    """Exact identity key: the normalized email"""
+    email = normalize_email(email)
+    return f"email:{email}" if email else None
+
+
+def fuzzy_identity_key(name, email):
+    """
+    Looser key that survives cosmetic differences between sources:
+    name tokens in any order and case, and the email local part with
+    "+tags", dots, dashes and underscores removed.
+    """
+    email = normalize_email(email)
+    if not email:
+        return None
+    local, _, domain = email.partition("@")
+    local = re.sub(r"[._\-]", "", local.split("+", 1)[0])
+    name_tokens = sorted(re.findall(r"[a-z]+", (name or "").lower()))
+    if not name_tokens:
+        return None
+    return f"fuzzy:{' '.join(name_tokens)}|{local}@{domain}"
+
+
+def candidate_keys(name, email, fuzzy=False):
+    keys = []
+    exact = identity_key(email)
+    if exact:
+        keys.append(exact)
+    if fuzzy:
+        loose = fuzzy_identity_key(name, email)
+        if loose:
+            keys.append(loose)
+    return keys
+
+
+class IdentityIndex:
+    """
+    In-memory map from identity keys to candidate ids. Both the exact and
+    the fuzzy key of every candidate are registered, so lookups may opt into
+    fuzzy matching per call.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def register(self, candidate_id, name, email):
+        with self._lock:
+            for key in candidate_keys(name, email, fuzzy=True):
+                self._ids.setdefault(key, candidate_id)
+
+    def lookup(self, name, email, fuzzy=False):
+        with self._lock:
+            for key in candidate_keys(name, email, fuzzy=fuzzy):
+                candidate_id = self._ids.get(key)
+                if candidate_id is not None:
+                    return candidate_id
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
@@ -0,0 +1,283 @@
+"""
+Bulk import of candidate exports in JSON Lines or CSV format.
+
+The file is read as a stream of byte ranges, so memory stays bounded
+however large it is. Batches of records are parsed in a process pool
+(resume parsing and MinHash signatures are the expensive part) while
+earlier batches are written, in file order, through db.add_candidates(),
+which merges people already stored instead of inserting them again.
+
+After every written batch the byte offset reached is saved in the shared
+state store, so an interrupted import picks up where it stopped.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import db, state
+from utils.dedup import minhash_signature
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS imports (
+        path TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        offset INTEGER NOT NULL,
+        counts TEXT NOT NULL,
+        status TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )"""
+]
+
+# Records parsed and written together
+BATCH_SIZE = 2000
+# Batches being parsed ahead of the one being written
+LOOKAHEAD = 4
+# Lines a quoted CSV cell may span before its row is taken as malformed
+MAX_CSV_ROW_LINES = 100
+# Bytes at the start of a file that identify it for resuming
+_FINGERPRINT_BYTES = 65536
+
+# Record fields that are not stored as candidate metadata
+_IDENTITY_FIELDS = ("id", "name", "email", "source", "resume_text", "resume")
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?")
+
+
+class ImportOffsets:
+    """How far each file has been imported, kept in the shared state store"""
+
+    def _connection(self):
+        return state.ensure_schema("imports", _SCHEMA)
+
+    def get(self, path, fingerprint):
+        """{"offset", "counts", "status"} of an earlier import of this file, or None"""
+        row = self._connection().execute(
+            "SELECT offset, counts, status FROM imports WHERE path = ? AND fingerprint = ?",
+            (path, fingerprint)).fetchone()
+        return {"offset": row[0], "counts": json.loads(row[1]), "status": row[2]} if row else None
+
+    def save(self, path, fingerprint, offset, counts, status="running"):
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO imports (path, fingerprint, offset, counts, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, fingerprint, offset, json.dumps(counts), status, time.time()))
+
+
+def fingerprint(path):
+    """Identify a file by its size and first bytes, so a replaced file starts over"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(_FINGERPRINT_BYTES))
+    return f"{os.path.getsize(path)}:{digest.hexdigest()}"
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _csv_value(value):
+    """CSV cells are all text; turn numbers and booleans back into values"""
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if _NUMBER.fullmatch(value):
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def read_records(path, file_format, offset=0):
+    """
+    Yield (end_offset, record) for each record after byte `offset`, where
+    end_offset is where the next record starts. Records that cannot be
+    decoded are yielded as None so they can be counted.
+    """
+    with open(path, "rb") as f:
+        header = None
+        if file_format == "csv":
+            first = f.readline()
+            header = next(csv.reader([first.decode("utf-8-sig")]))
+            offset = max(offset, len(first))
+        f.seek(offset)
+        lines = _lines(f, offset)
+
+        if file_format == "csv":
+            yield from _csv_records(lines, header)
+            return
+        for end, line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield end, json.loads(line)
+            except ValueError:
+                yield end, None
+
+
+def _lines(f, offset):
+    """Yield (end_offset, line) for each line of `f` from `offset`"""
+    for line in f:
+        offset += len(line)
+        yield offset, line
+
+
+def _csv_records(lines, header):
+    """
+    Group lines into CSV rows. A quoted cell may span lines, but no more
+    than MAX_CSV_ROW_LINES: a row whose quote is still open by then (or at
+    the end of the file) is taken to have a stray quote, so its first line
+    is yielded as None and the lines after it are read again as rows.
+    """
+    replay = deque()
+    row, quotes = [], 0
+    while True:
+        if replay:
+            end, line = replay.popleft()
+        else:
+            end, line = next(lines, (None, None))
+            if line is None:
+                if not row:
+                    return
+                yield row[0][0], None
+                replay.extend(row[1:])
+                row, quotes = [], 0
+                continue
+        row.append((end, line))
+        quotes += line.count(b'"')
+        if quotes % 2:
+            if len(row) >= MAX_CSV_ROW_LINES:
+                yield row[0][0], None
+                replay.extendleft(reversed(row[1:]))
+                row, quotes = [], 0
+            continue
+
+        text = b"".join(part for _, part in row).decode("utf-8", errors="replace")
+        row, quotes = [], 0
+        if not text.strip():
+            continue
+        try:
+            cells = next(csv.reader(io.StringIO(text)))
+        except csv.Error:
+            yield end, None
+            continue
+        yield end, {key: _csv_value(value) for key, value in zip(header, cells) if value != ""}
+
+
+def read_batches(path, file_format, offset=0, batch_size=BATCH_SIZE):
+    """Group read_records() into (end_offset, records) batches"""
+    batch = []
+    end = offset
+    for end, record in read_records(path, file_format, offset):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield end, batch
+            batch = []
+    if batch:
+        yield end, batch
+
+
+def parse_records(records, default_source="Import", job_title=None):
+    """
+    Turn raw records into db.add_candidates() input. Name, email, skills and
+    experience missing from a record are parsed from its resume. Returns
+    (candidates, invalid) where invalid counts records that were skipped.
+    """
+    from utils import parser
+
+    candidates = []
+    invalid = 0
+    for record in records:
+        if not isinstance(record, dict):
+            invalid += 1
+            continue
+        resume_text = str(record.get("resume_text") or record.get("resume") or "")
+        if not resume_text and not record.get("email"):
+            invalid += 1
+            continue
+
+        metadata = {key: value for key, value in record.items()
+                    if key not in _IDENTITY_FIELDS and value is not None}
+        if job_title:
+            metadata.setdefault("job_title", job_title)
+        if resume_text:
+            if "skills" not in metadata:
+                metadata["skills"] = parser.extract_skills(resume_text)
+            if "experience_years" not in metadata:
+                metadata["experience_years"] = parser.extract_experience(resume_text)
+            metadata["minhash"] = minhash_signature(resume_text).hex()
+
+        candidates.append({
+            "name": record.get("name") or parser.extract_name(resume_text),
+            "email": record.get("email") or parser.extract_email(resume_text),
+            "source": record.get("source") or default_source,
+            "resume_text": resume_text,
+            "metadata": metadata
+        })
+    return candidates, invalid
+
+
+def import_file(path, file_format=None, workers=None, batch_size=BATCH_SIZE, default_source="Import",
+                job_title=None, restart=False, fuzzy=False, on_progress=None):
+    """
+    Import candidates from a JSON Lines or CSV file, resuming an earlier
+    interrupted import of the same file unless `restart`. `on_progress` is
+    called after each batch with (bytes_done, total_bytes, counts).
+
+    Returns {"success", "message", "imported", "merged", "invalid", "offset", "seconds"}.
+    """
+    path = os.path.abspath(path)
+    file_format = file_format or detect_format(path)
+    offsets = ImportOffsets()
+    started = time.perf_counter()
+    counts = {"imported": 0, "merged": 0, "invalid": 0}
+    offset = 0
+
+    try:
+        total = os.path.getsize(path)
+        key = fingerprint(path)
+        previous = None if restart else offsets.get(path, key)
+        if previous and previous["status"] == "completed":
+            return dict(previous["counts"], success=True, offset=previous["offset"], seconds=0.0,
+                        message=f"{os.path.basename(path)} was already imported")
+        if previous:
+            offset = previous["offset"]
+            counts.update(previous["counts"])
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+
+        def write(end, future):
+            candidates, invalid = future.result()
+            results = db.add_candidates(candidates, fuzzy=fuzzy)
+            created = sum(1 for _, is_new in results if is_new)
+            counts["imported"] += created
+            counts["merged"] += len(results) - created
+            counts["invalid"] += invalid
+            offsets.save(path, key, end, counts)
+            if on_progress:
+                on_progress(end, total, dict(counts))
+            return end
+
+        try:
+            for end, records in read_batches(path, file_format, offset, batch_size):
+                pending.append((end, executor.submit(parse_records, records, default_source, job_title)))
+                if len(pending) >= LOOKAHEAD:
+                    offset = write(*pending.popleft())
+            while pending:
+                offset = write(*pending.popleft())
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        offsets.save(path, key, offset, counts, status="completed")
+        message = (f"Imported {counts['imported']} candidates from {os.path.basename(path)} "
+                   f"({counts['merged']} merged into existing, {counts['invalid']} invalid)")
+        db.log_activity("system", "import_candidates", "success", message)
+        return dict(counts, success=True, message=message, offset=offset,
+                    seconds=time.perf_counter() - started)
+    except Exception as e:
+        db.log_activity("system", "import_candidates", "failed", f"{path} at byte {offset}: {str(e)}")
+        return dict(counts, success=False, message=f"Import stopped at byte {offset}: {str(e)}",
+                    offset=offset, seconds=time.perf_counter() - started)
@@ -1,67 +1,594 @@
+import http.client
+import itertools
+import json
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
 from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 from langchain.memory import ConversationBufferMemory
 from langchain_community.llms import HuggingFaceHub
+from langchain_community.llms.utils import enforce_stop_tokens
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from pydantic import Field, PrivateAttr
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+from utils import llm_cache, textgen
 
-def get_llm():
+logger = logging.getLogger(__name__)
+
+
+def _notify(level, message):
+    """Show a problem on the page; pipeline threads and the CLI have none, so log it there"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        logger.log(logging.ERROR if level == "error" else logging.WARNING, message)
+    else:
+        getattr(st, level)(message)
+
+
+# Models tried in order, with their generation parameters
+MODELS = [
+    ("google/flan-t5-small", {"temperature": 0.7, "max_length": 512}),
+    ("facebook/opt-125m", {"temperature": 0.7, "max_length": 256}),
+    ("EleutherAI/pythia-70m", {"temperature": 0.7, "max_length": 256})
+]
+TASK = "text2text-generation"
+# Seconds before building clients is tried again after every model failed
+RETRY_AFTER = 60
+# Generations running at once for a batch the model can't take in one request
+BATCH_CONCURRENCY = 8
+# Where the "http" backend finds its models, e.g. `python -m utils.stub_server --inference-port 8800`
+DEFAULT_ENDPOINT = "http://127.0.0.1:8800"
+
+
+def _max_tokens(model_kwargs):
+    return int(model_kwargs.get("max_new_tokens") or model_kwargs.get("max_length") or textgen.MAX_TOKENS)
+
+
+class LocalLLM(LLM):
     """
-    Initialize the Google Flan T5 Small model from Hugging Face Hub
+    In-process stand-in model (utils.textgen): deterministic, and needs
+    neither network nor weights. `latency` (seconds to the first token) and
+    `tokens_per_second` simulate a real model's speed; by default it
+    answers at once.
     """
-    try:
-        repo_id = "google/flan-t5-small"
-        fallback_models = ["facebook/opt-125m", "EleutherAI/pythia-70m"]
-        hf_token = os.getenv("HUGGINGFACE_API_KEY", None)
 
+    model: str = "local"
+    max_tokens: int = textgen.MAX_TOKENS
+    latency: float = 0.0
+    tokens_per_second: Optional[float] = None
+
+    @property
+    def _llm_type(self):
+        return "local"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        return self.generate_batch([prompt], stop=stop)[0]
+
+    def _stream(self, prompt, stop=None, run_manager=None, **kwargs):
+        text = textgen.generate_text(prompt, self.model, self.max_tokens)
+        if stop:
+            text = enforce_stop_tokens(text, stop)
+        if self.latency:
+            time.sleep(self.latency)
+        for token in textgen.split_tokens(text):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            chunk = GenerationChunk(text=token)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def generate_batch(self, prompts, timeout=None, stop=None):
+        """Responses to `prompts`, generated together like a batch on one device"""
+        texts = [textgen.generate_text(prompt, self.model, self.max_tokens) for prompt in prompts]
+        seconds = self.latency
+        if self.tokens_per_second and texts:
+            seconds += max(textgen.count_tokens(text) for text in texts) / self.tokens_per_second
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Generation didn't finish in {timeout}s")
+        if seconds:
+            time.sleep(seconds)
+        return [enforce_stop_tokens(text, stop) if stop else text for text in texts]
+
+
+class HTTPInferenceLLM(LLM):
+    """
+    A model behind an endpoint speaking the Hugging Face Inference API, such
+    as the stand-in InferenceServer in utils/stub_server.py. Each thread
+    keeps its own connection alive between calls.
+    """
+
+    endpoint_url: str = DEFAULT_ENDPOINT
+    repo_id: str
+    model_kwargs: Dict[str, Any] = Field(default_factory=dict)
+    token: Optional[str] = None
+    timeout: float = 30.0
+    # Prompts per request in generate_batch()
+    batch_size: int = 32
+    _local: Any = PrivateAttr(default_factory=threading.local)
+
+    @property
+    def _llm_type(self):
+        return "http_inference"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        text = self._post(prompt)[0]
+        return enforce_stop_tokens(text, stop) if stop else text
+
+    def _stream(self, prompt, stop=None, run_manager=None, **kwargs):
+        """
+        Tokens as the server sends them, as server-sent events in the shape
+        of Text Generation Inference's: data: {"token": {"text": ...}, ...}
+        """
+        response = self._request({"inputs": prompt, "parameters": self.model_kwargs, "stream": True})
+        finished = False
+        try:
+            if response.status >= 400:
+                self._raise_for_error(response.status, json.loads(response.read()))
+            text = ""
+            for line in response:
+                if not line.startswith(b"data:"):
+                    continue
+                event = json.loads(line[5:])
+                if "error" in event:
+                    self._raise_for_error(response.status, event)
+                token = event["token"]["text"]
+                if stop:
+                    # Stop before the first stop sequence, which may span tokens
+                    kept = enforce_stop_tokens(text + token, stop)
+                    if len(kept) < len(text + token):
+                        token = kept[len(text):]
+                        if token:
+                            yield GenerationChunk(text=token)
+                        return
+                text += token
+                chunk = GenerationChunk(text=token)
+                if run_manager:
+                    run_manager.on_llm_new_token(token, chunk=chunk)
+                yield chunk
+            finished = True
+        finally:
+            # Unread events would garble the next response on this connection
+            if not finished:
+                self._local.connection.close()
+
+    def generate_batch(self, prompts, timeout=None):
+        """
+        Responses to `prompts`, sent `batch_size` to a request with up to
+        BATCH_CONCURRENCY requests at once; None for prompts whose request
+        failed or didn't finish within `timeout` seconds for the whole batch.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        chunks = [prompts[i:i + self.batch_size] for i in range(0, len(prompts), self.batch_size)]
+
+        def send(chunk):
+            # Requests that start late get only what is left of the timeout
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return [None] * len(chunk)
+            try:
+                return self._post(chunk, remaining)
+            except Exception as e:
+                logger.warning("Batched request to %s failed: %s", self.repo_id, e)
+                return [None] * len(chunk)
+
+        if len(chunks) <= 1:
+            return [text for chunk in chunks for text in send(chunk)]
+        results = [[None] * len(chunk) for chunk in chunks]
+        executor = ThreadPoolExecutor(max_workers=min(len(chunks), BATCH_CONCURRENCY))
+        futures = {executor.submit(send, chunk): i for i, chunk in enumerate(chunks)}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            logger.warning("%d of %d batched requests to %s didn't finish in %ss",
+                           sum(not future.done() for future in futures), len(chunks), self.repo_id, timeout)
+        finally:
+            # Requests already sent end with their socket timeout, at the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+        return [text for texts in results for text in texts]
+
+    def _connection(self, timeout):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            parts = urlsplit(self.endpoint_url)
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+            self._local.connection = connection
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection
+
+    def _request(self, payload, timeout=None):
+        """POST `payload` to the model and return the response, its body not read yet"""
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        path = f"{urlsplit(self.endpoint_url).path.rstrip('/')}/models/{quote(self.repo_id)}"
+        for attempt in range(2):
+            connection = self._connection(timeout or self.timeout)
+            try:
+                connection.request("POST", path, body, headers)
+                return connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; try once more on a new one
+                connection.close()
+                if attempt:
+                    raise
+            except Exception:
+                connection.close()
+                raise
+
+    @staticmethod
+    def _raise_for_error(status, payload):
+        error = payload.get("error", payload) if isinstance(payload, dict) else payload
+        raise ValueError(f"Error raised by inference API ({status}): {error}")
+
+    def _post(self, inputs, timeout=None):
+        """Generated texts for `inputs` (one prompt or a list of them)"""
+        response = self._request({"inputs": inputs, "parameters": self.model_kwargs}, timeout)
+        try:
+            payload = json.loads(response.read())
+        except Exception:
+            self._local.connection.close()
+            raise
+        if response.status >= 400 or isinstance(payload, dict):
+            self._raise_for_error(response.status, payload)
+        return [item["generated_text"] for item in payload]
+
+
+def _hub_client(repo_id, task, model_kwargs, token=None, endpoint=None):
+    options = {"huggingfacehub_api_token": token} if token else {}
+    return HuggingFaceHub(repo_id=repo_id, task=task, model_kwargs=model_kwargs, **options)
+
+
+def _local_client(repo_id, task, model_kwargs, token=None, endpoint=None):
+    tokens_per_second = os.getenv("TALENTCREW_LLM_TOKENS_PER_SECOND")
+    return LocalLLM(model=repo_id, max_tokens=_max_tokens(model_kwargs),
+                    latency=float(os.getenv("TALENTCREW_LLM_LATENCY", 0)),
+                    tokens_per_second=float(tokens_per_second) if tokens_per_second else None)
+
+
+def _http_client(repo_id, task, model_kwargs, token=None, endpoint=None):
+    return HTTPInferenceLLM(endpoint_url=endpoint or DEFAULT_ENDPOINT, repo_id=repo_id,
+                            model_kwargs=model_kwargs, token=token)
+
+
+def _transformers_client(repo_id, task, model_kwargs, token=None, endpoint=None):
+    """The model itself, run on the CPU with transformers; its weights must be downloaded already"""
+    from langchain_community.llms import HuggingFacePipeline
+    return HuggingFacePipeline.from_model_id(model_id=repo_id, task=task, device=-1,
+                                             pipeline_kwargs={"max_new_tokens": _max_tokens(model_kwargs)})
+
+
+# Client factories by backend name: factory(repo_id, task, model_kwargs, token, endpoint) -> LLM
+BACKENDS = {
+    "hub": _hub_client,
+    "local": _local_client,
+    "http": _http_client,
+    "transformers": _transformers_client
+}
+
+
+def register_backend(name, factory):
+    """Make another kind of client available as TALENTCREW_LLM_BACKEND=<name>"""
+    BACKENDS[name] = factory
+
+
+def _usable(response):
+    # Empty answers count as failures, like errors
+    return isinstance(response, str) and bool(response.strip())
+
+
+class FallbackLLM(LLM):
+    """
+    Calls the first model that works, starting with the one that last
+    succeeded, so an unavailable primary costs one failed call rather than
+    one per prompt. With a `response_cache` (utils.llm_cache.ResponseCache),
+    responses are looked up there first and stored after generation.
+    """
+
+    clients: List[Any]
+    names: List[str]
+    preferred: int = 0
+    response_cache: Any = None
+    namespace: str = ""
+
+    @property
+    def _llm_type(self):
+        return "fallback"
+
+    def _lookup(self, prompt, stop, kwargs):
+        """(namespace, cached response) for a prompt; namespace is None when there is no usable cache"""
+        if self.response_cache is None:
+            return None, None
+        namespace = llm_cache.make_namespace(self.namespace, {"stop": stop, **kwargs}) \
+            if stop or kwargs else self.namespace
         try:
-            if hf_token:
-                llm = HuggingFaceHub(repo_id=repo_id,
-                                     huggingfacehub_api_token=hf_token,
-                                     task="text2text-generation",
-                                     model_kwargs={
-                                         "temperature": 0.7,
-                                         "max_length": 512
-                                     })
+            return namespace, self.response_cache.get(namespace, prompt)
+        except Exception as e:
+            logger.warning("LLM cache lookup failed: %s", e)
+            return None, None
+
+    def _store(self, namespace, prompt, response):
+        # Empty answers count as failures upstream; don't make them stick
+        if namespace is not None and response.strip():
+            try:
+                self.response_cache.put(namespace, prompt, response)
+            except Exception as e:
+                logger.warning("LLM cache write failed: %s", e)
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        namespace, cached = self._lookup(prompt, stop, kwargs)
+        if cached is not None:
+            return cached
+        response = self._generate_with_fallback(prompt, stop, **kwargs)
+        self._store(namespace, prompt, response)
+        return response
+
+    def _stream(self, prompt, stop=None, run_manager=None, **kwargs):
+        """
+        Yield the response as the model produces it; a cached one comes in a
+        single chunk. Models that fail before their first chunk are skipped
+        as in _call(), but once text has been yielded an error ends the stream.
+        Clients that can't stream yield their whole response at once.
+        """
+        namespace, cached = self._lookup(prompt, stop, kwargs)
+        if cached is not None:
+            yield GenerationChunk(text=cached)
+            return
+
+        start = self.preferred
+        order = [start] + [i for i in range(len(self.clients)) if i != start]
+        error = None
+        for i in order:
+            chunks = iter(self.clients[i].stream(prompt, stop=stop, **kwargs))
+            try:
+                first = next(chunks, "")
+            except Exception as e:
+                logger.warning("Model %s failed: %s", self.names[i], e)
+                error = e
+                continue
+            if i != self.preferred:
+                logger.warning("Switching to model %s", self.names[i])
+                self.preferred = i
+
+            parts = []
+            for text in itertools.chain([first], chunks):
+                parts.append(text)
+                chunk = GenerationChunk(text=text)
+                if run_manager:
+                    run_manager.on_llm_new_token(text, chunk=chunk)
+                yield chunk
+            self._store(namespace, prompt, "".join(parts))
+            return
+        raise error
+
+    def generate_batch(self, prompts, max_concurrency=BATCH_CONCURRENCY, timeout=None):
+        """
+        Responses to many prompts, in order; None where generation failed or
+        didn't finish within `timeout` seconds for the whole batch. Cached
+        and repeated prompts are generated once. Models whose client has a
+        generate_batch(prompts) method get the rest in one request, starting
+        with the current model; prompts it fails on go to the next one. The
+        rest are spread over `max_concurrency` threads, one request each, on
+        the models that can't take a batch (on every model if none can).
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        results = [None] * len(prompts)
+        wanted = {}
+        for i, prompt in enumerate(prompts):
+            cached = None
+            if self.response_cache is not None:
+                try:
+                    cached = self.response_cache.get(self.namespace, prompt)
+                except Exception as e:
+                    logger.warning("LLM cache lookup failed: %s", e)
+            if cached is not None:
+                results[i] = cached
             else:
-                llm = HuggingFaceHub(repo_id=repo_id,
-                                     task="text2text-generation",
-                                     model_kwargs={
-                                         "temperature": 0.7,
-                                         "max_length": 512
-                                     })
-            return llm
-        except Exception as primary_error:
-            st.error(f"Error with primary model: {str(primary_error)}")
-
-            for fallback in fallback_models:
+                wanted.setdefault(llm_cache.normalize_prompt(prompt), []).append(i)
+        if not wanted:
+            return results
+
+        unique = [prompts[positions[0]] for positions in wanted.values()]
+        responses = [None] * len(unique)
+        batched = False
+        for model in [self.preferred] + [i for i in range(len(self.clients)) if i != self.preferred]:
+            missing = [j for j, response in enumerate(responses) if not _usable(response)]
+            # Every request counts against the same timeout
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if not missing or (remaining is not None and remaining <= 0):
+                break
+            texts = self._batch_request(model, [unique[j] for j in missing], remaining)
+            if texts is None:
+                continue
+            batched = True
+            for j, text in zip(missing, texts):
+                responses[j] = text
+        # Single-prompt models haven't been tried yet; give them what the batches missed
+        models = [i for i in range(len(self.clients)) if not self._can_batch(i)] if batched else None
+        missing = [j for j, response in enumerate(responses) if not _usable(response)]
+        if missing and models != []:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is None or remaining > 0:
+                texts = self._concurrent_requests([unique[j] for j in missing], max_concurrency,
+                                                  remaining, models=models)
+                for j, text in zip(missing, texts):
+                    responses[j] = text
+
+        for prompt, positions, response in zip(unique, wanted.values(), responses):
+            if not _usable(response):
+                continue
+            for i in positions:
+                results[i] = response
+            if self.response_cache is not None:
                 try:
-                    st.warning(f"Trying fallback model: {fallback}")
-                    if hf_token:
-                        llm = HuggingFaceHub(repo_id=fallback,
-                                             huggingfacehub_api_token=hf_token,
-                                             task="text2text-generation",
-                                             model_kwargs={
-                                                 "temperature": 0.7,
-                                                 "max_length": 256
-                                             })
-                    else:
-                        llm = HuggingFaceHub(repo_id=fallback,
-                                             task="text2text-generation",
-                                             model_kwargs={
-                                                 "temperature": 0.7,
-                                                 "max_length": 256
-                                             })
-                    return llm
-                except Exception as fallback_error:
-                    st.error(
-                        f"Failed with fallback model {fallback}: {str(fallback_error)}"
-                    )
-            raise Exception("All models failed to initialize")
-    except Exception as e:
-        st.error(f"Error initializing LLM: {str(e)}")
-        return None
+                    self.response_cache.put(self.namespace, prompt, response)
+                except Exception as e:
+                    logger.warning("LLM cache write failed: %s", e)
+        return results
+
+    def _can_batch(self, model):
+        return callable(getattr(self.clients[model], "generate_batch", None))
+
+    def _batch_request(self, model, prompts, timeout):
+        """One batched request to model `model`, or None if it can't take one or it failed"""
+        if not self._can_batch(model):
+            return None
+        try:
+            return self.clients[model].generate_batch(prompts, timeout=timeout)
+        except Exception as e:
+            logger.warning("Batched request to %s failed: %s", self.names[model], e)
+            return None
+
+    def _concurrent_requests(self, prompts, max_concurrency, timeout, models=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        responses = [None] * len(prompts)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts))))
+        futures = {executor.submit(self._generate_with_fallback, prompt, deadline=deadline, models=models): i
+                   for i, prompt in enumerate(prompts)}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                try:
+                    responses[futures[future]] = future.result()
+                except Exception:
+                    pass
+        except FuturesTimeout:
+            logger.warning("%d of %d generations didn't finish in %ss",
+                           sum(not future.done() for future in futures), len(prompts), timeout)
+        finally:
+            # Queued calls are dropped; running ones stop before trying another model
+            executor.shutdown(wait=False, cancel_futures=True)
+        return responses
+
+    def _generate_with_fallback(self, prompt, stop=None, deadline=None, models=None, **kwargs):
+        """Response from the first of `models` (default: all, current one first) that works"""
+        models = range(len(self.clients)) if models is None else models
+        order = sorted(models, key=lambda i: i != self.preferred)
+        error = None
+        for i in order:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise error or TimeoutError("Generation deadline passed")
+            try:
+                response = self.clients[i].invoke(prompt, stop=stop, **kwargs)
+            except Exception as e:
+                logger.warning("Model %s failed: %s", self.names[i], e)
+                error = e
+                continue
+            if i != self.preferred:
+                logger.warning("Switching to model %s", self.names[i])
+                self.preferred = i
+            return response
+        raise error
+
+
+class ClientPool:
+    """
+    Process-wide LLM clients, one per model list, task, parameters,
+    token and backend, built on first use and then shared by every session
+    and thread. Reusing a client keeps its HTTP connections alive between calls.
+    """
+
+    def __init__(self, retry_after=RETRY_AFTER, cache=None):
+        self.retry_after = retry_after
+        self.cache = cache
+        self._chains = {}
+        self._failed_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, models=None, task=TASK, token=None, backend="hub", endpoint=None):
+        """
+        The shared FallbackLLM for `models` ((repo_id, model_kwargs) pairs)
+        with clients from `backend` (see BACKENDS), or None
+        """
+        models = models or MODELS
+        key = (tuple((repo_id, tuple(sorted(kwargs.items()))) for repo_id, kwargs in models), task, token,
+               backend, endpoint)
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is not None:
+                return chain
+            failed_at = self._failed_at.get(key)
+            if failed_at is not None and time.time() - failed_at < self.retry_after:
+                return None
+
+            clients, names = [], []
+            factory = BACKENDS.get(backend)
+            if factory is None:
+                _notify("error", f"Unknown LLM backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+            for repo_id, kwargs in models if factory else []:
+                try:
+                    clients.append(factory(repo_id, task, dict(kwargs), token, endpoint))
+                    names.append(repo_id)
+                except Exception as e:
+                    _notify("error", f"Failed to initialize model {repo_id}: {str(e)}")
+            if not clients:
+                self._failed_at[key] = time.time()
+                return None
+            # Hub responses keep the namespace they were cached under before there were backends
+            params = {"task": task} if backend == "hub" else {"task": task, "backend": backend}
+            chain = FallbackLLM(clients=clients, names=names, response_cache=self.cache,
+                                namespace=llm_cache.make_namespace(key[0], params))
+            self._chains[key] = chain
+            return chain
+
+    def clear(self):
+        with self._lock:
+            self._chains.clear()
+            self._failed_at.clear()
+
+
+_pool = ClientPool(cache=llm_cache.from_environment())
+
+
+def get_cache_stats():
+    """Hit rate and size of the LLM response cache"""
+    return _pool.cache.stats() if _pool.cache is not None else {}
+
+
+def get_llm():
+    """
+    The shared LLM: Google Flan T5 Small from Hugging Face Hub, falling back
+    to smaller models. Returns None when no model can be initialized.
+
+    TALENTCREW_LLM_BACKEND picks where the models run: "hub" (default),
+    "transformers" (on this machine's CPU), "local" (a deterministic
+    in-process stand-in, slowed down by TALENTCREW_LLM_LATENCY and
+    TALENTCREW_LLM_TOKENS_PER_SECOND if set) or "http" (an Inference
+    API-compatible server at TALENTCREW_LLM_ENDPOINT, such as the stand-in
+    from `python -m utils.stub_server --inference-port 8800`).
+    """
+    llm = _pool.get(token=os.getenv("HUGGINGFACE_API_KEY", None),
+                    backend=os.getenv("TALENTCREW_LLM_BACKEND", "hub"),
+                    endpoint=os.getenv("TALENTCREW_LLM_ENDPOINT", DEFAULT_ENDPOINT))
+    if llm is None:
+        _notify("error", "Error initializing LLM: All models failed to initialize")
+    return llm
+
+
+def generate_batch(prompts, model=None, max_concurrency=BATCH_CONCURRENCY, timeout=None):
+    """
+    Responses to many prompts with the shared LLM (or `model`), None for
+    each prompt that could not be answered. See FallbackLLM.generate_batch.
+    """
+    model = model or get_llm()
+    if model is None:
+        return [None] * len(prompts)
+    if hasattr(model, "generate_batch"):
+        return model.generate_batch(prompts, max_concurrency=max_concurrency, timeout=timeout)
+    responses = model.batch(list(prompts), config={"max_concurrency": max_concurrency}, return_exceptions=True)
+    return [response if isinstance(response, str) else None for response in responses]
 
 
 def get_conversation_chain():
@@ -99,56 +626,58 @@ def get_conversation_chain():
         return None
 
 
-def get_agent_response(agent_name, query):
-    """
-    Get a response from a specific agent
+# Prompts for get_agent_response() and stream_agent_response(), by agent
+AGENT_PROMPTS = {
+    "sourcing":
     """
-    try:
-        llm = get_llm()
-        if not llm:
-            return "The AI model is not available at the moment."
+    You are the Sourcing Agent in TalentCrew, an AI recruitment platform.
+    Your role is to find and extract candidate profiles from various sources.
 
-        prompts = {
-            "sourcing":
-            """
-            You are the Sourcing Agent in TalentCrew, an AI recruitment platform.
-            Your role is to find and extract candidate profiles from various sources.
+    The human is asking for: {query}
 
-            The human is asking for: {query}
+    Provide the list of candidates in one line per candidate format.
+    """,
+    "screening":
+    """
+    You are the Screening Agent in TalentCrew, an AI recruitment platform.
+    Your role is to assess candidate resumes using NLP and rank candidates based on job fitment.
 
-            Provide the list of candidates in one line per candidate format.
-            """,
-            "screening":
-            """
-            You are the Screening Agent in TalentCrew, an AI recruitment platform.
-            Your role is to assess candidate resumes using NLP and rank candidates based on job fitment.
+    The human is asking for: {query}
 
-            The human is asking for: {query}
+    Provide the list of top candidates in one line per candidate format.
+    """,
+    "engagement":
+    """
+    You are the Engagement Agent in TalentCrew, an AI recruitment platform.
+    Your role is to engage candidates through AI-driven conversational messaging.
 
-            Provide the list of top candidates in one line per candidate format.
-            """,
-            "engagement":
-            """
-            You are the Engagement Agent in TalentCrew, an AI recruitment platform.
-            Your role is to engage candidates through AI-driven conversational messaging.
+    The human is asking for: {query}
 
-            The human is asking for: {query}
+    Provide engagement insights in a bullet point format.
+    """,
+    "scheduling":
+    """
+    You are the Scheduling Agent in TalentCrew, an AI recruitment platform.
+    Your role is to automate interview scheduling between recruiters and candidates.
 
-            Provide engagement insights in a bullet point format.
-            """,
-            "scheduling":
-            """
-            You are the Scheduling Agent in TalentCrew, an AI recruitment platform.
-            Your role is to automate interview scheduling between recruiters and candidates.
+    The human is asking for: {query}
 
-            The human is asking for: {query}
+    Respond with scheduling actions or updates in a clear format.
+    """
+}
 
-            Respond with scheduling actions or updates in a clear format.
-            """
-        }
 
-        if agent_name in prompts:
-            formatted_prompt = prompts[agent_name].format(query=query)
+def get_agent_response(agent_name, query):
+    """
+    Get a response from a specific agent
+    """
+    try:
+        llm = get_llm()
+        if not llm:
+            return "The AI model is not available at the moment."
+
+        if agent_name in AGENT_PROMPTS:
+            formatted_prompt = AGENT_PROMPTS[agent_name].format(query=query)
             raw_response = llm.invoke(formatted_prompt)
 
             if isinstance(raw_response, str):
@@ -165,3 +694,22 @@ def get_agent_response(agent_name, query):
             return f"Agent '{agent_name}' not recognized."
     except Exception as e:
         return f"Error getting agent response: {str(e)}"
+
+
+def stream_agent_response(agent_name, query):
+    """
+    Like get_agent_response(), but yields the response in pieces as the
+    model produces them, for st.write_stream(). Errors are yielded as text.
+    """
+    if agent_name not in AGENT_PROMPTS:
+        yield f"Agent '{agent_name}' not recognized."
+        return
+    try:
+        llm = get_llm()
+        if not llm:
+            yield "The AI model is not available at the moment."
+            return
+        for text in llm.stream(AGENT_PROMPTS[agent_name].format(query=query)):
+            yield text
+    except Exception as e:
+        yield f"Error getting agent response: {str(e)}"
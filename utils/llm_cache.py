@@ -0,0 +1,179 @@
+"""
+Disk-backed cache of LLM responses, kept in the shared state store so it
+survives restarts and is shared by every session and process.
+
+Entries are keyed by a namespace (model and generation parameters) and the
+prompt with whitespace normalized, since prompts are built from indented
+templates. They expire after `ttl` seconds, and the least recently used are
+evicted beyond `max_entries`. With a `near_duplicate_threshold`, a prompt
+whose MinHash similarity to a cached prompt in the same namespace reaches
+the threshold reuses that response too; leave it off where prompts differ
+in details that must show up in the answer.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils import state
+from utils.dedup import NearDuplicateIndex, minhash_signature
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        namespace TEXT NOT NULL,
+        response TEXT NOT NULL,
+        signature BLOB,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)",
+    "CREATE INDEX IF NOT EXISTS llm_cache_namespace ON llm_cache (namespace)"
+]
+
+# Seconds a response stays valid
+DEFAULT_TTL = 7 * 24 * 3600
+MAX_ENTRIES = 10000
+# Share of max_entries dropped at once when the cache is full, so eviction
+# doesn't run on every insert
+EVICT_FRACTION = 0.1
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace, so re-indented templates give the same prompt"""
+    return " ".join(str(prompt).split())
+
+
+def make_namespace(model, params=None):
+    """Namespace for a model (or model list) and its generation parameters"""
+    return hashlib.sha256(json.dumps([model, params or {}], sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, near_duplicate_threshold=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._indexes = {}
+        # Guards the indexes and the counters, which worker threads update concurrently
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def _connection(self):
+        return state.ensure_schema("llm_cache", _SCHEMA)
+
+    @staticmethod
+    def _key(namespace, prompt):
+        return hashlib.sha256(f"{namespace}\0{prompt}".encode()).hexdigest()
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _index(self, namespace):
+        """Near-duplicate index of a namespace's cached prompts, loaded on first use"""
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = NearDuplicateIndex(threshold=self.near_duplicate_threshold)
+                rows = self._connection().execute(
+                    "SELECT key, signature FROM llm_cache WHERE namespace = ? AND signature IS NOT NULL",
+                    (namespace,)).fetchall()
+                for key, signature in rows:
+                    index.insert(key, bytes(signature))
+                self._indexes[namespace] = index
+            return index
+
+    def _fetch(self, key, now):
+        """A live entry's response (marking it used), or None"""
+        connection = self._connection()
+        row = connection.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._forget([key])
+            self._count("expired")
+            return None
+        connection.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def get(self, namespace, prompt):
+        """The cached response to `prompt`, or to a near-duplicate of it if enabled, else None"""
+        now = time.time()
+        prompt = normalize_prompt(prompt)
+        response = self._fetch(self._key(namespace, prompt), now)
+        if response is not None:
+            self._count("hits")
+            return response
+
+        if self.near_duplicate_threshold:
+            for key, _ in self._index(namespace).query(minhash_signature(prompt), limit=3):
+                response = self._fetch(key, now)
+                if response is not None:
+                    self._count("near_hits")
+                    return response
+        self._count("misses")
+        return None
+
+    def put(self, namespace, prompt, response):
+        now = time.time()
+        prompt = normalize_prompt(prompt)
+        key = self._key(namespace, prompt)
+        signature = minhash_signature(prompt) if self.near_duplicate_threshold else None
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, response, signature, created_at, "
+                "accessed_at) VALUES (?, ?, ?, ?, ?, ?)", (key, namespace, response, signature, now, now))
+            count = connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            dropped = []
+            if count > self.max_entries:
+                # Expired entries go first, then the least recently used
+                dropped = [row[0] for row in connection.execute(
+                    "SELECT key FROM llm_cache WHERE created_at < ? OR key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (now - self.ttl, count - self.max_entries + int(self.max_entries * EVICT_FRACTION)))]
+                connection.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in dropped])
+                self._count("evictions", len(dropped))
+        if signature is not None and namespace in self._indexes:
+            self._indexes[namespace].insert(key, signature)
+        self._forget(dropped)
+
+    def _forget(self, keys):
+        with self._lock:
+            for index in self._indexes.values():
+                for key in keys:
+                    index.remove(key)
+
+    def clear(self):
+        with state.transaction(self._connection()) as connection:
+            connection.execute("DELETE FROM llm_cache")
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self):
+        entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self._lock:
+            counts = {"hits": self.hits, "near_hits": self.near_hits, "misses": self.misses,
+                      "evictions": self.evictions, "expired": self.expired}
+        lookups = counts["hits"] + counts["near_hits"] + counts["misses"]
+        return dict(counts, entries=entries,
+                    hit_rate=((counts["hits"] + counts["near_hits"]) / lookups) if lookups else 0.0)
+
+
+def from_environment():
+    """
+    A ResponseCache configured by TALENTCREW_LLM_CACHE_TTL (seconds),
+    TALENTCREW_LLM_CACHE_SIZE (entries) and TALENTCREW_LLM_CACHE_NEAR_DUPLICATES
+    (a similarity threshold such as 0.9; unset to match exact prompts only).
+    """
+    near = os.getenv("TALENTCREW_LLM_CACHE_NEAR_DUPLICATES")
+    return ResponseCache(ttl=float(os.getenv("TALENTCREW_LLM_CACHE_TTL", DEFAULT_TTL)),
+                         max_entries=int(os.getenv("TALENTCREW_LLM_CACHE_SIZE", MAX_ENTRIES)),
+                         near_duplicate_threshold=float(near) if near else None)
@@ -0,0 +1,79 @@
+"""
+Leases on (job title, stage) pairs, kept in the shared state store so every
+Streamlit session and process sees the same locks. Runs for different jobs
+never contend; a second run for the same job is turned away (or waits)
+while any stage it needs is held.
+
+A lease expires `ttl` seconds after it was last renewed, so a run whose
+process died stops blocking its job once the lease lapses.
+"""
+import time
+
+from utils import state
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS leases (
+        job_title TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (job_title, stage)
+    )""",
+    "CREATE INDEX IF NOT EXISTS leases_owner ON leases (owner)"
+]
+
+# Seconds a lease lasts without renewal
+DEFAULT_TTL = 60
+
+
+class LockManager:
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+
+    def _connection(self):
+        return state.ensure_schema("leases", _SCHEMA)
+
+    def acquire(self, job_title, stages, owner):
+        """Take every lease in `stages` for `owner`, or none of them. Returns True on success"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            placeholders = ",".join("?" * len(stages))
+            held = connection.execute(
+                f"SELECT 1 FROM leases WHERE job_title = ? AND stage IN ({placeholders}) "
+                f"AND owner != ? AND expires_at > ? LIMIT 1",
+                (job_title, *stages, owner, now)).fetchone()
+            if held:
+                return False
+            connection.executemany(
+                "INSERT OR REPLACE INTO leases (job_title, stage, owner, expires_at) VALUES (?, ?, ?, ?)",
+                [(job_title, stage, owner, now + self.ttl) for stage in stages])
+        return True
+
+    def renew(self, owner):
+        """Extend every lease held by `owner`; returns how many it still holds"""
+        with state.transaction(self._connection()) as connection:
+            cursor = connection.execute("UPDATE leases SET expires_at = ? WHERE owner = ?",
+                                        (time.time() + self.ttl, owner))
+            return cursor.rowcount
+
+    def release(self, owner, job_title=None, stages=None):
+        """Drop leases held by `owner`, optionally only some stages of one job"""
+        query, params = "DELETE FROM leases WHERE owner = ?", [owner]
+        if job_title is not None:
+            query += " AND job_title = ?"
+            params.append(job_title)
+        if stages:
+            query += f" AND stage IN ({','.join('?' * len(stages))})"
+            params.extend(stages)
+        with state.transaction(self._connection()) as connection:
+            connection.execute(query, params)
+
+    def holders(self, job_title=None):
+        """Live leases as {(job_title, stage): owner}"""
+        query, params = "SELECT job_title, stage, owner FROM leases WHERE expires_at > ?", [time.time()]
+        if job_title is not None:
+            query += " AND job_title = ?"
+            params.append(job_title)
+        rows = self._connection().execute(query, params).fetchall()
+        return {(row[0], row[1]): row[2] for row in rows}
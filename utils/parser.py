@@ -1,9 +1,10 @@
 import re
+from functools import lru_cache
 import spacy
 import streamlit as st
 
-# Load spaCy model for NLP processing
-@st.cache_resource
+# Load spaCy model for NLP processing; cached per process, with or without Streamlit
+@lru_cache(maxsize=None)
 def load_spacy_model():
     try:
         return spacy.load("en_core_web_sm")
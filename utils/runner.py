@@ -0,0 +1,245 @@
+"""
+Background execution of pipeline runs. The runner lives at module level,
+so every Streamlit session in the server process shares it: a run keeps
+going when the page that started it reloads, and sessions only poll
+cheap snapshots of its progress.
+
+Runs hold leases on their job's stages (utils/locks.py) while they work,
+so two runs for the same job can't overlap, even from different processes,
+while runs for different jobs go ahead in parallel.
+"""
+import itertools
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.checkpoints import CheckpointStore
+from utils.locks import LockManager
+
+# Finished runs kept for polling
+MAX_FINISHED_RUNS = 100
+
+# Seconds between lease renewals, and between attempts while a run waits for its job
+LEASE_INTERVAL = 5
+
+
+def _pipeline_stages():
+    # Imported here so importing the runner doesn't pull in every agent
+    from agents.pipeline import STAGES
+    return STAGES
+
+
+class PipelineRun:
+    def __init__(self, job_title, job_description, candidate_count, run_id=None, options=None):
+        self.id = run_id or uuid.uuid4().hex[:12]
+        # Lease owner; a fresh one per attempt, so a resumed run never
+        # inherits leases its crashed predecessor may still hold
+        self.owner = f"{self.id}:{uuid.uuid4().hex[:8]}"
+        self.job_title = job_title
+        self.job_description = job_description
+        self.candidate_count = candidate_count
+        # Extra run_pipeline arguments, e.g. streaming or min_match_score
+        self.options = options or {}
+        self.status = "queued"
+        # Streaming runs have several stages in flight at once
+        self.running_stages = []
+        self.completed_stages = []
+        self.results = {}
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "job_title": self.job_title,
+            "candidate_count": self.candidate_count,
+            "status": self.status,
+            "stage": self.running_stages[0] if self.running_stages else None,
+            "running_stages": list(self.running_stages),
+            "completed_stages": list(self.completed_stages),
+            "results": dict(self.results),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class PipelineRunner:
+    """Runs pipeline jobs on a thread pool; submit() returns a run id to poll with get()"""
+
+    def __init__(self, max_workers=4, locks=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+        self.locks = locks or LockManager()
+
+    def submit(self, job_title, job_description, candidate_count=5, wait=False, **options):
+        """
+        Start a run; `options` are passed on to run_pipeline. If another run
+        holds the job's stages, return None, or with `wait`, keep the run
+        queued until they are released.
+        """
+        run = PipelineRun(job_title, job_description, candidate_count, options=options)
+        return self._start(run, wait)
+
+    def resume(self, run_id, wait=False, **options):
+        """
+        Continue an unfinished run from its last checkpoint, under the same
+        id. Returns None if the run is unknown, finished or its job is locked.
+        """
+        with self._lock:
+            current = self._runs.get(run_id)
+            if current is not None and current.status in ("queued", "running"):
+                return None
+        saved = CheckpointStore().get_run(run_id)
+        if saved is None or saved["status"] == "completed":
+            return None
+        run = PipelineRun(saved["job_title"], saved["job_description"], saved["candidate_count"],
+                          run_id=run_id, options=options)
+        return self._start(run, wait)
+
+    def resumable_runs(self, job_title=None):
+        """Checkpointed runs that stopped before finishing and aren't running anywhere"""
+        live = {owner.split(":")[0] for owner in self.locks.holders(job_title).values()}
+        live.update(run["id"] for run in self.list_runs(active_only=True))
+        return [run for run in CheckpointStore().unfinished_runs(job_title)
+                if run["run_id"] not in live]
+
+    def _start(self, run, wait):
+        if not wait and not self.locks.acquire(run.job_title, _pipeline_stages(), run.owner):
+            return None
+        with self._lock:
+            # A resumed run replaces its earlier attempt
+            self._runs.pop(run.id, None)
+            self._runs[run.id] = run
+            self._prune()
+        if wait:
+            self._admit(run)
+        else:
+            self._executor.submit(self._run, run)
+        return run.id
+
+    def _admit(self, run):
+        # Queued runs wait their turn on a timer, so they don't tie up a
+        # pool worker (and hold up other jobs) while another run has theirs
+        try:
+            acquired = self.locks.acquire(run.job_title, _pipeline_stages(), run.owner)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(run, "failed", str(e))
+            return
+        if acquired:
+            self._executor.submit(self._run, run)
+            return
+        retry = threading.Timer(LEASE_INTERVAL, self._admit, (run,))
+        retry.daemon = True
+        retry.start()
+
+    def get(self, run_id):
+        """Snapshot of a run, or None if unknown"""
+        with self._lock:
+            run = self._runs.get(run_id)
+            return run.snapshot() if run else None
+
+    def wait(self, run_id, timeout=None):
+        """Block until a run finishes (or `timeout` passes); returns its snapshot"""
+        with self._lock:
+            run = self._runs.get(run_id)
+        if run is None:
+            return None
+        run.done.wait(timeout)
+        return self.get(run_id)
+
+    def list_runs(self, active_only=False):
+        """Snapshots of known runs, newest first"""
+        with self._lock:
+            runs = [run.snapshot() for run in reversed(self._runs.values())
+                    if not active_only or run.status in ("queued", "running")]
+        return runs
+
+    def active_run(self, job_title):
+        """Snapshot of a queued or running run for `job_title`, if any"""
+        for run in self.list_runs(active_only=True):
+            if run["job_title"] == job_title:
+                return run
+        return None
+
+    def _run(self, run):
+        from agents.pipeline import run_pipeline
+
+        stop = threading.Event()
+
+        def on_stage(stage, result):
+            if result is not None:
+                # Later stages may still be busy; this one is free for the next run
+                self.locks.release(run.owner, run.job_title, [stage])
+            with self._lock:
+                if result is None:
+                    run.running_stages.append(stage)
+                else:
+                    run.running_stages.remove(stage)
+                    run.results[stage] = result
+                    run.completed_stages.append(stage)
+
+        def heartbeat():
+            while not stop.wait(LEASE_INTERVAL):
+                self.locks.renew(run.owner)
+
+        renewer = threading.Thread(target=heartbeat, name=f"lease-{run.id}", daemon=True)
+        status, error = "failed", None
+        try:
+            renewer.start()
+            with self._lock:
+                run.status = "running"
+                run.started_at = time.time()
+            results = run_pipeline(run.job_title, run.job_description, run.candidate_count,
+                                   on_stage=on_stage, run_id=run.id, **run.options)
+            failed = any(not result["success"] for result in results.values())
+            status = "failed" if failed else "completed"
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+        finally:
+            stop.set()
+            if renewer.is_alive():
+                renewer.join()
+            try:
+                self.locks.release(run.owner)
+            except Exception as e:
+                traceback.print_exc()
+                error = error or str(e)
+            self._finish(run, status, error)
+
+    def _finish(self, run, status, error):
+        with self._lock:
+            run.status = status
+            run.error = error
+            run.running_stages = []
+            run.finished_at = time.time()
+        run.done.set()
+
+    def _prune(self):
+        finished = [run_id for run_id, run in self._runs.items()
+                    if run.status in ("completed", "failed")]
+        for run_id in itertools.islice(finished, max(0, len(finished) - MAX_FINISHED_RUNS)):
+            del self._runs[run_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """The process-wide runner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = PipelineRunner()
+        return _runner
@@ -0,0 +1,440 @@
+"""
+Interview slot allocation.
+
+Time is cut into fixed-length slots within working hours, numbered
+consecutively across working days, so a booking is just (resource, slot).
+Each interviewer and room keeps a sorted list of its booked slots; the
+first free slot at or after t is one bisect away. Each pool keeps a
+min-heap of its resources keyed by their next free slot, so finding the
+earliest free resource is O(log n) in the number of resources.
+"""
+import bisect
+import heapq
+import threading
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from utils import state
+from utils.assignment import solve_assignment
+
+Booking = namedtuple("Booking", ["candidate_id", "job_title", "interviewer", "room", "slot", "start"])
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        candidate_id TEXT NOT NULL UNIQUE,
+        job_title TEXT NOT NULL,
+        interviewer TEXT NOT NULL,
+        room TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        start TEXT NOT NULL,
+        UNIQUE (interviewer, slot),
+        UNIQUE (room, slot)
+    )""",
+    "CREATE INDEX IF NOT EXISTS bookings_slot ON bookings (slot)",
+    "CREATE INDEX IF NOT EXISTS bookings_job ON bookings (job_title, slot)"
+]
+
+
+class WorkCalendar:
+    """Maps slot numbers to datetimes: Monday-Friday, day_start to day_end"""
+
+    # A Monday; slot 0 starts at day_start on this date
+    EPOCH = date(2024, 1, 1)
+
+    def __init__(self, day_start=time(9), day_end=time(17), slot_minutes=60):
+        self.day_start = day_start
+        self.slot_minutes = slot_minutes
+        minutes = (day_end.hour * 60 + day_end.minute) - (day_start.hour * 60 + day_start.minute)
+        self.slots_per_day = minutes // slot_minutes
+        if self.slots_per_day <= 0:
+            raise ValueError("working day is shorter than one slot")
+
+    def to_datetime(self, slot):
+        day, offset = divmod(slot, self.slots_per_day)
+        week, weekday = divmod(day, 5)
+        start = datetime.combine(self.EPOCH + timedelta(days=week * 7 + weekday), self.day_start)
+        return start + timedelta(minutes=offset * self.slot_minutes)
+
+    def slot_at_or_after(self, moment):
+        """First slot starting at or after `moment`"""
+        days = (moment.date() - self.EPOCH).days
+        week, weekday = divmod(days, 7)
+        if weekday >= 5:
+            return (week + 1) * 5 * self.slots_per_day
+        day = week * 5 + weekday
+        minutes = (moment.hour * 60 + moment.minute + (moment.second > 0 or moment.microsecond > 0)
+                   - self.day_start.hour * 60 - self.day_start.minute)
+        offset = max(0, -(-minutes // self.slot_minutes))
+        if offset >= self.slots_per_day:
+            return (day + 1) * self.slots_per_day
+        return day * self.slots_per_day + offset
+
+
+class FreeSlots:
+    """Booked slots of one interviewer or room, kept sorted"""
+
+    __slots__ = ("name", "booked")
+
+    def __init__(self, name):
+        self.name = name
+        self.booked = []
+
+    def next_free(self, slot):
+        i = bisect.bisect_left(self.booked, slot)
+        while i < len(self.booked) and self.booked[i] == slot:
+            slot += 1
+            i += 1
+        return slot
+
+    def is_free(self, slot):
+        i = bisect.bisect_left(self.booked, slot)
+        return i == len(self.booked) or self.booked[i] != slot
+
+    def book(self, slot):
+        bisect.insort(self.booked, slot)
+
+    def release(self, slot):
+        i = bisect.bisect_left(self.booked, slot)
+        if i < len(self.booked) and self.booked[i] == slot:
+            del self.booked[i]
+
+
+class ResourcePool:
+    """
+    Interviewers or rooms. The heap holds (next free slot, name) entries;
+    an entry may be stale after a booking, and is refreshed lazily when it
+    reaches the top. Keys only ever move forward, so after a release or a
+    query earlier than the previous ones the heap must be reset.
+    """
+
+    def __init__(self, names):
+        self.resources = {name: FreeSlots(name) for name in names}
+        if not self.resources:
+            raise ValueError("pool is empty")
+        self.reset(0)
+
+    def reset(self, slot):
+        self._heap = [(slot, name) for name in self.resources]
+        heapq.heapify(self._heap)
+
+    def earliest(self, slot):
+        """Return (first slot >= `slot` at which some resource is free, that resource)"""
+        heap = self._heap
+        while True:
+            key, name = heap[0]
+            free = self.resources[name].next_free(max(key, slot))
+            if free == key:
+                return free, name
+            heapq.heapreplace(heap, (free, name))
+
+    def book(self, name, slot):
+        self.resources[name].book(slot)
+
+    def release(self, name, slot):
+        self.resources[name].release(slot)
+
+
+class InterviewScheduler:
+    """
+    Allocates (interviewer, room, slot) triples and persists them in the
+    shared state store. Allocation runs inside a write transaction after
+    applying bookings made by other processes, so two processes never hand
+    out the same interviewer or room; the UNIQUE constraints back this up.
+    Cancellations made by other processes are not picked up, which can only
+    leave a slot unused, never double-booked.
+
+    `profiles` optionally describes interviewers for batch scheduling:
+    {name: {"skills": [...], "timezone": "Europe/London"}}. Calendar times
+    are in `timezone`.
+    """
+
+    # Local hours (start inclusive, end exclusive) an interview may start in
+    CANDIDATE_HOURS = (8, 20)
+    INTERVIEWER_HOURS = (9, 18)
+    # Cost, in slots of delay, of an interviewer covering none of the job's skills
+    SKILL_WEIGHT = 8.0
+
+    def __init__(self, interviewers, rooms, calendar=None, lead_time=timedelta(days=1),
+                 profiles=None, timezone="UTC"):
+        self.calendar = calendar or WorkCalendar()
+        self.interviewers = ResourcePool(interviewers)
+        self.rooms = ResourcePool(rooms)
+        self.lead_time = lead_time
+        self.profiles = profiles or {}
+        self.timezone = ZoneInfo(timezone)
+        self._last_booking_id = 0
+        self._booked = {}
+        # Highest slot the pool heaps have been queried from. Queries move
+        # heap keys forward, so they only hold for queries at or after it.
+        self._queried = 0
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        return state.ensure_schema("bookings", _SCHEMA)
+
+    def _sync(self, connection):
+        """Apply bookings written since the last sync (by this or another process)"""
+        rows = connection.execute(
+            "SELECT id, candidate_id, job_title, interviewer, room, slot, start FROM bookings "
+            "WHERE id > ? ORDER BY id", (self._last_booking_id,)).fetchall()
+        for booking_id, *fields in rows:
+            booking = Booking(*fields)
+            self._last_booking_id = booking_id
+            if booking.candidate_id in self._booked:
+                continue
+            self._booked[booking.candidate_id] = booking
+            if booking.interviewer in self.interviewers.resources:
+                self.interviewers.book(booking.interviewer, booking.slot)
+            if booking.room in self.rooms.resources:
+                self.rooms.book(booking.room, booking.slot)
+
+    def _reset_pools(self, slot):
+        self.interviewers.reset(slot)
+        self.rooms.reset(slot)
+        self._queried = slot
+
+    def _find_slot(self, slot):
+        """
+        Earliest slot >= `slot` with both an interviewer and a room free.
+        Heap keys may skip past slots where no pair was free; bookings only
+        make that more true, so they stay valid until a cancellation.
+        """
+        while True:
+            slot, interviewer = self.interviewers.earliest(slot)
+            room_slot, room = self.rooms.earliest(slot)
+            if room_slot == slot:
+                return slot, interviewer, room
+            slot = room_slot
+
+    def schedule(self, candidate_ids, job_title, not_before=None):
+        """
+        Book interviews for many candidates in one transaction. Candidates
+        that already have a booking keep it. Returns {candidate_id: Booking}.
+        """
+        not_before = not_before or datetime.now() + self.lead_time
+        first_slot = self.calendar.slot_at_or_after(not_before)
+        results = {}
+
+        with self._lock:
+            connection = self._connection()
+            try:
+                self._allocate(connection, candidate_ids, job_title, first_slot, results)
+            except Exception:
+                # The transaction rolled back; rebuild from what was committed
+                self._forget()
+                raise
+        return results
+
+    def _allocate(self, connection, candidate_ids, job_title, first_slot, results):
+        with state.transaction(connection):
+            self._sync(connection)
+            if first_slot < self._queried:
+                self._reset_pools(first_slot)
+            self._queried = first_slot
+            for candidate_id in candidate_ids:
+                existing = self._booked.get(candidate_id)
+                if existing is not None:
+                    results[candidate_id] = existing
+                    continue
+                slot, interviewer, room = self._find_slot(first_slot)
+                results[candidate_id] = self._record(connection, candidate_id, job_title,
+                                                     interviewer, room, slot)
+            # Our own rows are already applied
+            self._last_booking_id = connection.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+
+    def _record(self, connection, candidate_id, job_title, interviewer, room, slot):
+        booking = Booking(candidate_id, job_title, interviewer, room, slot,
+                          self.calendar.to_datetime(slot).isoformat())
+        connection.execute(
+            "INSERT INTO bookings (candidate_id, job_title, interviewer, room, slot, start) "
+            "VALUES (?, ?, ?, ?, ?, ?)", booking)
+        self.interviewers.book(interviewer, slot)
+        self.rooms.book(room, slot)
+        self._booked[candidate_id] = booking
+        return booking
+
+    def schedule_batch(self, candidates, job_title, not_before=None, horizon_days=10,
+                       max_columns=None):
+        """
+        Book interviews for many candidates jointly. `candidates` is a list
+        of (candidate_id, metadata); a candidate's job skills are its
+        "matching_skills" and "missing_skills", its time zone "timezone".
+
+        Every free (interviewer, slot) pair in the horizon becomes a column
+        of a candidate x column cost matrix: the delay in slots, plus a
+        penalty for interviewers covering few of the job's skills, with
+        pairs outside anyone's local hours forbidden. The minimum-cost
+        assignment uses interviewers where they matter most, instead of
+        handing them out first come, first served. Candidates that can't be
+        placed are left out of the returned {candidate_id: Booking}.
+        """
+        not_before = not_before or datetime.now() + self.lead_time
+        first_slot = self.calendar.slot_at_or_after(not_before)
+        results = {}
+
+        with self._lock:
+            connection = self._connection()
+            try:
+                with state.transaction(connection):
+                    self._sync(connection)
+                    pending = []
+                    for candidate_id, metadata in candidates:
+                        if candidate_id in self._booked:
+                            results[candidate_id] = self._booked[candidate_id]
+                        else:
+                            pending.append((candidate_id, metadata))
+                    if pending:
+                        self._assign(connection, pending, job_title, first_slot,
+                                     horizon_days, max_columns or max(1000, 10 * len(pending)), results)
+                    self._last_booking_id = connection.execute(
+                        "SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+            except Exception:
+                self._forget()
+                raise
+        return results
+
+    def _assign(self, connection, pending, job_title, first_slot, horizon_days, max_columns, results):
+        # Columns: free (interviewer, slot) pairs at slots with a free room, earliest first
+        rooms_free = {}
+        column_slots, column_interviewers = [], []
+        names = list(self.interviewers.resources)
+        last_slot = first_slot + horizon_days * self.calendar.slots_per_day
+        for slot in range(first_slot, last_slot):
+            free_rooms = [room for room, resource in self.rooms.resources.items() if resource.is_free(slot)]
+            if not free_rooms:
+                continue
+            rooms_free[slot] = free_rooms
+            for index, name in enumerate(names):
+                if self.interviewers.resources[name].is_free(slot):
+                    column_slots.append(slot)
+                    column_interviewers.append(index)
+            if len(column_slots) >= max_columns:
+                break
+        if not column_slots:
+            return
+
+        column_slots = np.array(column_slots[:max_columns])
+        column_interviewers = np.array(column_interviewers[:max_columns])
+        delay = (column_slots - first_slot).astype(np.float64)
+        distinct_slots = np.unique(column_slots)
+
+        interviewer_ok = self._hours_mask(column_slots, column_interviewers, names, distinct_slots)
+
+        # Rows share cost vectors per (skills, time zone), so build each once
+        groups = {}
+        for row, (_, metadata) in enumerate(pending):
+            key = (_job_skills(metadata), metadata.get("timezone") or None)
+            groups.setdefault(key, []).append(row)
+
+        cost = np.empty((len(pending), len(column_slots)))
+        for (skills, zone), rows in groups.items():
+            vector = delay + self.SKILL_WEIGHT * (1.0 - self._coverage(skills, names)[column_interviewers])
+            allowed = interviewer_ok.copy()
+            if zone:
+                hours = self._local_hours(distinct_slots, zone)
+                slot_ok = (hours >= self.CANDIDATE_HOURS[0]) & (hours < self.CANDIDATE_HOURS[1])
+                allowed &= slot_ok[np.searchsorted(distinct_slots, column_slots)]
+            vector[~allowed] = np.inf
+            cost[rows] = vector
+
+        # Rooms cap how many interviews fit in a slot; re-solve any overflow
+        # without the slots that filled up
+        rows = np.arange(len(pending))
+        while len(rows):
+            assignment = solve_assignment(cost[rows], unassigned_cost=1e9)
+            overflow = []
+            for row, column in zip(rows, assignment):
+                if column < 0:
+                    continue
+                slot = int(column_slots[column])
+                if not rooms_free.get(slot):
+                    overflow.append(row)
+                    continue
+                candidate_id = pending[row][0]
+                results[candidate_id] = self._record(connection, candidate_id, job_title,
+                                                     names[column_interviewers[column]],
+                                                     rooms_free[slot].pop(0), slot)
+                cost[:, column] = np.inf
+            full = [slot for slot, free_rooms in rooms_free.items() if not free_rooms]
+            cost[:, np.isin(column_slots, full)] = np.inf
+            if len(overflow) == len(rows):
+                break
+            rows = np.array(overflow, dtype=np.int64)
+
+    def _coverage(self, skills, names):
+        """Share of the job's skills each interviewer covers; 0.5 when unknown"""
+        coverage = np.full(len(names), 0.5)
+        if not skills:
+            return coverage
+        for index, name in enumerate(names):
+            interviewer_skills = self.profiles.get(name, {}).get("skills")
+            if interviewer_skills:
+                coverage[index] = len(skills & {s.lower() for s in interviewer_skills}) / len(skills)
+        return coverage
+
+    def _local_hours(self, slots, zone):
+        """Local start hour of each slot in time zone `zone`"""
+        zone = ZoneInfo(zone)
+        return np.array([self.calendar.to_datetime(int(slot)).replace(tzinfo=self.timezone)
+                         .astimezone(zone).hour for slot in slots])
+
+    def _hours_mask(self, column_slots, column_interviewers, names, distinct_slots):
+        """Whether each column falls within its interviewer's local working hours"""
+        mask = np.ones(len(column_slots), dtype=bool)
+        zones = {}
+        for index, name in enumerate(names):
+            zone = self.profiles.get(name, {}).get("timezone")
+            if zone:
+                zones.setdefault(zone, []).append(index)
+        for zone, indexes in zones.items():
+            hours = self._local_hours(distinct_slots, zone)
+            slot_ok = (hours >= self.INTERVIEWER_HOURS[0]) & (hours < self.INTERVIEWER_HOURS[1])
+            in_zone = np.isin(column_interviewers, indexes)
+            mask[in_zone] = slot_ok[np.searchsorted(distinct_slots, column_slots[in_zone])]
+        return mask
+
+    def _forget(self):
+        """Drop in-memory state; the next sync reloads every booking"""
+        for pool in (self.interviewers, self.rooms):
+            for resource in pool.resources.values():
+                resource.booked = []
+        self._booked = {}
+        self._last_booking_id = 0
+        self._reset_pools(0)
+
+    def cancel(self, candidate_id):
+        """Release a candidate's booking; returns whether there was one"""
+        with self._lock:
+            connection = self._connection()
+            with state.transaction(connection):
+                self._sync(connection)
+                booking = self._booked.pop(candidate_id, None)
+                if booking is None:
+                    return False
+                connection.execute("DELETE FROM bookings WHERE candidate_id = ?", (candidate_id,))
+            if booking.interviewer in self.interviewers.resources:
+                self.interviewers.release(booking.interviewer, booking.slot)
+            if booking.room in self.rooms.resources:
+                self.rooms.release(booking.room, booking.slot)
+            self._reset_pools(self._queried)
+            return True
+
+    def get_booking(self, candidate_id):
+        with self._lock:
+            self._sync(self._connection())
+            return self._booked.get(candidate_id)
+
+
+def _job_skills(metadata):
+    skills = set()
+    for field in ("matching_skills", "missing_skills"):
+        value = metadata.get(field) or []
+        if isinstance(value, str):
+            value = value.split(", ")
+        skills.update(skill.strip().lower() for skill in value if skill.strip())
+    return frozenset(skills)
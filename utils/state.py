@@ -0,0 +1,87 @@
+"""
+Shared SQLite store for coordination state that has to outlive a Streamlit
+session and be visible to every process: interview bookings, locks,
+checkpoints and the like. Each module creates its own tables with
+ensure_schema.
+"""
+import os
+import sqlite3
+import threading
+
+_path = os.getenv("TALENTCREW_STATE_DB", "./talentcrew_state.db")
+_local = threading.local()
+_generation = 0
+
+
+def set_state_path(path):
+    """Point the store at another database file, e.g. for tests or a CLI run"""
+    global _path, _generation
+    _path = path
+    _generation += 1
+
+
+def get_state_path():
+    return _path
+
+
+def get_connection():
+    """
+    Return this thread's connection. WAL mode lets readers run alongside a
+    writer; busy_timeout makes concurrent writers queue instead of failing.
+    A forked child never reuses its parent's connection.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is not None and _local.pid != os.getpid():
+        connection = None
+    if connection is None or _local.generation != _generation:
+        if connection is not None:
+            connection.close()
+        connection = sqlite3.connect(_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=30000")
+        _local.connection = connection
+        _local.generation = _generation
+        _local.pid = os.getpid()
+        _local.schemas = set()
+    return connection
+
+
+def close_connection():
+    """Close this thread's connection, if any"""
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+
+
+def ensure_schema(name, statements):
+    """Run `statements` (CREATE ... IF NOT EXISTS) once per connection"""
+    connection = get_connection()
+    if name not in _local.schemas:
+        for statement in statements:
+            connection.execute(statement)
+        _local.schemas.add(name)
+    return connection
+
+
+class transaction:
+    """
+    Context manager for a write transaction. BEGIN IMMEDIATE takes the write
+    lock up front, so read-then-write sequences can't interleave with
+    another process.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection or get_connection()
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+        return False
@@ -0,0 +1,137 @@
+"""
+Shared registry of what the agents are doing, across every session and
+process. Each worker (one stage of one pipeline run) keeps a row up to
+date as it makes progress and heartbeats while it waits for input. A
+running worker whose heartbeat stops, e.g. because its process died, is
+reported as stale rather than running forever.
+"""
+import time
+
+from utils import state
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS agent_status (
+        worker_id TEXT PRIMARY KEY,
+        agent TEXT NOT NULL,
+        job_title TEXT NOT NULL,
+        run_id TEXT,
+        state TEXT NOT NULL,
+        processed INTEGER NOT NULL DEFAULT 0,
+        started_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        heartbeat_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS agent_status_state ON agent_status (state, agent)",
+    "CREATE INDEX IF NOT EXISTS agent_status_updated ON agent_status (updated_at)",
+    "CREATE INDEX IF NOT EXISTS agent_status_run ON agent_status (run_id)"
+]
+
+# Seconds without a heartbeat before a running worker counts as stale
+STALE_AFTER = 30
+# Seconds between heartbeats of a running pipeline
+HEARTBEAT_INTERVAL = 5
+# Seconds a finished or stale worker is kept
+KEEP_FINISHED = 3600
+# Seconds a failed worker still shows as an error
+RECENT_ERROR = 60
+
+
+class StatusRegistry:
+
+    def __init__(self, stale_after=STALE_AFTER):
+        self.stale_after = stale_after
+
+    def _connection(self):
+        return state.ensure_schema("agent_status", _SCHEMA)
+
+    def start(self, worker_id, agent, job_title, run_id=None):
+        """Mark a worker as running, starting its progress and throughput afresh"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO agent_status (worker_id, agent, job_title, run_id, state, "
+                "processed, started_at, updated_at, heartbeat_at) VALUES (?, ?, ?, ?, 'running', 0, ?, ?, ?)",
+                (worker_id, agent, job_title, run_id, now, now, now))
+
+    def progress(self, worker_id, processed):
+        """Record how many items a worker has handled so far; also counts as a heartbeat"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "UPDATE agent_status SET processed = ?, updated_at = ?, heartbeat_at = ? WHERE worker_id = ?",
+                (processed, now, now, worker_id))
+
+    def finish(self, worker_id, status="completed", processed=None):
+        """Mark a worker as finished ("completed" or "failed") and drop long-finished or dead ones"""
+        now = time.time()
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "UPDATE agent_status SET state = ?, processed = COALESCE(?, processed), updated_at = ?, "
+                "heartbeat_at = ? WHERE worker_id = ?", (status, processed, now, now, worker_id))
+            # Workers that went quiet that long ago are gone for good, too
+            connection.execute("DELETE FROM agent_status WHERE updated_at < ? AND heartbeat_at < ?",
+                               (now - KEEP_FINISHED, now - KEEP_FINISHED))
+
+    def heartbeat(self, run_id):
+        """Show that a run's running workers are alive, even while they wait for input"""
+        with state.transaction(self._connection()) as connection:
+            connection.execute("UPDATE agent_status SET heartbeat_at = ? WHERE run_id = ? AND state = 'running'",
+                               (time.time(), run_id))
+
+    def workers(self, job_title=None, finished_since=None):
+        """
+        Running workers, plus those finished since `finished_since`, as dicts
+        with "stale" and "throughput" (items per second since the worker
+        started) filled in.
+        """
+        query = ("SELECT worker_id, agent, job_title, run_id, state, processed, started_at, updated_at, "
+                 "heartbeat_at FROM agent_status WHERE (state = 'running' OR updated_at >= ?)")
+        params = [finished_since if finished_since is not None else float("inf")]
+        if job_title is not None:
+            query += " AND job_title = ?"
+            params.append(job_title)
+        rows = self._connection().execute(query, params).fetchall()
+
+        now = time.time()
+        keys = ("worker_id", "agent", "job_title", "run_id", "state", "processed", "started_at",
+                "updated_at", "heartbeat_at")
+        workers = []
+        for row in rows:
+            worker = dict(zip(keys, row))
+            running = worker["state"] == "running"
+            worker["stale"] = running and now - worker["heartbeat_at"] > self.stale_after
+            elapsed = (now if running else worker["updated_at"]) - worker["started_at"]
+            worker["throughput"] = worker["processed"] / elapsed if elapsed > 0 else 0.0
+            workers.append(worker)
+        return workers
+
+    def agent_statuses(self, agents):
+        """
+        Summary per agent across all workers: {"state", "jobs", "throughput"},
+        where state is "running", "stale" (running workers have all gone
+        quiet), "error" (the latest worker failed recently) or "idle".
+        """
+        statuses = {agent: {"state": "idle", "jobs": set(), "throughput": 0.0} for agent in agents}
+        recent = time.time() - RECENT_ERROR
+        latest = {}
+        for worker in self.workers(finished_since=recent):
+            status = statuses.get(worker["agent"])
+            if status is None:
+                continue
+            if worker["state"] == "running" and not worker["stale"]:
+                status["state"] = "running"
+                status["jobs"].add(worker["job_title"])
+                status["throughput"] += worker["throughput"]
+            elif worker["state"] == "running" and status["state"] != "running":
+                status["state"] = "stale"
+            previous = latest.get(worker["agent"])
+            if previous is None or worker["updated_at"] > previous["updated_at"]:
+                latest[worker["agent"]] = worker
+
+        for agent, worker in latest.items():
+            if (statuses[agent]["state"] == "idle" and worker["state"] == "failed"
+                    and worker["updated_at"] >= recent):
+                statuses[agent]["state"] = "error"
+        for status in statuses.values():
+            status["jobs"] = len(status["jobs"])
+        return statuses
@@ -0,0 +1,411 @@
+import os
+import threading
+import time
+
+from utils import state
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS storage_versions (
+        store TEXT NOT NULL,
+        name TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        PRIMARY KEY (store, name)
+    )"""
+]
+
+# Seconds between looks at the shared write versions for other processes' writes
+VERSION_CHECK_INTERVAL = 1.0
+
+
+def flatten_metadata(metadata):
+    """
+    Make a metadata dict storable: lists become comma-separated strings
+    (Chroma doesn't accept list values) and None values are dropped.
+    """
+    flat = {}
+    for key, value in (metadata or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = ", ".join(str(v) for v in value)
+        flat[key] = value
+    return flat
+
+
+def _matches(metadata, where):
+    for field, expected in where.items():
+        value = metadata.get(field)
+        if isinstance(expected, dict):
+            if "$in" in expected and value not in expected["$in"]:
+                return False
+            if "$ne" in expected and value == expected["$ne"]:
+                return False
+            if "$eq" in expected and value != expected["$eq"]:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _empty_result():
+    return {"ids": [], "metadatas": [], "documents": []}
+
+
+class StorageBackend:
+    """
+    Interface for candidate/log storage engines.
+
+    Filters are flat {field: value} dicts; a value may also be an operator
+    dict using "$eq", "$ne" or "$in". Results are dicts with parallel
+    "ids", "metadatas" and "documents" lists, like Chroma's collection.get().
+    An `ids` list restricts a query to those records; an empty list matches
+    nothing. Every write bumps the collection's write version.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._versions = {}
+        self._version_lock = threading.Lock()
+
+    def write_version(self, collection):
+        return self._versions.get(collection, 0)
+
+    def _bump(self, collection):
+        """Advance a write version; returns the new one"""
+        with self._version_lock:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+            return self._versions[collection]
+
+    def bump_version(self, name):
+        """
+        Advance the version of something derived from the stored data, such
+        as an index other processes build from it. Returns the new version.
+        """
+        return self._bump(name)
+
+    def ensure_collection(self, collection):
+        raise NotImplementedError
+
+    def add(self, collection, ids, metadatas, documents=None):
+        raise NotImplementedError
+
+    def patch(self, collection, ids, metadatas=None, documents=None):
+        """Merge metadata fields into (and optionally replace documents of) existing records"""
+        raise NotImplementedError
+
+    def query(self, collection, where=None, ids=None, limit=None, offset=0):
+        raise NotImplementedError
+
+    def ids(self, collection):
+        """Ids of every record in a collection, without their contents"""
+        return [record_id for page in self.iterate(collection) for record_id in page["ids"]]
+
+    def iterate(self, collection, where=None, batch_size=1000):
+        """Yield results page by page"""
+        offset = 0
+        while True:
+            page = self.query(collection, where=where, limit=batch_size,
+                              offset=offset)
+            if not page["ids"]:
+                return
+            yield page
+            if len(page["ids"]) < batch_size:
+                return
+            offset += batch_size
+
+    def aggregate(self, collection, field, where=None):
+        """Count records per value of a metadata field"""
+        counts = {}
+        for page in self.iterate(collection, where=where):
+            for metadata in page["metadatas"]:
+                value = (metadata or {}).get(field, "Unknown")
+                counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def count(self, collection, where=None):
+        return sum(len(page["ids"]) for page in self.iterate(collection, where=where))
+
+
+class ChromaBackend(StorageBackend):
+    """
+    Storage on a persistent ChromaDB client. Other processes (imports, the
+    CLI, data generation) may write to the same directory, so write
+    versions are also kept in the shared state store. Reads use the copy in
+    memory, refreshed from the store at most every VERSION_CHECK_INTERVAL
+    seconds; this process's own writes show up at once.
+    """
+
+    name = "chroma"
+
+    def __init__(self, path="./chroma_db", client=None):
+        super().__init__()
+        if client is None:
+            import chromadb
+            from chromadb.config import Settings
+
+            if not os.path.exists(path):
+                os.makedirs(path)
+            client = chromadb.PersistentClient(
+                path=path,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        self.path = path
+        self.client = client
+        self._collections = {}
+        self._max_batch = None
+        self._store = os.path.abspath(path)
+        self._checked_at = None
+
+    def _connection(self):
+        return state.ensure_schema("storage_versions", _SCHEMA)
+
+    def _record(self, name, version):
+        # A refresh that read the store just before one of our own bumps must not undo it
+        with self._version_lock:
+            self._versions[name] = max(self._versions.get(name, 0), version)
+
+    def write_version(self, collection):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= VERSION_CHECK_INTERVAL:
+            self._checked_at = now
+            for name, version in self._connection().execute(
+                    "SELECT name, version FROM storage_versions WHERE store = ?", (self._store,)):
+                self._record(name, version)
+        return self._versions.get(collection, 0)
+
+    def _bump(self, collection):
+        with state.transaction(self._connection()) as connection:
+            connection.execute(
+                "INSERT INTO storage_versions (store, name, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (store, name) DO UPDATE SET version = version + 1",
+                (self._store, collection))
+            version = connection.execute(
+                "SELECT version FROM storage_versions WHERE store = ? AND name = ?",
+                (self._store, collection)).fetchone()[0]
+        self._record(collection, version)
+        return version
+
+    def _collection(self, collection):
+        handle = self._collections.get(collection)
+        if handle is None:
+            handle = self.client.get_collection(collection)
+            self._collections[collection] = handle
+        return handle
+
+    @staticmethod
+    def _where(where):
+        if not where:
+            return None
+        clauses = [{field: value} for field, value in where.items()]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def ensure_collection(self, collection):
+        self._collections[collection] = self.client.get_or_create_collection(collection)
+
+    def _batches(self, ids, metadatas, documents):
+        """
+        Split a write into slices Chroma accepts; it rejects any add or
+        update of more than get_max_batch_size() records
+        """
+        if self._max_batch is None:
+            get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+            self._max_batch = get_max_batch_size() if callable(get_max_batch_size) else 5000
+        ids = list(ids)
+        metadatas = list(metadatas) if metadatas is not None else None
+        documents = list(documents) if documents is not None else None
+        for start in range(0, len(ids), self._max_batch):
+            end = start + self._max_batch
+            yield (ids[start:end],
+                   [flatten_metadata(m) for m in metadatas[start:end]] if metadatas is not None else None,
+                   documents[start:end] if documents is not None else None)
+
+    def add(self, collection, ids, metadatas, documents=None):
+        if not ids:
+            return
+        for batch_ids, batch_metadatas, batch_documents in self._batches(ids, metadatas, documents):
+            self._collection(collection).add(ids=batch_ids, metadatas=batch_metadatas,
+                                             documents=batch_documents)
+        self._bump(collection)
+
+    def patch(self, collection, ids, metadatas=None, documents=None):
+        if not ids:
+            return
+        for batch_ids, batch_metadatas, batch_documents in self._batches(ids, metadatas, documents):
+            self._collection(collection).update(ids=batch_ids, metadatas=batch_metadatas,
+                                                documents=batch_documents)
+        self._bump(collection)
+
+    def query(self, collection, where=None, ids=None, limit=None, offset=0):
+        if ids is not None and not ids:
+            return _empty_result()
+        raw = self._collection(collection).get(
+            ids=list(ids) if ids is not None else None,
+            where=self._where(where),
+            limit=limit,
+            offset=offset or None
+        )
+        return {
+            "ids": list(raw.get("ids") or []),
+            "metadatas": list(raw.get("metadatas") or []),
+            "documents": list(raw.get("documents") or [])
+        }
+
+    def ids(self, collection):
+        return list(self._collection(collection).get(include=[])["ids"])
+
+    def count(self, collection, where=None):
+        if not where:
+            return self._collection(collection).count()
+        return super().count(collection, where=where)
+
+
+class MemoryBackend(StorageBackend):
+    """
+    In-process storage for tests and benchmarks. Records keep insertion
+    order; equality filters on indexed fields are answered from hash indexes
+    instead of a scan.
+    """
+
+    name = "memory"
+
+    def __init__(self, indexed_fields=("stage", "job_title", "email")):
+        super().__init__()
+        self.indexed_fields = tuple(indexed_fields)
+        self._collections = {}
+        self._indexes = {}
+        self._sequence = 0
+        self._lock = threading.RLock()
+
+    def ensure_collection(self, collection):
+        with self._lock:
+            if collection not in self._collections:
+                self._collections[collection] = {}
+                self._indexes[collection] = {f: {} for f in self.indexed_fields}
+
+    def _index(self, collection, record_id, metadata, remove=False):
+        for field, index in self._indexes[collection].items():
+            if field not in metadata:
+                continue
+            if remove:
+                index.get(metadata[field], set()).discard(record_id)
+            else:
+                index.setdefault(metadata[field], set()).add(record_id)
+
+    def add(self, collection, ids, metadatas, documents=None):
+        if not ids:
+            return
+        documents = documents if documents is not None else [None] * len(ids)
+        with self._lock:
+            self.ensure_collection(collection)
+            records = self._collections[collection]
+            for record_id in ids:
+                if record_id in records:
+                    raise ValueError(f"Record {record_id} already exists in {collection}")
+            for record_id, metadata, document in zip(ids, metadatas, documents):
+                metadata = flatten_metadata(metadata)
+                self._sequence += 1
+                records[record_id] = [metadata, document, self._sequence]
+                self._index(collection, record_id, metadata)
+        self._bump(collection)
+
+    def patch(self, collection, ids, metadatas=None, documents=None):
+        if not ids:
+            return
+        with self._lock:
+            self.ensure_collection(collection)
+            records = self._collections[collection]
+            for i, record_id in enumerate(ids):
+                record = records.get(record_id)
+                if record is None:
+                    continue
+                if metadatas is not None:
+                    self._index(collection, record_id, record[0], remove=True)
+                    record[0] = dict(record[0])
+                    record[0].update(flatten_metadata(metadatas[i]))
+                    self._index(collection, record_id, record[0])
+                if documents is not None:
+                    record[1] = documents[i]
+        self._bump(collection)
+
+    def _matching_ids(self, collection, where=None, ids=None):
+        """Ids matching a filter, in insertion order"""
+        records = self._collections[collection]
+        if ids is not None:
+            return [record_id for record_id in ids
+                    if record_id in records and (not where or _matches(records[record_id][0], where))]
+
+        indexes = self._indexes[collection]
+        best = None
+        for field, expected in (where or {}).items():
+            if field in indexes and not isinstance(expected, dict):
+                bucket = indexes[field].get(expected, set())
+                if best is None or len(bucket) < len(best):
+                    best = bucket
+        if best is None:
+            candidates = records.keys()
+        else:
+            candidates = sorted(best, key=lambda record_id: records[record_id][2])
+        if not where:
+            return list(candidates)
+        return [record_id for record_id in candidates
+                if _matches(records[record_id][0], where)]
+
+    def _page(self, collection, record_ids):
+        records = self._collections[collection]
+        result = _empty_result()
+        for record_id in record_ids:
+            metadata, document, _ = records[record_id]
+            result["ids"].append(record_id)
+            result["metadatas"].append(dict(metadata))
+            result["documents"].append(document)
+        return result
+
+    def query(self, collection, where=None, ids=None, limit=None, offset=0):
+        with self._lock:
+            self.ensure_collection(collection)
+            matched = self._matching_ids(collection, where, ids)
+            end = None if limit is None else (offset or 0) + limit
+            return self._page(collection, matched[offset or 0:end])
+
+    def ids(self, collection):
+        with self._lock:
+            self.ensure_collection(collection)
+            return list(self._collections[collection])
+
+    def iterate(self, collection, where=None, batch_size=1000):
+        with self._lock:
+            self.ensure_collection(collection)
+            matched = self._matching_ids(collection, where)
+        for start in range(0, len(matched), batch_size):
+            with self._lock:
+                chunk = [record_id for record_id in matched[start:start + batch_size]
+                         if record_id in self._collections[collection]]
+                page = self._page(collection, chunk)
+            if page["ids"]:
+                yield page
+
+    def aggregate(self, collection, field, where=None):
+        with self._lock:
+            self.ensure_collection(collection)
+            records = self._collections[collection]
+            if not where and field in self._indexes[collection]:
+                counts = {value: len(bucket)
+                          for value, bucket in self._indexes[collection][field].items()
+                          if bucket}
+                missing = len(records) - sum(counts.values())
+                if missing:
+                    counts["Unknown"] = counts.get("Unknown", 0) + missing
+                return counts
+            counts = {}
+            for record_id in self._matching_ids(collection, where):
+                value = records[record_id][0].get(field, "Unknown")
+                counts[value] = counts.get(value, 0) + 1
+            return counts
+
+    def count(self, collection, where=None):
+        with self._lock:
+            self.ensure_collection(collection)
+            if not where:
+                return len(self._collections[collection])
+            return len(self._matching_ids(collection, where))
@@ -0,0 +1,296 @@
+"""
+Local HTTP stand-ins for external services, for benchmarking and tuning
+without network access. Each server runs in a daemon thread on localhost
+and can inject latency and errors.
+
+    python -m utils.stub_server --sources LinkedIn Indeed GitHub --latency 0.2
+    python -m utils.stub_server --sources --inference-port 8800 --tokens-per-second 50
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from utils.textgen import MAX_TOKENS, count_tokens, generate_text, split_tokens
+
+FIRST_NAMES = ["John", "Jane", "Michael", "Sarah", "David", "Lisa", "Robert", "Emily",
+               "Maya", "Carlos", "Aisha", "Kai", "Sofia", "Omar", "Hiro", "Elena"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia",
+              "Patel", "Chen", "Kim", "Rossi", "Tanaka", "Ali", "Wright", "Campbell"]
+SKILLS = ["python", "java", "javascript", "sql", "react", "django", "flask", "aws",
+          "docker", "kubernetes", "machine learning", "data science", "agile", "scrum"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Base handler: keep-alive JSON responses with injected latency and errors"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body as one segment; otherwise Nagle's algorithm and
+    # delayed ACKs add ~40 ms to every response on a keep-alive connection
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate_service(self):
+        """Sleep for the configured latency; return False (after replying 503) to inject an error"""
+        server = self.server
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+        with server.stats_lock:
+            server.stats["requests"] += 1
+        if random.random() < server.error_rate:
+            with server.stats_lock:
+                server.stats["errors"] += 1
+            self.send_json(503, {"error": "Service temporarily unavailable"})
+            return False
+        return True
+
+
+class JobBoardHandler(StubHandler):
+    """
+    Paginated candidate search:
+
+        GET /candidates?job_title=...&limit=50&cursor=<offset>&since=<timestamp>
+
+    Every board holds `total` deterministic candidates per job title, the
+    i-th one updated at `epoch + i` seconds.
+    """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/candidates":
+            self.send_json(404, {"error": "Not found"})
+            return
+        if not self.simulate_service():
+            return
+
+        query = parse_qs(url.query)
+        job_title = query.get("job_title", ["Software Engineer"])[0]
+        limit = min(int(query.get("limit", ["50"])[0]), 500)
+        offset = int(query.get("cursor", ["0"])[0])
+        since = query.get("since", [None])[0]
+        server = self.server
+
+        # Candidates are ordered by update time, so `since` is a lower bound on the index
+        if since is not None:
+            offset = max(offset, int(float(since) - server.epoch) + 1)
+
+        end = min(offset + limit, server.total)
+        items = [server.candidate(job_title, i) for i in range(offset, end)]
+        self.send_json(200, {
+            "items": items,
+            "next_cursor": str(end) if end < server.total else None
+        })
+
+
+class InferenceHandler(StubHandler):
+    """
+    Text generation in the shape of the Hugging Face Inference API:
+
+        POST /models/<repo_id>  {"inputs": "..." | ["...", ...], "parameters": {...}}
+        -> [{"generated_text": "..."}, ...]
+
+    A list of inputs is generated as one batch, taking as long as its
+    longest response. With "stream": true a single input's tokens are sent
+    as they are generated, as server-sent events like Text Generation
+    Inference's: data: {"token": {"text": ...}, "generated_text": null}
+    """
+
+    def send_chunk(self, data):
+        # Straight to the socket, so a client that hangs up leaves nothing buffered
+        self.connection.sendall(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def stream_text(self, text):
+        """Send `text` token by token at the server's decoding speed"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+        tokens = split_tokens(text)
+        try:
+            for i, token in enumerate(tokens):
+                if self.server.tokens_per_second:
+                    time.sleep(1 / self.server.tokens_per_second)
+                event = {"token": {"id": i, "text": token, "special": False},
+                         "generated_text": text if i == len(tokens) - 1 else None}
+                self.send_chunk(f"data: {json.dumps(event)}\n\n".encode())
+            self.send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. at a stop sequence
+            self.close_connection = True
+
+    def do_POST(self):
+        # Read the body first, so the connection stays usable whatever the reply
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        url = urlsplit(self.path)
+        if not url.path.startswith("/models/"):
+            self.send_json(404, {"error": "Not found"})
+            return
+        model = unquote(url.path[len("/models/"):]).strip("/")
+        try:
+            payload = json.loads(body)
+            inputs = payload["inputs"]
+        except (ValueError, KeyError, TypeError):
+            self.send_json(400, {"error": "Expected a JSON body with \"inputs\""})
+            return
+        prompts = inputs if isinstance(inputs, list) else [inputs]
+        server = self.server
+        if len(prompts) > server.max_batch:
+            self.send_json(400, {"error": f"Batch of {len(prompts)} inputs is over the limit of {server.max_batch}"})
+            return
+
+        stream = bool(payload.get("stream"))
+        if stream and isinstance(inputs, list):
+            self.send_json(400, {"error": "Streaming takes a single input"})
+            return
+
+        parameters = payload.get("parameters") or {}
+        max_tokens = int(parameters.get("max_new_tokens") or parameters.get("max_length") or MAX_TOKENS)
+        # Requests beyond the server's concurrency wait for a free slot, as on a busy endpoint
+        with server.slots:
+            if not self.simulate_service():
+                return
+            texts = [generate_text(prompt, model, max_tokens) for prompt in prompts]
+            tokens = [count_tokens(text) for text in texts]
+            if stream:
+                self.stream_text(texts[0])
+            elif server.tokens_per_second:
+                time.sleep(max(tokens) / server.tokens_per_second)
+        with server.stats_lock:
+            server.stats["inputs"] += len(prompts)
+            server.stats["tokens"] += sum(tokens)
+        if not stream:
+            self.send_json(200, [{"generated_text": text} for text in texts])
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, port=0, latency=0.1, jitter=0.0, error_rate=0.0):
+        super().__init__(("127.0.0.1", port), handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class JobBoardServer(StubServer):
+    """Stand-in for one job board's candidate search API"""
+
+    def __init__(self, name, total=1000, epoch=1700000000, **kwargs):
+        super().__init__(JobBoardHandler, **kwargs)
+        self.name = name
+        self.total = total
+        self.epoch = epoch
+
+    def candidate(self, job_title, index):
+        rng = random.Random(f"{self.name}:{job_title}:{index}")
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        email = f"{name.lower().replace(' ', '.')}{index}@example.com"
+        experience_years = rng.randint(1, 12)
+        skills = rng.sample(SKILLS, rng.randint(2, 6))
+        resume = f"""
+        {name}
+        {email}
+
+        Summary:
+        Professional with {experience_years} years of experience in {job_title} roles.
+
+        Skills:
+        {', '.join(skills)}
+        """
+        return {"source": self.name, "resume": resume, "updated_at": self.epoch + index}
+
+
+class InferenceServer(StubServer):
+    """
+    Stand-in for a hosted text generation endpoint. `latency` is the time
+    to the first token, `tokens_per_second` the decoding speed of each
+    request (None for instant), and `concurrency` how many requests are
+    served at once; the rest queue.
+    """
+
+    def __init__(self, tokens_per_second=None, concurrency=4, max_batch=64, **kwargs):
+        super().__init__(InferenceHandler, **kwargs)
+        self.tokens_per_second = tokens_per_second
+        self.max_batch = max_batch
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.stats.update({"inputs": 0, "tokens": 0})
+
+
+def start_job_boards(names, **kwargs):
+    """Start one JobBoardServer per source name; returns {name: server}"""
+    return {name: JobBoardServer(name, **kwargs).start() for name in names}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run local job-board and inference stand-in servers")
+    arg_parser.add_argument("--sources", nargs="*",
+                            default=["LinkedIn", "Indeed", "Internal Database", "GitHub", "Stack Overflow"])
+    arg_parser.add_argument("--base-port", type=int, default=8700)
+    arg_parser.add_argument("--total", type=int, default=1000)
+    arg_parser.add_argument("--latency", type=float, default=0.1)
+    arg_parser.add_argument("--jitter", type=float, default=0.02)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--inference-port", type=int,
+                            help="also serve text generation on this port "
+                                 "(use with TALENTCREW_LLM_BACKEND=http)")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=50.0,
+                            help="decoding speed of each generation request")
+    arg_parser.add_argument("--concurrency", type=int, default=4,
+                            help="generation requests served at once")
+    args = arg_parser.parse_args()
+
+    servers = []
+    for i, name in enumerate(args.sources):
+        server = JobBoardServer(name, total=args.total, port=args.base_port + i,
+                                latency=args.latency, jitter=args.jitter,
+                                error_rate=args.error_rate).start()
+        servers.append(server)
+        print(f"{name}: {server.url}/candidates")
+    if args.inference_port is not None:
+        server = InferenceServer(tokens_per_second=args.tokens_per_second or None,
+                                 concurrency=args.concurrency, port=args.inference_port,
+                                 latency=args.latency, jitter=args.jitter,
+                                 error_rate=args.error_rate).start()
+        servers.append(server)
+        print(f"Inference: {server.url}/models/<repo_id>")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Seeded synthetic candidates and activity logs for load testing.
+
+Rows are generated in blocks of BLOCK_SIZE with numpy, each block from its
+own generator seeded with (seed, block number). A row's content therefore
+depends only on the seed and its position: the same seed and count give
+byte-identical output whatever the batch size, and blocks can be built in
+any order or in parallel processes. Timestamps are counted from a fixed
+EPOCH rather than the clock, and ids come from the seeded generator too.
+"""
+from collections import deque
+
+import numpy as np
+
+# Skills each position draws from
+POSITION_SKILLS = {
+    "Data Scientist": [
+        "Python", "R", "SQL", "Machine Learning", "TensorFlow", "PyTorch", "scikit-learn",
+        "Data Visualization", "Statistics", "Pandas", "NumPy", "Big Data", "Hadoop", "Spark"
+    ],
+    "Product Manager": [
+        "Agile", "Scrum", "User Stories", "Roadmapping", "A/B Testing", "Market Analysis",
+        "Stakeholder Management", "Wireframing", "Product Strategy", "Competitive Analysis",
+        "User Research", "KPI Tracking", "Prioritization"
+    ],
+    "UX Designer": [
+        "Figma", "Sketch", "Adobe XD", "Wireframing", "Prototyping", "User Testing",
+        "Information Architecture", "UI Design", "User Research", "Usability Testing",
+        "Design Systems", "Interaction Design", "Accessibility"
+    ],
+    "DevOps Engineer": [
+        "Docker", "Kubernetes", "AWS", "Azure", "GCP", "CI/CD", "Jenkins", "Terraform",
+        "Ansible", "GitHub Actions", "Linux", "Shell Scripting", "Monitoring", "Prometheus"
+    ],
+    "Marketing Specialist": [
+        "SEO", "Content Marketing", "Social Media", "Analytics", "Campaign Management",
+        "Email Marketing", "Google Ads", "Facebook Ads", "CRM", "Marketing Automation",
+        "Copywriting", "Brand Management", "Market Research"
+    ],
+    "Software Engineer": [
+        "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "Git",
+        "REST APIs", "Microservices", "Docker", "AWS", "Unit Testing", "System Design"
+    ]
+}
+
+DEGREES = {
+    "Data Scientist": "Computer Science",
+    "Product Manager": "Business",
+    "UX Designer": "Design",
+    "DevOps Engineer": "Computer Science",
+    "Marketing Specialist": "Marketing",
+    "Software Engineer": "Computer Science"
+}
+
+FIRST_NAMES = [
+    "Alex", "Maya", "Tomas", "Sophia", "Raj", "Fatima", "Marcus", "Aisha", "Diana", "Carlos",
+    "Natalie", "David", "Rachel", "Jamal", "Emma", "Lucas", "Noah", "Lily", "Kai", "Zoe",
+    "Omar", "Isabella", "Mateo", "Ava", "Ethan", "Olivia", "Sanjay", "Chloe", "Mohammed", "Hiro",
+    "Samantha", "Gabriel", "Elena", "Benjamin", "Mia", "Jackson", "Nadia", "Daniel", "Sofia", "Liam"
+]
+
+LAST_NAMES = [
+    "Rodriguez", "Patel", "Berg", "Chen", "Kumar", "Al-Hassan", "Johnson", "Thompson", "Lee", "Mendez",
+    "Wong", "Kim", "Green", "Scott", "Wilson", "Martinez", "Parker", "Jackson", "Tanaka", "Adams",
+    "Farouk", "Rossi", "Sanchez", "Murphy", "Wright", "Davis", "Baker", "Ali", "Nakamura", "Taylor",
+    "Abbas", "Miller", "Garcia", "Campbell", "Nguyen", "Okafor", "Schmidt", "Novak", "Silva", "Ivanova"
+]
+
+SOURCES = ["LinkedIn", "Indeed", "Internal Database", "GitHub", "Referral", "Job Fair", "Stack Overflow"]
+
+STAGES = ["sourced", "screened", "engaged", "scheduled"]
+# Most candidates are still early in the pipeline
+STAGE_WEIGHTS = [0.4, 0.3, 0.2, 0.1]
+
+INTERVIEWERS = [f"Interviewer {i}" for i in range(1, 6)]
+ROOMS = ["Room A", "Room B", "Room C", "Video Call"]
+
+# Rows per generator block; changing it changes the output for a given seed
+BLOCK_SIZE = 5000
+# Activity falls in the 90 days before this moment, interviews in the two weeks after
+EPOCH = np.datetime64("2025-01-01T00:00:00", "s")
+_EPOCH_SECONDS = int(EPOCH.astype(np.int64))
+_DAY = 86400
+
+_JOB_TITLES = list(POSITION_SKILLS)
+_MAX_SKILLS = max(len(skills) for skills in POSITION_SKILLS.values())
+# Taxonomy padded to a rectangle so skills can be gathered with one index
+_SKILL_TABLE = np.array([skills + [""] * (_MAX_SKILLS - len(skills))
+                         for skills in POSITION_SKILLS.values()], dtype=object)
+_SKILL_COUNTS = np.array([len(skills) for skills in POSITION_SKILLS.values()])
+
+_AGENTS = [
+    ("Sourcing Agent", "source_candidate"),
+    ("Screening Agent", "screen_candidate"),
+    ("Engagement Agent", "engage_candidate"),
+    ("Scheduling Agent", "schedule_interview")
+]
+
+
+def _uuids(rng, count):
+    """`count` version 4 UUID strings drawn from `rng`"""
+    raw = np.frombuffer(rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    # Version and variant bits, as uuid.UUID(version=4) would set them
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    digits = raw.tobytes().hex()
+    return [f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-"
+            f"{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}" for i in range(0, 32 * count, 32)]
+
+
+def generate_block(seed, block, count=BLOCK_SIZE):
+    """
+    Columns for rows block * BLOCK_SIZE onwards, as numpy arrays. Only the
+    first `count` rows of the block are returned, and they are the same
+    rows a full block would start with.
+    """
+    rng = np.random.default_rng([seed, block])
+    size = BLOCK_SIZE
+    columns = {
+        "index": np.arange(block * BLOCK_SIZE, (block + 1) * BLOCK_SIZE),
+        "job": rng.integers(len(_JOB_TITLES), size=size),
+        "first_name": rng.integers(len(FIRST_NAMES), size=size),
+        "last_name": rng.integers(len(LAST_NAMES), size=size),
+        "source": rng.integers(len(SOURCES), size=size),
+        "stage": rng.choice(len(STAGES), size=size, p=STAGE_WEIGHTS),
+        "experience_years": rng.integers(1, 16, size=size),
+        "skill_count": rng.integers(3, 8, size=size),
+        "match_score": rng.integers(60, 96, size=size),
+        "experience_match": rng.random(size) > 0.3,
+        # Screened candidates that were contacted but turned the offer down
+        "declined": rng.random(size) < 0.15,
+        "interview_day": rng.integers(1, 15, size=size),
+        # Quarter hours from 9:00 to 16:45
+        "interview_slot": rng.integers(0, 32, size=size),
+        "interviewer": rng.integers(len(INTERVIEWERS), size=size),
+        "room": rng.integers(len(ROOMS), size=size),
+        # Seconds before EPOCH the candidate was sourced, then between stages
+        "sourced_ago": rng.integers(30 * _DAY, 90 * _DAY, size=size),
+        "stage_gaps": rng.integers(3600, 7 * _DAY, size=(size, len(STAGES) - 1))
+    }
+
+    # Each row's skills in random order: sort random keys, with the padding
+    # past the end of a position's taxonomy always sorting last
+    keys = rng.random((size, _MAX_SKILLS))
+    keys[np.arange(_MAX_SKILLS) >= _SKILL_COUNTS[columns["job"]][:, None]] = 2.0
+    columns["skill_order"] = np.argsort(keys, axis=1)
+    columns["matching_count"] = rng.integers(2, columns["skill_count"] + 1)
+    columns["missing_count"] = rng.integers(1, 4, size=size)
+    columns["candidate_id"] = np.array(_uuids(rng, size), dtype=object)
+    columns["log_ids"] = np.array(_uuids(rng, size * len(STAGES)), dtype=object).reshape(size, len(STAGES))
+
+    return {name: column[:count] for name, column in columns.items()}
+
+
+def _skill_lists(columns):
+    """Per row: (skills, matching skills, missing skills) as ", "-joined strings"""
+    skills = _SKILL_TABLE[columns["job"][:, None], columns["skill_order"]]
+    rows = zip(skills.tolist(), columns["skill_count"].tolist(), columns["matching_count"].tolist(),
+               columns["missing_count"].tolist(), _SKILL_COUNTS[columns["job"]].tolist())
+    result = []
+    for row, have, matching, missing, total in rows:
+        missing = min(missing, total - have)
+        result.append((", ".join(row[:have]), ", ".join(row[:matching]),
+                       ", ".join(row[have:have + missing])))
+    return result
+
+
+def _resume(name, email, job_title, experience_years, skills):
+    return (f"{name}\n{email}\n\n"
+            f"Summary:\nExperienced {job_title} with {experience_years} years of experience.\n\n"
+            f"Skills:\n{skills}\n\n"
+            f"Experience:\n"
+            f"- Senior {job_title} at Example Corp (2020-Present)\n"
+            f"  Led projects and delivered successful outcomes\n"
+            f"- {job_title} at Sample Inc (2017-2020)\n"
+            f"  Developed and implemented solutions\n\n"
+            f"Education:\n- Bachelor's Degree in {DEGREES[job_title]}, Example University\n")
+
+
+def _engagement_message(name, job_title, matching_skills):
+    return (f"Subject: Exciting {job_title} Opportunity\n\n"
+            f"Hi {name},\n\n"
+            f"Your skills in {matching_skills} align well with what we're looking for "
+            f"in our {job_title} position.\n\n"
+            f"Would you be interested in learning more about this opportunity?\n\n"
+            f"Best regards,\nTalentCrew AI Recruiting Team")
+
+
+def build_records(columns):
+    """
+    Turn generated columns into storage records. Returns
+    ((ids, metadatas, documents), (log_ids, log_metadatas, log_documents)):
+    candidates, and one log entry per stage each candidate has reached.
+    """
+    # Stage times: sourced `sourced_ago` before EPOCH, each later stage a gap after
+    stage_times = _EPOCH_SECONDS - columns["sourced_ago"][:, None] + np.concatenate(
+        [np.zeros((len(columns["index"]), 1), dtype=np.int64), np.cumsum(columns["stage_gaps"], axis=1)],
+        axis=1)
+    interviews = np.datetime_as_string(
+        EPOCH + columns["interview_day"] * _DAY + 9 * 3600 + columns["interview_slot"] * 900, unit="s")
+
+    ids, metadatas, documents = [], [], []
+    log_ids, log_metadatas, log_documents = [], [], []
+    rows = zip(columns["index"].tolist(), columns["job"].tolist(), columns["first_name"].tolist(),
+               columns["last_name"].tolist(), columns["source"].tolist(), columns["stage"].tolist(),
+               columns["experience_years"].tolist(), columns["match_score"].tolist(),
+               columns["experience_match"].tolist(), columns["declined"].tolist(),
+               interviews.tolist(), columns["interviewer"].tolist(), columns["room"].tolist(),
+               stage_times.tolist(), columns["candidate_id"].tolist(), columns["log_ids"].tolist(),
+               _skill_lists(columns))
+    for (index, job, first, last, source, stage, experience_years, match_score, experience_match,
+         declined, interview, interviewer, room, times, candidate_id, entry_ids,
+         (skills, matching, missing)) in rows:
+        job_title = _JOB_TITLES[job]
+        name = f"{FIRST_NAMES[first]} {LAST_NAMES[last]}"
+        email = f"{FIRST_NAMES[first]}.{LAST_NAMES[last]}.{index}@example.com".lower()
+        metadata = {
+            "name": name,
+            "email": email,
+            "source": SOURCES[source],
+            "job_title": job_title,
+            "stage": STAGES[stage],
+            "skills": skills,
+            "experience_years": experience_years
+        }
+        logs = [f"Sourced candidate {name} from {SOURCES[source]}"]
+
+        if stage >= 1:
+            metadata.update({
+                "match_score": match_score,
+                "matching_skills": matching,
+                "missing_skills": missing,
+                "experience_match": "Yes" if experience_match else "No"
+            })
+            logs.append(f"Screened {name} with score {match_score}%")
+        if stage >= 2 or (stage == 1 and declined):
+            metadata.update({
+                "engaged": True,
+                "is_interested": stage >= 2,
+                "engagement_message": _engagement_message(name, job_title, matching)
+            })
+            logs.append(f"Engaged {name} who was {'interested' if stage >= 2 else 'not interested'}")
+        if stage == 3:
+            metadata.update({
+                "scheduled": True,
+                "interview_datetime": interview,
+                "interviewer": INTERVIEWERS[interviewer],
+                "interview_room": ROOMS[room]
+            })
+            logs.append(f"Scheduled interview for {name} at {interview} "
+                        f"with {INTERVIEWERS[interviewer]} ({ROOMS[room]})")
+
+        ids.append(candidate_id)
+        metadatas.append(metadata)
+        documents.append(_resume(name, email, job_title, experience_years, skills))
+        for step, document in enumerate(logs):
+            agent, action = _AGENTS[step]
+            log_ids.append(entry_ids[step])
+            log_metadatas.append({
+                "agent": agent,
+                "action": action,
+                "status": "success",
+                "details": document,
+                "timestamp": float(times[step])
+            })
+            log_documents.append(f"{agent} {action}: success - {document}")
+
+    return (ids, metadatas, documents), (log_ids, log_metadatas, log_documents)
+
+
+def generate_records(seed, block, count=BLOCK_SIZE):
+    """build_records() of one block; a top-level function so process pools can call it"""
+    return build_records(generate_block(seed, block, count))
+
+
+def blocks(count):
+    """(block, rows) pairs covering `count` rows"""
+    return [(block, min(BLOCK_SIZE, count - block * BLOCK_SIZE))
+            for block in range(-(-count // BLOCK_SIZE))]
+
+
+def generate(count, seed=0, executor=None, lookahead=8):
+    """
+    Yield build_records() results for `count` candidates, one block at a
+    time and in order. With an `executor` (e.g. a ProcessPoolExecutor), up
+    to `lookahead` blocks are built in parallel while earlier ones are
+    being consumed, so memory stays bounded however large `count` is.
+    """
+    plan = blocks(count)
+    if executor is None:
+        for block, rows in plan:
+            yield generate_records(seed, block, rows)
+        return
+
+    pending = deque()
+    for block, rows in plan:
+        pending.append(executor.submit(generate_records, seed, block, rows))
+        if len(pending) >= lookahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,95 @@
+"""
+Deterministic stand-in for a text generation model, shared by the local
+LLM backend and the stand-in inference server in utils/stub_server.py.
+
+The same model name and prompt (whitespace aside) always give the same
+text, so runs against it can be compared and benchmarked. Outreach email
+prompts get an email that keeps the name placeholder they ask for; other
+prompts get a short recruiting-flavoured answer.
+"""
+import hashlib
+import random
+import re
+
+# Default cap on generated words
+MAX_TOKENS = 120
+
+_JOB_TITLE = re.compile(r"Job title:\s*(.+)")
+_SKILLS = re.compile(r"skills that match the job:\s*(.+)")
+_ADDRESS = re.compile(r"Address the candidate as\s+(\S+?)\.?\s*$", re.MULTILINE)
+_QUESTION = re.compile(r"(?:asking for|Human):\s*(.+)")
+_WORD = re.compile(r"\S+\s*|\s+")
+
+_OPENINGS = [
+    "I hope this message finds you well.",
+    "I came across your profile and wanted to reach out.",
+    "Thank you for your interest in joining our team.",
+    "Your background stood out while we were reviewing profiles."
+]
+_MATCHES = [
+    "Your experience with {skills} is exactly what our {job} team needs.",
+    "We are looking for a {job} with strong {skills} skills, and your profile is a great fit.",
+    "Your work in {skills} aligns closely with the {job} role we are hiring for."
+]
+_CLOSINGS = [
+    "Would you be open to a short call this week to discuss the opportunity?",
+    "If this sounds interesting, I would be glad to share more details.",
+    "Let me know if you would like to learn more about the role."
+]
+_ANSWERS = [
+    "Based on the current pipeline, {topic} is progressing as expected.",
+    "Here is a summary for {topic}.",
+    "The recruitment team is tracking {topic} closely.",
+    "Candidates with matching skills should be prioritized for {topic}.",
+    "Screening results suggest focusing on the strongest matches first.",
+    "Engagement rates improve when outreach mentions specific skills.",
+    "Interviews are usually scheduled within a few days of a positive reply.",
+    "Sourcing from several boards at once widens the candidate pool."
+]
+
+
+def count_tokens(text):
+    """Whitespace-separated words, a stand-in for model tokens"""
+    return len(text.split())
+
+
+def split_tokens(text):
+    """`text` as tokens that join back into it, each a word with the whitespace after it"""
+    return _WORD.findall(text)
+
+
+def _rng(prompt, model):
+    digest = hashlib.sha256(f"{model}\0{' '.join(prompt.split())}".encode()).digest()
+    return random.Random(digest)
+
+
+def _truncate(text, max_tokens):
+    words = split_tokens(text)
+    if len(words) <= max_tokens:
+        return text
+    return "".join(words[:max_tokens]).rstrip()
+
+
+def generate_text(prompt, model="local", max_tokens=MAX_TOKENS):
+    """The stand-in model's response to `prompt`, at most `max_tokens` words"""
+    prompt = str(prompt)
+    rng = _rng(prompt, model)
+
+    job = _JOB_TITLE.search(prompt)
+    if "email" in prompt.lower() and job:
+        job = job.group(1).strip()
+        skills = _SKILLS.search(prompt)
+        skills = skills.group(1).strip() if skills else "relevant skills"
+        address = _ADDRESS.search(prompt)
+        name = address.group(1) if address else "there"
+        text = (f"Subject: {job} opportunity\n\n"
+                f"Hi {name},\n\n"
+                f"{rng.choice(_OPENINGS)} {rng.choice(_MATCHES).format(skills=skills, job=job)}\n\n"
+                f"{rng.choice(_CLOSINGS)}\n\n"
+                f"Best regards,\nTalentCrew Recruiting Team")
+        return _truncate(text, max_tokens)
+
+    questions = _QUESTION.findall(prompt)
+    topic = " ".join(questions[-1].split()[:8]).rstrip("?.!") if questions else "this request"
+    sentences = [sentence.format(topic=topic) for sentence in rng.sample(_ANSWERS, rng.randint(2, 4))]
+    return _truncate(" ".join(sentences), max_tokens)